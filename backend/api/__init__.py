@@ -2,8 +2,14 @@
 Inicialización del paquete de API.
 """
 
-from flask import Blueprint
+from flask import Blueprint, current_app, make_response
 from flask_restx import Api
+from flask_restx.representations import output_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
 
 # Crear blueprint principal
 main_bp = Blueprint('api', __name__)
@@ -17,12 +23,30 @@ api = Api(
     doc='/docs'
 )
 
+@api.representation('application/json')
+def output_json_fast(data, code, headers=None):
+    """
+    Codificar las respuestas JSON con orjson si ``JSON_ORJSON`` está activo.
+    
+    orjson genera JSON compacto (sin espacios tras ``,`` y ``:``) y sin
+    escapar los caracteres no ASCII, por lo que está desactivado por defecto;
+    sin orjson instalado se usa siempre el codificador de flask-restx.
+    """
+    if orjson is None or not current_app.config.get('JSON_ORJSON') or current_app.debug:
+        return output_json(data, code, headers)
+    response = make_response(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE), code)
+    response.headers.extend(headers or {})
+    response.mimetype = 'application/json'
+    return response
+
 # Importar y registrar namespaces
 from api.customers_api import ns as customers_ns
 from api.suppliers_api import ns as suppliers_ns
 from api.products_api import ns as products_ns
 from api.invoices_api import ns as invoices_ns
 from api.dashboard_api import ns as dashboard_ns
+from api.cache_api import ns as cache_ns
+from api.search_api import ns as search_ns
 
 # Registrar namespaces en la API
 api.add_namespace(customers_ns, path='/customers')
@@ -30,13 +54,15 @@ api.add_namespace(suppliers_ns, path='/suppliers')
 api.add_namespace(products_ns, path='/products')
 api.add_namespace(invoices_ns, path='/invoices')
 api.add_namespace(dashboard_ns, path='/dashboard')
+api.add_namespace(cache_ns, path='/cache')
+api.add_namespace(search_ns, path='/search')
 
 def register_blueprints(app):
     """Registrar todos los blueprints en la aplicación."""
     from utils.errors import register_error_handlers
     
     # Registrar manejadores de errores
-    register_error_handlers(app)
+    register_error_handlers(app, api)
     
     # Registrar blueprint principal
     app.register_blueprint(main_bp, url_prefix='/api')
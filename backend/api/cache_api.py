@@ -0,0 +1,20 @@
+"""
+API para consultar el estado de la caché de respuestas.
+"""
+
+from flask_restx import Namespace, Resource
+from utils.cache import cache_stats
+
+# Crear namespace
+ns = Namespace('cache', description='Estado de la caché de respuestas')
+
+# Rutas del API
+@ns.route('/stats')
+class CacheStats(Resource):
+    """Endpoint con los contadores de la caché."""
+    
+    @ns.doc('get_cache_stats')
+    @ns.response(200, 'Éxito')
+    def get(self):
+        """Obtener los aciertos, fallos e invalidaciones de la caché en este proceso."""
+        return {'success': True, 'data': cache_stats()}, 200
@@ -4,10 +4,17 @@ API para gestionar clientes.
 
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from sqlalchemy.exc import SQLAlchemyError
-from models import Customer
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from models import Customer, Invoice
+from models.base import db
 from schemas.customer_schema import customer_schema, customers_schema
+from utils.cache import cached
+from utils.conditional import conditional, record_state, page_state
 from utils.errors import NotFoundError, ValidationError, DatabaseError
+from utils.bulk import bulk_import, bulk_params
+from utils.filters import get_filter_args, get_sort_arg, filter_params
+from utils.pagination import get_pagination_args, pagination_metadata, pagination_params
+from utils.projection import get_projection, projection_params
 
 # Crear namespace
 ns = Namespace('customers', description='Operaciones con clientes')
@@ -35,14 +42,27 @@ customer_input_model = ns.model('CustomerInput', {
 class CustomerList(Resource):
     """Endpoints para listar y crear clientes."""
     
-    @ns.doc('list_customers')
+    @ns.doc('list_customers', params={**pagination_params, **projection_params, **filter_params(Customer)})
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de paginación o filtros inválidos')
+    @conditional(lambda: page_state(Customer))
     def get(self):
-        """Listar todos los clientes."""
+        """Listar clientes paginados por cursor."""
         try:
-            customers = Customer.get_all()
-            result = customers_schema.dump(customers)
-            return {'success': True, 'data': result}, 200
+            after, limit = get_pagination_args()
+            projection = get_projection(customers_schema)
+            customers, next_cursor = Customer.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Customer),
+                query=Customer.query.options(*projection.options(Customer)).filter(*get_filter_args(Customer))
+            )
+            result = projection.dump(customers)
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
     
@@ -75,17 +95,21 @@ class CustomerList(Resource):
 class CustomerResource(Resource):
     """Endpoints para obtener, actualizar y eliminar un cliente específico."""
     
-    @ns.doc('get_customer')
+    @ns.doc('get_customer', params=projection_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de proyección inválidos')
+    @conditional(lambda id: record_state(Customer, id))
+    @cached('customer:{id}')
     def get(self, id):
         """Obtener un cliente por su ID."""
         try:
-            customer = Customer.get_by_id(id)
+            projection = get_projection(customer_schema)
+            customer = Customer.get_by_id(id, projection.options(Customer))
             if not customer:
                 raise NotFoundError(f"Cliente con ID {id} no encontrado")
             
-            return {'success': True, 'data': customer_schema.dump(customer)}, 200
-        except NotFoundError as e:
+            return {'success': True, 'data': projection.dump(customer)}, 200
+        except (NotFoundError, ValidationError) as e:
             raise e
         except Exception as e:
             raise DatabaseError(str(e))
@@ -130,6 +154,9 @@ class CustomerResource(Resource):
             return {'success': True, 'message': f"Cliente con ID {id} eliminado"}, 200
         except NotFoundError as e:
             raise e
+        except IntegrityError:
+            db.session.rollback()
+            raise ValidationError(f"El cliente con ID {id} tiene facturas asociadas y no se puede eliminar")
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -139,10 +166,11 @@ class CustomerResource(Resource):
 class CustomerInvoices(Resource):
     """Endpoint para listar facturas de un cliente."""
     
-    @ns.doc('list_customer_invoices')
+    @ns.doc('list_customer_invoices', params={**pagination_params, **projection_params, **filter_params(Invoice)})
     @ns.response(200, 'Éxito')
+    @conditional(lambda id: page_state(Invoice, Invoice.customer_id == id, related=Invoice.related_updated_at))
     def get(self, id):
-        """Listar todas las facturas de un cliente."""
+        """Listar las facturas de un cliente paginadas por cursor."""
         try:
             # Verificar si existe el cliente
             customer = Customer.get_by_id(id)
@@ -150,12 +178,42 @@ class CustomerInvoices(Resource):
                 raise NotFoundError(f"Cliente con ID {id} no encontrado")
             
             # Obtener facturas
+            from models import Invoice
             from schemas.invoice_schema import invoices_schema
-            invoices = customer.invoices
-            result = invoices_schema.dump(invoices)
+            after, limit = get_pagination_args()
+            projection = get_projection(invoices_schema)
+            invoices, next_cursor = Invoice.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Invoice),
+                query=Invoice.query.options(*projection.options(Invoice)).filter(
+                    Invoice.customer_id == id, *get_filter_args(Invoice)
+                )
+            )
+            result = projection.dump(invoices)
             
-            return {'success': True, 'data': result}, 200
-        except NotFoundError as e:
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except (NotFoundError, ValidationError) as e:
+            raise e
+        except Exception as e:
+            raise DatabaseError(str(e))
+
+@ns.route('/bulk')
+class CustomerBulk(Resource):
+    """Endpoint para la importación masiva de clientes."""
+    
+    @ns.doc('bulk_import_customers', params=bulk_params)
+    @ns.response(201, 'Importación procesada (con errores por fila si los hay)')
+    @ns.response(400, 'Formato de entrada inválido')
+    def post(self):
+        """Importar clientes desde un array JSON, NDJSON o CSV."""
+        try:
+            result = bulk_import(Customer, customers_schema, unique=('email',))
+            return {'success': result['error_count'] == 0, 'data': result}, 201
+        except ValidationError as e:
             raise e
         except Exception as e:
-            raise DatabaseError(str(e)) 
\ No newline at end of file
+            db.session.rollback()
+            raise DatabaseError(str(e))
\ No newline at end of file
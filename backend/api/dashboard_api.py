@@ -2,67 +2,478 @@
 API para el dashboard.
 """
 
-from datetime import datetime, timedelta
-from flask import request
+from datetime import datetime, time, timedelta
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
-from sqlalchemy import func, desc
-from models import Customer, Product, Invoice, InvoiceItem
+from sqlalchemy import func, desc, select, case
+from sqlalchemy.orm import joinedload
+from models import Customer, Product, Invoice, InvoiceItem, DailySales
 from models.base import db
-from utils.errors import DatabaseError
+from utils.errors import DatabaseError, ServiceUnavailableError, ValidationError
+from utils.params import get_date_arg, get_int_arg
+from utils.cache import cached
+from utils.conditional import conditional, table_state
+from utils.fanout import fan_out
 
 # Crear namespace
 ns = Namespace('dashboard', description='Operaciones del dashboard')
 
+# Granularidades de las series temporales y número de intervalos por defecto
+SERIES_DEFAULT_PERIODS = {'day': 7, 'week': 4, 'month': 6}
+MAX_SERIES_BUCKETS = 1000
+
+# Tablas de las que dependen los contadores del dashboard
+COUNTER_MODELS = (DailySales, Invoice, Customer, Product)
+
+# Widgets que se calculan con los contadores compartidos y resto de widgets del lote
+COUNTER_WIDGETS = ('stats', 'sales_summary', 'customer_statistics')
+BATCH_WIDGETS = COUNTER_WIDGETS + ('sales_chart', 'top_products', 'recent_invoices', 'activities')
+
+# Parámetros de las series temporales para la documentación Swagger
+series_params = {
+    'start': 'Fecha inicial (YYYY-MM-DD)',
+    'end': 'Fecha final incluida (YYYY-MM-DD, por defecto hoy)',
+    'granularity': 'Tamaño del intervalo: day, week o month'
+}
+
+def date_bucket(column, granularity):
+    """
+    Expresión SQL con la fecha (YYYY-MM-DD) de inicio del intervalo de ``column``.
+    
+    Las semanas empiezan el lunes y los meses el día 1, igual que en
+    ``bucket_start``, para que las claves de SQL y de Python coincidan.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        if granularity == 'day':
+            return func.date(column)
+        if granularity == 'week':
+            return func.date(column, 'weekday 0', '-6 days')
+        return func.date(column, 'start of month')
+    return func.to_char(func.date_trunc(granularity, column), 'YYYY-MM-DD')
+
+def bucket_start(day, granularity):
+    """Primer día del intervalo que contiene ``day``."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+def next_bucket(day, granularity):
+    """Primer día del intervalo siguiente al que empieza en ``day``."""
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+def previous_bucket(day, granularity):
+    """Primer día del intervalo anterior al que empieza en ``day``."""
+    if granularity == 'week':
+        return day - timedelta(days=7)
+    if granularity == 'month':
+        return (day - timedelta(days=1)).replace(day=1)
+    return day - timedelta(days=1)
+
+def get_series_args(service, default_granularity='month'):
+    """Obtener ``start``, ``end`` y ``granularity`` de la petición actual."""
+    granularity = request.args.get('granularity') or request.args.get('period') or default_granularity
+    if granularity not in SERIES_DEFAULT_PERIODS:
+        raise ValidationError("El parámetro 'granularity' debe ser day, week o month")
+    
+    default_start, default_end = service.default_range(granularity)
+    end = get_date_arg('end', default_end)
+    start = get_date_arg('start', default_start)
+    if start > end:
+        raise ValidationError("La fecha 'start' no puede ser posterior a 'end'")
+    
+    # Limitar el número de intervalos que puede pedir una sola petición
+    max_days = {'day': 1, 'week': 7, 'month': 31}[granularity] * MAX_SERIES_BUCKETS
+    if (end - start).days > max_days:
+        raise ValidationError(f"El rango solicitado supera {MAX_SERIES_BUCKETS} intervalos")
+    return start, end, granularity
+
+def widget_state(*models):
+    """
+    Estado de las tablas de las que depende un widget, para su ETag.
+    
+    Incluye el día actual, porque los rangos por defecto y los contadores del
+    mes cambian al empezar un nuevo día aunque no cambien los datos.
+    """
+    return lambda: table_state(*models, since=datetime.combine(datetime.utcnow().date(), time.min))
+
+class DashboardService:
+    """
+    Servicio de agregación compartido por los endpoints del dashboard.
+    
+    Todos los contadores (clientes, productos, totales y promedios de
+    facturas, facturas por estado, stock bajo y ventas del mes) se calculan
+    con dos sentencias agregadas que se ejecutan una sola vez por instancia,
+    de modo que varios widgets servidos en la misma petición comparten el
+    resultado. Los agregados de ventas se leen del resumen diario
+    (``DailySales``), por lo que su coste depende del número de días y no
+    del número de facturas.
+    """
+    
+    def __init__(self, now=None):
+        self.now = now or datetime.utcnow()
+        self.month_start = self.now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        self._counters = None
+    
+    def counters(self):
+        """Calcular (una sola vez) todos los contadores del dashboard."""
+        if self._counters is None:
+            self._counters = {**self._invoice_counters(), **self._catalog_counters()}
+        return self._counters
+    
+    def _invoice_counters(self):
+        """Agregados de facturas a partir del resumen diario de ventas."""
+        row = db.session.execute(
+            select(
+                func.coalesce(func.sum(DailySales.invoice_count), 0).label('total_invoices'),
+                func.coalesce(func.sum(DailySales.total), 0).label('total_sales'),
+                func.coalesce(func.sum(
+                    case((DailySales.date >= self.month_start.date(), DailySales.total), else_=0)
+                ), 0).label('monthly_sales'),
+                func.coalesce(func.sum(DailySales.pending_count), 0).label('pending_invoices'),
+                func.coalesce(func.sum(DailySales.paid_count), 0).label('paid_invoices')
+            )
+        ).one()
+        counters = dict(row._mapping)
+        counters['avg_invoice_value'] = (
+            counters['total_sales'] / counters['total_invoices'] if counters['total_invoices'] else 0
+        )
+        return counters
+    
+    def _catalog_counters(self):
+        """Contadores de clientes y productos en una única sentencia."""
+        row = db.session.execute(
+            select(
+                select(func.count(Customer.id)).scalar_subquery().label('total_customers'),
+                select(func.count(Customer.id)).where(
+                    Customer.created_at >= self.month_start
+                ).scalar_subquery().label('new_customers'),
+                select(func.count(Product.id)).scalar_subquery().label('total_products'),
+                select(func.count(Product.id)).where(
+                    Product.stock < Product.LOW_STOCK_THRESHOLD
+                ).scalar_subquery().label('low_stock_products'),
+                select(func.count(Customer.id)).where(
+                    select(Invoice.id).where(Invoice.customer_id == Customer.id).exists()
+                ).scalar_subquery().label('customers_with_purchases')
+            )
+        ).one()
+        return dict(row._mapping)
+    
+    def stats(self):
+        """Estadísticas generales del dashboard."""
+        counters = self.counters()
+        return {
+            'total_customers': counters['total_customers'],
+            'total_products': counters['total_products'],
+            'total_invoices': counters['total_invoices'],
+            'total_sales': float(counters['total_sales']),
+            'monthly_sales': float(counters['monthly_sales']),
+            'pending_invoices': counters['pending_invoices'],
+            'avg_invoice_value': float(counters['avg_invoice_value']),
+            'low_stock_products': counters['low_stock_products']
+        }
+    
+    def sales_summary(self):
+        """Resumen de ventas."""
+        counters = self.counters()
+        total_sales = float(counters['total_sales'])
+        total_orders = counters['total_invoices']
+        return {
+            'total_sales': total_sales,
+            'total_orders': total_orders,
+            'average_order_value': total_sales / total_orders if total_orders > 0 else 0.0,
+            'paid_invoices': counters['paid_invoices'],
+            'pending_invoices': counters['pending_invoices']
+        }
+    
+    def customer_statistics(self):
+        """Estadísticas de clientes."""
+        counters = self.counters()
+        customers_with_purchases = counters['customers_with_purchases']
+        return {
+            'total_customers': counters['total_customers'],
+            'new_customers': counters['new_customers'],
+            'repeat_customers': customers_with_purchases,
+            'inactive_customers': counters['total_customers'] - customers_with_purchases
+        }
+    
+    def default_range(self, granularity, periods=None):
+        """Rango por defecto: los últimos ``periods`` intervalos hasta hoy."""
+        end = self.now.date()
+        start = bucket_start(end, granularity)
+        for _ in range((periods or SERIES_DEFAULT_PERIODS[granularity]) - 1):
+            start = previous_bucket(start, granularity)
+        return start, end
+    
+    def sales_series(self, start, end, granularity):
+        """
+        Ventas agrupadas por intervalo entre ``start`` y ``end`` (incluidos).
+        
+        Se resuelve con una única consulta GROUP BY sobre el resumen diario
+        de ventas. Devuelve una lista ``(inicio_del_intervalo, total)`` en
+        orden cronológico que incluye los intervalos sin ventas.
+        """
+        bucket = date_bucket(DailySales.date, granularity).label('bucket')
+        rows = db.session.execute(
+            select(bucket, func.sum(DailySales.total).label('total')).where(
+                DailySales.date.between(start, end)
+            ).group_by(bucket)
+        ).all()
+        totals = {str(row.bucket): float(row.total or 0) for row in rows}
+        
+        series = []
+        day = bucket_start(start, granularity)
+        while day <= end:
+            series.append((day, totals.get(day.isoformat(), 0.0)))
+            day = next_bucket(day, granularity)
+        return series
+    
+    def sales_chart(self, start=None, end=None, granularity='month'):
+        """Datos para el gráfico de ventas (por defecto, los últimos 6 meses)."""
+        if start is None or end is None:
+            start, end = self.default_range(granularity)
+        series = self.sales_series(start, end, granularity)
+        
+        if granularity == 'month':
+            label_format = '%B' if len(series) <= 12 else '%B %Y'
+        else:
+            label_format = '%Y-%m-%d'
+        
+        return {
+            'labels': [day.strftime(label_format) for day, _ in series],
+            'datasets': [
+                {
+                    'label': 'Ventas',
+                    'data': [total for _, total in series]
+                }
+            ]
+        }
+    
+    def sales_by_period(self, start=None, end=None, granularity='day'):
+        """Ventas agrupadas por día, semana o mes."""
+        if start is None or end is None:
+            start, end = self.default_range(granularity)
+        result = []
+        for i, (day, total) in enumerate(self.sales_series(start, end, granularity)):
+            if granularity == 'day':
+                label = day.strftime('%Y-%m-%d')
+            elif granularity == 'week':
+                label = f"Semana {i + 1}"
+            else:
+                label = day.strftime('%B %Y')
+            result.append({'label': label, 'start': day.isoformat(), 'value': total})
+        return result
+    
+    def top_products(self, limit=5):
+        """Productos más vendidos por cantidad."""
+        top_products = db.session.query(
+            Product.id,
+            Product.name,
+            func.sum(InvoiceItem.quantity).label('total_sold'),
+            func.sum(InvoiceItem.quantity * InvoiceItem.price).label('total_revenue')
+        ).join(
+            InvoiceItem, InvoiceItem.product_id == Product.id
+        ).group_by(
+            Product.id
+        ).order_by(
+            desc('total_sold')
+        ).limit(limit).all()
+        
+        return [
+            {
+                'id': p.id,
+                'name': p.name,
+                'total_sold': int(p.total_sold),
+                'total_revenue': float(p.total_revenue)
+            } for p in top_products
+        ]
+    
+    def recent_invoices(self, limit=5):
+        """Facturas más recientes."""
+        recent_invoices = Invoice.query.options(
+            joinedload(Invoice.customer)
+        ).order_by(
+            desc(Invoice.date)
+        ).limit(limit).all()
+        
+        result = []
+        for invoice in recent_invoices:
+            customer_name = invoice.customer.name if invoice.customer else 'N/A'
+            result.append({
+                'id': invoice.id,
+                'invoice_number': invoice.invoice_number,
+                'date': invoice.date.isoformat() if invoice.date else None,
+                'customer_name': customer_name,
+                'total': invoice.total,
+                'status': invoice.status
+            })
+        return result
+    
+    def activities(self):
+        """Actividades recientes (nuevos clientes y facturas)."""
+        recent_customers = Customer.query.order_by(
+            desc(Customer.created_at)
+        ).limit(3).all()
+        
+        recent_invoices = Invoice.query.options(
+            joinedload(Invoice.customer)
+        ).order_by(
+            desc(Invoice.created_at)
+        ).limit(3).all()
+        
+        # Combinar y ordenar actividades
+        activities = []
+        
+        for customer in recent_customers:
+            activities.append({
+                'type': 'customer',
+                'id': customer.id,
+                'name': customer.name,
+                'date': customer.created_at.isoformat(),
+                'description': f"Nuevo cliente: {customer.name}"
+            })
+        
+        for invoice in recent_invoices:
+            customer_name = invoice.customer.name if invoice.customer else 'N/A'
+            activities.append({
+                'type': 'invoice',
+                'id': invoice.id,
+                'name': invoice.invoice_number,
+                'date': invoice.created_at.isoformat(),
+                'description': f"Nueva factura: {invoice.invoice_number} para {customer_name}"
+            })
+        
+        # Ordenar por fecha (más reciente primero) y limitar a 10 actividades
+        activities.sort(key=lambda x: x['date'], reverse=True)
+        return activities[:10]
+    
+    def overview(self):
+        """Todos los widgets del dashboard en una sola respuesta."""
+        return {
+            'stats': self.stats(),
+            'sales_summary': self.sales_summary(),
+            'customer_statistics': self.customer_statistics(),
+            'sales_chart': self.sales_chart(),
+            'top_products': self.top_products(),
+            'recent_invoices': self.recent_invoices(),
+            'activities': self.activities()
+        }
+    
+    def batch(self, widgets, timeout):
+        """
+        Calcular ``widgets`` en paralelo, cada grupo en un hilo con su propia sesión.
+        
+        Los widgets de ``COUNTER_WIDGETS`` comparten la consulta de los
+        contadores y se calculan juntos. Devuelve los datos de cada widget
+        (``None`` si ha fallado, ha superado ``timeout`` segundos o no ha
+        encontrado un hilo libre a tiempo) y su estado y duración.
+        """
+        def group(names):
+            service = DashboardService(self.now)
+            return lambda: {name: getattr(service, name)() for name in names}
+        
+        groups = {name: [name] for name in widgets if name not in COUNTER_WIDGETS}
+        counter_widgets = [name for name in widgets if name in COUNTER_WIDGETS]
+        if counter_widgets:
+            groups['counters'] = counter_widgets
+        results = fan_out({task: group(names) for task, names in groups.items()}, timeout)
+        
+        data, timings = {}, {}
+        for task, names in groups.items():
+            status, result, seconds = results[task]
+            for name in names:
+                data[name] = result[name] if status == 'ok' else None
+                timings[name] = {'status': status, 'duration_ms': round(seconds * 1000, 3)}
+                if status == 'error':
+                    timings[name]['error'] = str(result)
+        return {name: data[name] for name in widgets}, {name: timings[name] for name in widgets}
+
+def get_widgets_arg():
+    """Leer la lista de widgets (``widgets``, separados por comas) de la petición."""
+    value = request.args.get('widgets')
+    if not value:
+        return list(BATCH_WIDGETS)
+    widgets = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in widgets if name not in BATCH_WIDGETS]
+    if unknown:
+        raise ValidationError(
+            f"Widgets desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(BATCH_WIDGETS)}"
+        )
+    return widgets
+
 # Rutas del API
+@ns.route('/overview')
+class DashboardOverview(Resource):
+    """Endpoint con todos los widgets del dashboard."""
+    
+    @ns.doc('get_dashboard_overview')
+    @ns.response(200, 'Éxito')
+    @conditional(widget_state(*COUNTER_MODELS, InvoiceItem))
+    @cached(*COUNTER_MODELS, InvoiceItem)
+    def get(self):
+        """Obtener estadísticas, gráficos y actividad del dashboard en una sola petición."""
+        try:
+            return {'success': True, 'data': DashboardService().overview()}, 200
+        except Exception as e:
+            raise DatabaseError(str(e))
+
+@ns.route('/batch')
+class DashboardBatch(Resource):
+    """Endpoint con varios widgets del dashboard calculados en paralelo."""
+    
+    @ns.doc('get_dashboard_batch', params={
+        'widgets': f"Widgets separados por comas (por defecto, todos): {', '.join(BATCH_WIDGETS)}",
+        'timeout_ms': 'Tiempo máximo de espera en milisegundos (como mucho DASHBOARD_WIDGET_TIMEOUT_MS)'
+    })
+    @ns.response(200, 'Éxito, aunque algún widget haya fallado')
+    @ns.response(400, 'Parámetros inválidos')
+    @ns.response(503, 'Ningún widget ha terminado a tiempo')
+    def get(self):
+        """
+        Obtener varios widgets del dashboard calculando sus consultas en paralelo.
+        
+        ``metadata.widgets`` indica el estado (``ok``, ``error``,
+        ``timeout`` o ``skipped``) y la duración de cada widget; los que
+        fallan o no terminan a tiempo se devuelven como ``null``. Si ninguno
+        ha terminado a tiempo se responde 503. No se cachea, porque los
+        tiempos son los de cada petición.
+        """
+        try:
+            widgets = get_widgets_arg()
+            limit = current_app.config['DASHBOARD_WIDGET_TIMEOUT_MS']
+            timeout = min(get_int_arg('timeout_ms', limit), limit)
+            if timeout == 0:
+                raise ValidationError("El parámetro 'timeout_ms' debe ser mayor que 0")
+            
+            data, timings = DashboardService().batch(widgets, timeout / 1000)
+            statuses = {timing['status'] for timing in timings.values()}
+            if 'ok' not in statuses and 'error' not in statuses:
+                raise ServiceUnavailableError('Ningún widget del dashboard ha terminado a tiempo')
+            if 'ok' not in statuses:
+                raise DatabaseError('No se ha podido calcular ningún widget del dashboard')
+            return {'success': True, 'data': data, 'metadata': {'widgets': timings}}, 200
+        except (ValidationError, DatabaseError, ServiceUnavailableError) as e:
+            raise e
+        except Exception as e:
+            raise DatabaseError(str(e))
+
 @ns.route('/stats')
 class DashboardStats(Resource):
     """Endpoints para estadísticas generales del dashboard."""
     
     @ns.doc('get_dashboard_stats')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(*COUNTER_MODELS))
+    @cached(*COUNTER_MODELS)
     def get(self):
         """Obtener estadísticas generales para el dashboard."""
         try:
-            # Contar total de clientes
-            total_customers = Customer.query.count()
-            
-            # Contar total de productos
-            total_products = Product.query.count()
-            
-            # Contar total de facturas
-            total_invoices = Invoice.query.count()
-            
-            # Calcular ventas totales
-            total_sales = db.session.query(func.sum(Invoice.total)).scalar() or 0
-            
-            # Calcular ventas del mes actual
-            first_day_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            monthly_sales = db.session.query(func.sum(Invoice.total)).filter(
-                Invoice.date >= first_day_of_month
-            ).scalar() or 0
-            
-            # Obtener facturas pendientes
-            pending_invoices = Invoice.query.filter_by(status='pending').count()
-            
-            # Calcular valor promedio de facturas
-            avg_invoice_value = db.session.query(func.avg(Invoice.total)).scalar() or 0
-            
-            # Contar productos con bajo stock (menos de 10 unidades)
-            low_stock_products = Product.query.filter(Product.stock < 10).count()
-            
-            return {
-                'success': True,
-                'data': {
-                    'total_customers': total_customers,
-                    'total_products': total_products,
-                    'total_invoices': total_invoices,
-                    'total_sales': float(total_sales),
-                    'monthly_sales': float(monthly_sales),
-                    'pending_invoices': pending_invoices,
-                    'avg_invoice_value': float(avg_invoice_value),
-                    'low_stock_products': low_stock_products
-                }
-            }, 200
+            return {'success': True, 'data': DashboardService().stats()}, 200
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -70,45 +481,19 @@ class DashboardStats(Resource):
 class SalesChart(Resource):
     """Endpoint para datos de gráfico de ventas."""
     
-    @ns.doc('get_sales_chart')
+    @ns.doc('get_sales_chart', params=series_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros inválidos')
+    @conditional(widget_state(DailySales))
+    @cached(DailySales)
     def get(self):
-        """Obtener datos para gráfico de ventas de los últimos 6 meses."""
+        """Obtener datos para gráfico de ventas (por defecto, los últimos 6 meses)."""
         try:
-            # Calcular fecha de inicio (6 meses atrás)
-            today = datetime.utcnow()
-            start_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-            
-            # Inicializar array de resultados
-            months = []
-            sales_data = []
-            
-            # Obtener datos de ventas por mes de los últimos 6 meses
-            for i in range(6):
-                month_start = today.replace(day=1) - timedelta(days=30 * i)
-                month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
-                month_name = month_start.strftime('%B')
-                
-                # Calcular ventas del mes
-                month_sales = db.session.query(func.sum(Invoice.total)).filter(
-                    Invoice.date.between(month_start, month_end)
-                ).scalar() or 0
-                
-                months.insert(0, month_name)
-                sales_data.insert(0, float(month_sales))
-            
-            return {
-                'success': True,
-                'data': {
-                    'labels': months,
-                    'datasets': [
-                        {
-                            'label': 'Ventas',
-                            'data': sales_data
-                        }
-                    ]
-                }
-            }, 200
+            service = DashboardService()
+            start, end, granularity = get_series_args(service, 'month')
+            return {'success': True, 'data': service.sales_chart(start, end, granularity)}, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -118,34 +503,12 @@ class TopProducts(Resource):
     
     @ns.doc('get_top_products')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(InvoiceItem, Product))
+    @cached(InvoiceItem, Product)
     def get(self):
         """Obtener los 5 productos más vendidos."""
         try:
-            # Consultar productos más vendidos por cantidad
-            top_products = db.session.query(
-                Product.id,
-                Product.name,
-                func.sum(InvoiceItem.quantity).label('total_sold'),
-                func.sum(InvoiceItem.quantity * InvoiceItem.price).label('total_revenue')
-            ).join(
-                InvoiceItem, InvoiceItem.product_id == Product.id
-            ).group_by(
-                Product.id
-            ).order_by(
-                desc('total_sold')
-            ).limit(5).all()
-            
-            # Formatear resultados
-            result = [
-                {
-                    'id': p.id,
-                    'name': p.name,
-                    'total_sold': int(p.total_sold),
-                    'total_revenue': float(p.total_revenue)
-                } for p in top_products
-            ]
-            
-            return {'success': True, 'data': result}, 200
+            return {'success': True, 'data': DashboardService().top_products()}, 200
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -155,28 +518,12 @@ class RecentInvoices(Resource):
     
     @ns.doc('get_recent_invoices')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(Invoice, Customer))
+    @cached(Invoice, Customer)
     def get(self):
         """Obtener las 5 facturas más recientes."""
         try:
-            # Consultar facturas recientes
-            recent_invoices = Invoice.query.order_by(
-                desc(Invoice.date)
-            ).limit(5).all()
-            
-            # Formatear resultados
-            result = []
-            for invoice in recent_invoices:
-                customer_name = invoice.customer.name if invoice.customer else 'N/A'
-                result.append({
-                    'id': invoice.id,
-                    'invoice_number': invoice.invoice_number,
-                    'date': invoice.date.isoformat() if invoice.date else None,
-                    'customer_name': customer_name,
-                    'total': invoice.total,
-                    'status': invoice.status
-                })
-            
-            return {'success': True, 'data': result}, 200
+            return {'success': True, 'data': DashboardService().recent_invoices()}, 200
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -186,48 +533,12 @@ class RecentActivities(Resource):
     
     @ns.doc('get_activities')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(Invoice, Customer))
+    @cached(Invoice, Customer)
     def get(self):
         """Obtener actividades recientes (nuevos clientes, facturas, etc.)."""
         try:
-            # Obtener clientes recientes
-            recent_customers = Customer.query.order_by(
-                desc(Customer.created_at)
-            ).limit(3).all()
-            
-            # Obtener facturas recientes
-            recent_invoices = Invoice.query.order_by(
-                desc(Invoice.created_at)
-            ).limit(3).all()
-            
-            # Combinar y ordenar actividades
-            activities = []
-            
-            for customer in recent_customers:
-                activities.append({
-                    'type': 'customer',
-                    'id': customer.id,
-                    'name': customer.name,
-                    'date': customer.created_at.isoformat(),
-                    'description': f"Nuevo cliente: {customer.name}"
-                })
-            
-            for invoice in recent_invoices:
-                customer_name = invoice.customer.name if invoice.customer else 'N/A'
-                activities.append({
-                    'type': 'invoice',
-                    'id': invoice.id,
-                    'name': invoice.invoice_number,
-                    'date': invoice.created_at.isoformat(),
-                    'description': f"Nueva factura: {invoice.invoice_number} para {customer_name}"
-                })
-            
-            # Ordenar por fecha (más reciente primero)
-            activities.sort(key=lambda x: x['date'], reverse=True)
-            
-            # Limitar a 10 actividades
-            activities = activities[:10]
-            
-            return {'success': True, 'data': activities}, 200
+            return {'success': True, 'data': DashboardService().activities()}, 200
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -237,32 +548,12 @@ class SalesSummary(Resource):
     
     @ns.doc('get_sales_summary')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(*COUNTER_MODELS))
+    @cached(*COUNTER_MODELS)
     def get(self):
         """Obtener resumen de ventas."""
         try:
-            # Calcular ventas totales
-            total_sales = db.session.query(func.sum(Invoice.total)).scalar() or 0
-            
-            # Calcular número total de ventas
-            total_orders = Invoice.query.count()
-            
-            # Calcular valor promedio de ventas
-            avg_order_value = total_sales / total_orders if total_orders > 0 else 0
-            
-            # Calcular número de facturas pagadas vs pendientes
-            paid_invoices = Invoice.query.filter_by(status='paid').count()
-            pending_invoices = Invoice.query.filter_by(status='pending').count()
-            
-            return {
-                'success': True,
-                'data': {
-                    'total_sales': float(total_sales),
-                    'total_orders': total_orders,
-                    'average_order_value': float(avg_order_value),
-                    'paid_invoices': paid_invoices,
-                    'pending_invoices': pending_invoices
-                }
-            }, 200
+            return {'success': True, 'data': DashboardService().sales_summary()}, 200
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -270,80 +561,22 @@ class SalesSummary(Resource):
 class SalesByPeriod(Resource):
     """Endpoint para ventas por período."""
     
-    @ns.doc('get_sales_by_period')
+    @ns.doc('get_sales_by_period', params={
+        **series_params,
+        'period': 'Alias de granularity (day, week o month)'
+    })
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros inválidos')
+    @conditional(widget_state(DailySales))
+    @cached(DailySales)
     def get(self):
         """Obtener ventas agrupadas por día, semana o mes."""
         try:
-            period = request.args.get('period', 'day')
-            valid_periods = ['day', 'week', 'month']
-            
-            if period not in valid_periods:
-                period = 'day'  # Default a día si el período no es válido
-            
-            # Obtener datos según el período
-            if period == 'day':
-                # Ventas de los últimos 7 días
-                start_date = datetime.utcnow() - timedelta(days=7)
-                result = []
-                
-                for i in range(7):
-                    day = start_date + timedelta(days=i)
-                    day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-                    day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-                    
-                    day_sales = db.session.query(func.sum(Invoice.total)).filter(
-                        Invoice.date.between(day_start, day_end)
-                    ).scalar() or 0
-                    
-                    result.append({
-                        'label': day.strftime('%Y-%m-%d'),
-                        'value': float(day_sales)
-                    })
-                
-            elif period == 'week':
-                # Ventas de las últimas 4 semanas
-                start_date = datetime.utcnow() - timedelta(weeks=4)
-                result = []
-                
-                for i in range(4):
-                    week_start = start_date + timedelta(weeks=i)
-                    week_end = week_start + timedelta(days=6)
-                    
-                    week_sales = db.session.query(func.sum(Invoice.total)).filter(
-                        Invoice.date.between(week_start, week_end)
-                    ).scalar() or 0
-                    
-                    result.append({
-                        'label': f"Semana {i+1}",
-                        'value': float(week_sales)
-                    })
-                
-            else:  # month
-                # Ventas de los últimos 6 meses
-                result = []
-                today = datetime.utcnow()
-                
-                for i in range(6):
-                    month_start = (today.replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                    if i < 5:
-                        month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
-                    else:
-                        month_end = today
-                    
-                    month_sales = db.session.query(func.sum(Invoice.total)).filter(
-                        Invoice.date.between(month_start, month_end)
-                    ).scalar() or 0
-                    
-                    result.append({
-                        'label': month_start.strftime('%B %Y'),
-                        'value': float(month_sales)
-                    })
-                
-                # Invertir para que estén en orden cronológico
-                result.reverse()
-            
-            return {'success': True, 'data': result}, 200
+            service = DashboardService()
+            start, end, granularity = get_series_args(service, 'day')
+            return {'success': True, 'data': service.sales_by_period(start, end, granularity)}, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -353,34 +586,11 @@ class CustomerStatistics(Resource):
     
     @ns.doc('get_customer_statistics')
     @ns.response(200, 'Éxito')
+    @conditional(widget_state(*COUNTER_MODELS))
+    @cached(*COUNTER_MODELS)
     def get(self):
         """Obtener estadísticas de clientes."""
         try:
-            # Total de clientes
-            total_customers = Customer.query.count()
-            
-            # Clientes nuevos del último mes
-            month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            new_customers = Customer.query.filter(
-                Customer.created_at >= month_start
-            ).count()
-            
-            # Clientes con al menos una compra
-            customers_with_purchases = db.session.query(
-                func.count(func.distinct(Invoice.customer_id))
-            ).scalar() or 0
-            
-            # Clientes sin compras
-            customers_without_purchases = total_customers - customers_with_purchases
-            
-            return {
-                'success': True,
-                'data': {
-                    'total_customers': total_customers,
-                    'new_customers': new_customers,
-                    'repeat_customers': customers_with_purchases,
-                    'inactive_customers': customers_without_purchases
-                }
-            }, 200
+            return {'success': True, 'data': DashboardService().customer_statistics()}, 200
         except Exception as e:
-            raise DatabaseError(str(e)) 
\ No newline at end of file
+            raise DatabaseError(str(e))
\ No newline at end of file
@@ -2,15 +2,27 @@
 API para gestionar facturas.
 """
 
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
-from models import Invoice, InvoiceItem, Customer, Product
+from marshmallow import ValidationError as SchemaValidationError
+from models import Invoice, InvoiceItem, Customer, Product, DailySales
+from models.base import db
 from schemas.invoice_schema import (
-    invoice_schema, invoices_schema,
+    INVOICE_STATUSES, invoice_schema, invoices_schema,
     invoice_item_schema, invoice_items_schema
 )
+from utils.cache import cached
+from utils.conditional import conditional, record_state, page_state
 from utils.errors import NotFoundError, ValidationError, DatabaseError
+from utils.export import stream_export, get_export_format, export_params
+from utils.filters import get_filter_args, get_sort_arg, filter_params
+from utils.pagination import get_pagination_args, pagination_metadata, pagination_params
+from utils.projection import get_projection, projection_params
+from utils.params import get_date_arg
 
 # Crear namespace
 ns = Namespace('invoices', description='Operaciones con facturas')
@@ -60,19 +72,108 @@ invoice_item_input_model = ns.model('InvoiceItemInput', {
     'price': fields.Float(description='Precio unitario (opcional, se usa el precio del producto si no se especifica)')
 })
 
+def _load(schema, data, **kwargs):
+    """Validar y deserializar datos de entrada con un esquema de marshmallow."""
+    try:
+        return schema.load(data, **kwargs)
+    except SchemaValidationError as e:
+        raise ValidationError(str(e.messages))
+
+def _build_items(items_data, released=None):
+    """
+    Construir los items de una factura reservando el stock de sus productos.
+    
+    Todos los productos referenciados se obtienen con una única consulta IN.
+    El stock se ajusta con UPDATE condicionales atómicos
+    (``Product.reserve_stock``), por lo que dos peticiones concurrentes no
+    pueden vender las mismas unidades; si un producto no tiene stock
+    suficiente se lanza ``ValidationError`` y el llamador deshace la
+    transacción. ``released`` indica, por producto, las cantidades de los
+    items que se van a sustituir y que vuelven al stock. Los items devueltos
+    no se guardan: se confirman junto con la factura en una sola transacción.
+    """
+    items_data = _load(invoice_items_schema, items_data, partial=('invoice_id', 'price'))
+    released = released or {}
+    product_ids = {item_data['product_id'] for item_data in items_data}
+    products = {
+        product.id: product
+        for product in Product.query.filter(Product.id.in_(product_ids)).all()
+    } if product_ids else {}
+    
+    # Cantidad total pedida por producto (un producto puede repetirse)
+    requested = defaultdict(int)
+    for item_data in items_data:
+        if item_data['product_id'] not in products:
+            raise ValidationError(f"Producto con ID {item_data['product_id']} no encontrado")
+        requested[item_data['product_id']] += item_data['quantity']
+    
+    # Aplicar solo la diferencia neta por producto, en orden de ID para que
+    # las transacciones concurrentes bloqueen las filas en el mismo orden
+    for product_id in sorted(set(requested) | set(released)):
+        delta = requested.get(product_id, 0) - released.get(product_id, 0)
+        if delta > 0 and not Product.reserve_stock(product_id, delta):
+            raise ValidationError(f"Stock insuficiente para el producto {products[product_id].name}")
+        if delta < 0:
+            Product.release_stock(product_id, -delta)
+    
+    # Usar el precio del producto si no se especifica
+    return [
+        InvoiceItem(
+            product_id=item_data['product_id'],
+            quantity=item_data['quantity'],
+            price=item_data.get('price', products[item_data['product_id']].price)
+        ) for item_data in items_data
+    ]
+
+def _export_filters(statement):
+    """Aplicar los filtros ``start``, ``end`` y ``status`` de la exportación."""
+    start = get_date_arg('start')
+    end = get_date_arg('end')
+    status = request.args.get('status')
+    if start and end and start > end:
+        raise ValidationError("La fecha 'start' no puede ser posterior a 'end'")
+    if status and status not in INVOICE_STATUSES:
+        raise ValidationError(f"El parámetro 'status' debe ser uno de: {', '.join(INVOICE_STATUSES)}")
+    
+    if start:
+        statement = statement.where(Invoice.date >= datetime.combine(start, time.min))
+    if end:
+        statement = statement.where(Invoice.date < datetime.combine(end + timedelta(days=1), time.min))
+    if status:
+        statement = statement.where(Invoice.status == status)
+    return statement
+
+def _related_tags(data):
+    """Etiquetas de caché del cliente y los productos anidados en una factura."""
+    tags = [Customer.cache_tag(data['customer']['id'])] if data.get('customer') else []
+    return tags + [Product.cache_tag(item['product_id']) for item in data.get('items', [])]
+
 # Rutas del API
 @ns.route('/')
 class InvoiceList(Resource):
     """Endpoints para listar y crear facturas."""
     
-    @ns.doc('list_invoices')
+    @ns.doc('list_invoices', params={**pagination_params, **projection_params, **filter_params(Invoice)})
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de paginación o filtros inválidos')
+    @conditional(lambda: page_state(Invoice, related=Invoice.related_updated_at))
     def get(self):
-        """Listar todas las facturas."""
+        """Listar facturas paginadas por cursor."""
         try:
-            invoices = Invoice.get_all()
-            result = invoices_schema.dump(invoices)
-            return {'success': True, 'data': result}, 200
+            after, limit = get_pagination_args()
+            projection = get_projection(invoices_schema)
+            invoices, next_cursor = Invoice.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Invoice),
+                query=Invoice.query.options(*projection.options(Invoice)).filter(*get_filter_args(Invoice))
+            )
+            result = projection.dump(invoices)
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
     
@@ -81,72 +182,112 @@ class InvoiceList(Resource):
     @ns.response(201, 'Factura creada')
     @ns.response(400, 'Error de validación')
     def post(self):
-        """Crear una nueva factura."""
+        """Crear una nueva factura con sus items en una sola transacción."""
         try:
             # Validar datos de entrada
-            data = request.json
-            errors = invoice_schema.validate(data)
-            if errors:
-                raise ValidationError(str(errors))
+            data = _load(invoice_schema, request.json)
             
             # Verificar si existe el cliente
             customer = Customer.get_by_id(data['customer_id'])
             if not customer:
                 raise ValidationError(f"Cliente con ID {data['customer_id']} no encontrado")
             
-            # Crear una copia de los datos de items antes de eliminarlos del dict principal
+            # Crear la factura con sus items y reservar el stock
             items_data = data.pop('items_data', [])
-            
-            # Crear factura
             invoice = Invoice(**data)
-            invoice.save()
-            
-            # Crear items de la factura
-            for item_data in items_data:
-                product = Product.get_by_id(item_data['product_id'])
-                if not product:
-                    raise ValidationError(f"Producto con ID {item_data['product_id']} no encontrado")
-                
-                # Usar el precio del producto si no se especifica
-                if 'price' not in item_data:
-                    item_data['price'] = product.price
-                
-                # Crear item
-                item = InvoiceItem(invoice_id=invoice.id, **item_data)
-                item.save()
-                
-                # Actualizar stock del producto
-                new_stock = product.stock - item_data['quantity']
-                if new_stock < 0:
-                    raise ValidationError(f"Stock insuficiente para el producto {product.name}")
-                product.update(stock=new_stock)
-            
-            # Calcular el total de la factura
+            invoice.items = _build_items(items_data)
             invoice.calculate_total()
+            db.session.add(invoice)
             
+            # Actualizar el resumen diario de ventas y confirmar todo a la vez
+            db.session.flush()
+            DailySales.add_invoice(invoice)
+            db.session.commit()
+            
+            invoice = Invoice.get_with_details(invoice.id)
             return {'success': True, 'data': invoice_schema.dump(invoice)}, 201
         except ValidationError as e:
+            db.session.rollback()
             raise e
         except Exception as e:
+            db.session.rollback()
             raise DatabaseError(str(e))
 
+@ns.route('/export')
+@ns.response(400, 'Parámetros inválidos')
+class InvoiceExport(Resource):
+    """Exportación en streaming de facturas."""
+    
+    @ns.doc('export_invoices', params=export_params)
+    def get(self):
+        """Exportar las facturas en CSV o NDJSON (una fila por factura)."""
+        fmt = get_export_format()
+        statement = _export_filters(
+            select(
+                Invoice.id,
+                Invoice.invoice_number,
+                Invoice.date,
+                Invoice.customer_id,
+                Customer.name.label('customer_name'),
+                Invoice.status,
+                Invoice.total,
+                Invoice.due_date,
+                Invoice.payment_date,
+            )
+            .join(Customer, Invoice.customer_id == Customer.id)
+            .order_by(Invoice.id)
+        )
+        return stream_export(statement, 'invoices', fmt)
+
+@ns.route('/items/export')
+@ns.response(400, 'Parámetros inválidos')
+class InvoiceItemExport(Resource):
+    """Exportación en streaming de líneas de factura."""
+    
+    @ns.doc('export_invoice_items', params=export_params)
+    def get(self):
+        """Exportar las líneas de factura en CSV o NDJSON (una fila por item)."""
+        fmt = get_export_format()
+        statement = _export_filters(
+            select(
+                InvoiceItem.id,
+                InvoiceItem.invoice_id,
+                Invoice.invoice_number,
+                Invoice.date,
+                Invoice.status,
+                InvoiceItem.product_id,
+                Product.name.label('product_name'),
+                InvoiceItem.quantity,
+                InvoiceItem.price,
+                (InvoiceItem.quantity * InvoiceItem.price).label('subtotal'),
+            )
+            .join(Invoice, InvoiceItem.invoice_id == Invoice.id)
+            .join(Product, InvoiceItem.product_id == Product.id)
+            .order_by(InvoiceItem.id)
+        )
+        return stream_export(statement, 'invoice_items', fmt)
+
 @ns.route('/<int:id>')
 @ns.response(404, 'Factura no encontrada')
 @ns.param('id', 'ID de la factura')
 class InvoiceResource(Resource):
     """Endpoints para obtener, actualizar y eliminar una factura específica."""
     
-    @ns.doc('get_invoice')
+    @ns.doc('get_invoice', params=projection_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de proyección inválidos')
+    @conditional(lambda id: record_state(Invoice, id, related=Invoice.related_updated_at))
+    @cached('invoice:{id}', related=_related_tags)
     def get(self, id):
         """Obtener una factura por su ID."""
         try:
-            invoice = Invoice.get_by_id(id)
+            projection = get_projection(invoice_schema)
+            invoice = Invoice.get_by_id(id, projection.options(Invoice))
             if not invoice:
                 raise NotFoundError(f"Factura con ID {id} no encontrada")
             
-            return {'success': True, 'data': invoice_schema.dump(invoice)}, 200
-        except NotFoundError as e:
+            return {'success': True, 'data': projection.dump(invoice)}, 200
+        except (NotFoundError, ValidationError) as e:
             raise e
         except Exception as e:
             raise DatabaseError(str(e))
@@ -155,18 +296,15 @@ class InvoiceResource(Resource):
     @ns.expect(invoice_input_model)
     @ns.response(200, 'Factura actualizada')
     def put(self, id):
-        """Actualizar una factura."""
+        """Actualizar una factura en una sola transacción."""
         try:
             # Obtener factura
-            invoice = Invoice.get_by_id(id)
+            invoice = Invoice.get_with_details(id)
             if not invoice:
                 raise NotFoundError(f"Factura con ID {id} no encontrada")
             
             # Validar datos de entrada
-            data = request.json
-            errors = invoice_schema.validate(data)
-            if errors:
-                raise ValidationError(str(errors))
+            data = _load(invoice_schema, request.json)
             
             # Verificar si existe el cliente si se está actualizando
             if 'customer_id' in data:
@@ -177,36 +315,34 @@ class InvoiceResource(Resource):
             # Copiar y eliminar items_data si existe
             items_data = data.pop('items_data', None)
             
+            # Descontar la factura del resumen diario antes de modificarla
+            DailySales.remove_invoice(invoice)
+            
             # Actualizar factura
-            invoice.update(**data)
+            for key, value in data.items():
+                setattr(invoice, key, value)
             
-            # Si se proporcionan nuevos items, eliminar los anteriores y crear nuevos
+            # Si se proporcionan nuevos items, sustituir los anteriores
+            # devolviendo su stock y reservando el de los nuevos
             if items_data is not None:
-                # Eliminar items actuales
+                released = defaultdict(int)
                 for item in invoice.items:
-                    item.delete()
-                
-                # Crear nuevos items
-                for item_data in items_data:
-                    product = Product.get_by_id(item_data['product_id'])
-                    if not product:
-                        raise ValidationError(f"Producto con ID {item_data['product_id']} no encontrado")
-                    
-                    # Usar el precio del producto si no se especifica
-                    if 'price' not in item_data:
-                        item_data['price'] = product.price
-                    
-                    # Crear item
-                    item = InvoiceItem(invoice_id=invoice.id, **item_data)
-                    item.save()
-                
-                # Recalcular el total
+                    released[item.product_id] += item.quantity
+                invoice.items = _build_items(items_data, released=released)
                 invoice.calculate_total()
             
+            # Volver a sumar la factura al resumen diario y confirmar
+            db.session.flush()
+            DailySales.add_invoice(invoice)
+            db.session.commit()
+            
+            invoice = Invoice.get_with_details(id)
             return {'success': True, 'data': invoice_schema.dump(invoice)}, 200
         except (NotFoundError, ValidationError) as e:
+            db.session.rollback()
             raise e
         except Exception as e:
+            db.session.rollback()
             raise DatabaseError(str(e))
     
     @ns.doc('delete_invoice')
@@ -218,6 +354,7 @@ class InvoiceResource(Resource):
             if not invoice:
                 raise NotFoundError(f"Factura con ID {id} no encontrada")
             
+            DailySales.remove_invoice(invoice)
             invoice.delete()
             
             return {'success': True, 'message': f"Factura con ID {id} eliminada"}, 200
@@ -232,8 +369,10 @@ class InvoiceResource(Resource):
 class InvoiceItemList(Resource):
     """Endpoints para listar y añadir items a una factura."""
     
-    @ns.doc('list_invoice_items')
+    @ns.doc('list_invoice_items', params=projection_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de proyección inválidos')
+    @conditional(lambda id: record_state(Invoice, id, related=Invoice.related_updated_at))
     def get(self, id):
         """Listar todos los items de una factura."""
         try:
@@ -241,10 +380,11 @@ class InvoiceItemList(Resource):
             if not invoice:
                 raise NotFoundError(f"Factura con ID {id} no encontrada")
             
-            items = invoice.items
-            result = invoice_items_schema.dump(items)
+            projection = get_projection(invoice_items_schema)
+            items = InvoiceItem.query.options(*projection.options(InvoiceItem)).filter_by(invoice_id=id).all()
+            result = projection.dump(items)
             return {'success': True, 'data': result}, 200
-        except NotFoundError as e:
+        except (NotFoundError, ValidationError) as e:
             raise e
         except Exception as e:
             raise DatabaseError(str(e))
@@ -254,45 +394,32 @@ class InvoiceItemList(Resource):
     @ns.response(201, 'Item añadido')
     @ns.response(400, 'Error de validación')
     def post(self, id):
-        """Añadir un nuevo item a una factura."""
+        """Añadir un nuevo item a una factura en una sola transacción."""
         try:
             # Obtener factura
-            invoice = Invoice.get_by_id(id)
+            invoice = Invoice.get_with_details(id)
             if not invoice:
                 raise NotFoundError(f"Factura con ID {id} no encontrada")
             
-            # Validar datos de entrada
-            data = request.json
-            data['invoice_id'] = id
-            errors = invoice_item_schema.validate(data)
-            if errors:
-                raise ValidationError(str(errors))
-            
-            # Verificar si existe el producto
-            product = Product.get_by_id(data['product_id'])
-            if not product:
-                raise ValidationError(f"Producto con ID {data['product_id']} no encontrado")
-            
-            # Usar el precio del producto si no se especifica
-            if 'price' not in data:
-                data['price'] = product.price
-            
-            # Verificar stock
-            if product.stock < data['quantity']:
-                raise ValidationError(f"Stock insuficiente para el producto {product.name}")
-            
-            # Actualizar stock
-            product.update(stock=product.stock - data['quantity'])
+            # Descontar la factura del resumen diario antes de cambiar su total
+            DailySales.remove_invoice(invoice)
             
-            # Crear item
-            item = InvoiceItem(**data)
-            item.save()
+            # Validar datos, reservar stock y crear el item
+            data = dict(request.json or {}, invoice_id=id)
+            item = _build_items([data])[0]
+            invoice.items.append(item)
             
-            # Recalcular el total de la factura
+            # Recalcular el total de la factura y actualizar el resumen diario
             invoice.calculate_total()
+            db.session.flush()
+            DailySales.add_invoice(invoice)
+            db.session.commit()
             
+            item = InvoiceItem.query_with_product().filter_by(id=item.id).first()
             return {'success': True, 'data': invoice_item_schema.dump(item)}, 201
         except (NotFoundError, ValidationError) as e:
+            db.session.rollback()
             raise e
         except Exception as e:
-            raise DatabaseError(str(e)) 
\ No newline at end of file
+            db.session.rollback()
+            raise DatabaseError(str(e))
\ No newline at end of file
@@ -4,10 +4,17 @@ API para gestionar productos.
 
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from models import Product, Supplier
+from models.base import db
 from schemas.product_schema import product_schema, products_schema
+from utils.cache import cached
+from utils.conditional import conditional, record_state, page_state
 from utils.errors import NotFoundError, ValidationError, DatabaseError
+from utils.bulk import bulk_import, bulk_params
+from utils.filters import get_filter_args, get_sort_arg, filter_params
+from utils.pagination import get_pagination_args, pagination_metadata, pagination_params
+from utils.projection import get_projection, projection_params
 
 # Crear namespace
 ns = Namespace('products', description='Operaciones con productos')
@@ -36,19 +43,36 @@ product_input_model = ns.model('ProductInput', {
     'supplier_id': fields.Integer(required=True, description='ID del proveedor')
 })
 
+def _related_tags(data):
+    """Etiqueta de caché del proveedor anidado en un producto."""
+    return [Supplier.cache_tag(data['supplier']['id'])] if data.get('supplier') else []
+
 # Rutas del API
 @ns.route('/')
 class ProductList(Resource):
     """Endpoints para listar y crear productos."""
     
-    @ns.doc('list_products')
+    @ns.doc('list_products', params={**pagination_params, **projection_params, **filter_params(Product)})
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de paginación o filtros inválidos')
+    @conditional(lambda: page_state(Product, related=Product.related_updated_at))
     def get(self):
-        """Listar todos los productos."""
+        """Listar productos paginados por cursor."""
         try:
-            products = Product.get_all()
-            result = products_schema.dump(products)
-            return {'success': True, 'data': result}, 200
+            after, limit = get_pagination_args()
+            projection = get_projection(products_schema)
+            products, next_cursor = Product.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Product),
+                query=Product.query.options(*projection.options(Product)).filter(*get_filter_args(Product))
+            )
+            result = projection.dump(products)
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
     
@@ -86,17 +110,21 @@ class ProductList(Resource):
 class ProductResource(Resource):
     """Endpoints para obtener, actualizar y eliminar un producto específico."""
     
-    @ns.doc('get_product')
+    @ns.doc('get_product', params=projection_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de proyección inválidos')
+    @conditional(lambda id: record_state(Product, id, related=Product.related_updated_at))
+    @cached('product:{id}', related=_related_tags)
     def get(self, id):
         """Obtener un producto por su ID."""
         try:
-            product = Product.get_by_id(id)
+            projection = get_projection(product_schema)
+            product = Product.get_by_id(id, projection.options(Product))
             if not product:
                 raise NotFoundError(f"Producto con ID {id} no encontrado")
             
-            return {'success': True, 'data': product_schema.dump(product)}, 200
-        except NotFoundError as e:
+            return {'success': True, 'data': projection.dump(product)}, 200
+        except (NotFoundError, ValidationError) as e:
             raise e
         except Exception as e:
             raise DatabaseError(str(e))
@@ -147,6 +175,9 @@ class ProductResource(Resource):
             return {'success': True, 'message': f"Producto con ID {id} eliminado"}, 200
         except NotFoundError as e:
             raise e
+        except IntegrityError:
+            db.session.rollback()
+            raise ValidationError(f"El producto con ID {id} tiene líneas de factura asociadas y no se puede eliminar")
         except Exception as e:
             raise DatabaseError(str(e))
 
@@ -154,14 +185,49 @@ class ProductResource(Resource):
 class LowStockProductList(Resource):
     """Endpoint para listar productos con stock bajo."""
     
-    @ns.doc('list_low_stock_products')
+    @ns.doc('list_low_stock_products', params={**pagination_params, **projection_params, **filter_params(Product)})
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de paginación o filtros inválidos')
+    @conditional(lambda: page_state(
+        Product, Product.stock < Product.LOW_STOCK_THRESHOLD, related=Product.related_updated_at
+    ))
     def get(self):
         """Listar productos con stock bajo (menos de 10 unidades)."""
         try:
             # Filtrar productos con stock menor a 10
-            products = Product.query.filter(Product.stock < 10).all()
-            result = products_schema.dump(products)
-            return {'success': True, 'data': result}, 200
+            after, limit = get_pagination_args()
+            projection = get_projection(products_schema)
+            products, next_cursor = Product.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Product),
+                query=Product.query.options(*projection.options(Product)).filter(
+                    Product.stock < Product.LOW_STOCK_THRESHOLD, *get_filter_args(Product)
+                )
+            )
+            result = projection.dump(products)
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except ValidationError as e:
+            raise e
+        except Exception as e:
+            raise DatabaseError(str(e))
+
+@ns.route('/bulk')
+class ProductBulk(Resource):
+    """Endpoint para la importación masiva de productos."""
+    
+    @ns.doc('bulk_import_products', params=bulk_params)
+    @ns.response(201, 'Importación procesada (con errores por fila si los hay)')
+    @ns.response(400, 'Formato de entrada inválido')
+    def post(self):
+        """Importar productos desde un array JSON, NDJSON o CSV."""
+        try:
+            result = bulk_import(Product, products_schema, references={'supplier_id': Supplier})
+            return {'success': result['error_count'] == 0, 'data': result}, 201
+        except ValidationError as e:
+            raise e
         except Exception as e:
-            raise DatabaseError(str(e)) 
\ No newline at end of file
+            db.session.rollback()
+            raise DatabaseError(str(e))
\ No newline at end of file
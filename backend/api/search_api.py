@@ -0,0 +1,105 @@
+"""
+API de búsqueda de texto completo.
+"""
+
+from collections import defaultdict
+from flask import request, current_app
+from flask_restx import Namespace, Resource
+from models.base import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from schemas.customer_schema import customers_schema
+from schemas.product_schema import ProductSchema
+from schemas.supplier_schema import suppliers_schema
+from utils.errors import ValidationError, DatabaseError
+from utils.params import get_int_arg
+from utils.search import SEARCH_MODELS, search, search_terms
+
+# Crear namespace
+ns = Namespace('search', description='Búsqueda de clientes, productos y proveedores')
+
+# Esquema de cada tipo de resultado (sin relaciones anidadas)
+SEARCH_SCHEMAS = {
+    'customer': customers_schema,
+    'product': ProductSchema(many=True, exclude=('supplier',)),
+    'supplier': suppliers_schema,
+}
+
+search_params = {
+    'q': 'Texto a buscar; se buscan palabras completas y, si no hay ninguna coincidencia, la última como prefijo',
+    'type': f"Tipos de registro separados por comas ({', '.join(SEARCH_SCHEMAS)}; por defecto, todos)",
+    'offset': 'Número de resultados a saltar',
+    'limit': f'Número de resultados (por defecto {DEFAULT_PAGE_SIZE}, máximo {MAX_PAGE_SIZE})'
+}
+
+def _get_models():
+    """Modelos pedidos en el parámetro ``type``."""
+    models = {model.__table__.name: model for model in SEARCH_MODELS}
+    value = request.args.get('type')
+    if not value:
+        return SEARCH_MODELS
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in models]
+    if unknown:
+        raise ValidationError(f"Tipos de búsqueda desconocidos: {', '.join(unknown)}")
+    return tuple(model for name, model in models.items() if name in names)
+
+def _serialize(hits):
+    """Cargar los registros encontrados (una consulta por tipo) y serializarlos."""
+    ids = defaultdict(list)
+    for model, id, _ in hits:
+        ids[model].append(id)
+    records = {}
+    for model, model_ids in ids.items():
+        name = model.__table__.name
+        rows = model.query.filter(model.id.in_(model_ids)).all()
+        records.update(
+            ((name, row['id']), row) for row in SEARCH_SCHEMAS[name].dump(rows)
+        )
+    return [
+        {
+            'type': model.__table__.name,
+            'id': id,
+            'score': round(score, 4),
+            'data': records[(model.__table__.name, id)]
+        }
+        for model, id, score in hits if (model.__table__.name, id) in records
+    ]
+
+@ns.route('/')
+class Search(Resource):
+    """Endpoint de búsqueda."""
+    
+    @ns.doc('search', params=search_params)
+    @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de búsqueda inválidos')
+    def get(self):
+        """Buscar clientes, productos y proveedores ordenados por relevancia."""
+        try:
+            terms = search_terms(request.args.get('q', ''))
+            if not terms:
+                raise ValidationError("El parámetro 'q' es obligatorio")
+            models = _get_models()
+            offset = get_int_arg('offset', 0)
+            limit = get_int_arg('limit', DEFAULT_PAGE_SIZE)
+            if limit < 1:
+                raise ValidationError("El parámetro 'limit' debe ser mayor que cero")
+            limit = min(limit, MAX_PAGE_SIZE)
+            
+            hits, has_next, truncated = search(terms, models, offset, limit)
+            return {
+                'success': True,
+                'data': _serialize(hits),
+                'metadata': {
+                    'pagination': {
+                        'offset': offset,
+                        'limit': limit,
+                        'next_offset': offset + limit if has_next else None,
+                        'has_next': has_next,
+                        'truncated': truncated
+                    },
+                    'backend': current_app.extensions['search_backend']
+                }
+            }, 200
+        except ValidationError as e:
+            raise e
+        except Exception as e:
+            raise DatabaseError(str(e))
@@ -4,10 +4,17 @@ API para gestionar proveedores.
 
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from models import Supplier
+from models.base import db
 from schemas.supplier_schema import supplier_schema, suppliers_schema
+from utils.cache import cached
+from utils.conditional import conditional, record_state, page_state
 from utils.errors import NotFoundError, ValidationError, DatabaseError
+from utils.bulk import bulk_import, bulk_params
+from utils.filters import get_filter_args, get_sort_arg, filter_params
+from utils.pagination import get_pagination_args, pagination_metadata, pagination_params
+from utils.projection import get_projection, projection_params
 
 # Crear namespace
 ns = Namespace('suppliers', description='Operaciones con proveedores')
@@ -41,14 +48,27 @@ supplier_input_model = ns.model('SupplierInput', {
 class SupplierList(Resource):
     """Endpoints para listar y crear proveedores."""
     
-    @ns.doc('list_suppliers')
+    @ns.doc('list_suppliers', params={**pagination_params, **projection_params, **filter_params(Supplier)})
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de paginación o filtros inválidos')
+    @conditional(lambda: page_state(Supplier))
     def get(self):
-        """Listar todos los proveedores."""
+        """Listar proveedores paginados por cursor."""
         try:
-            suppliers = Supplier.get_all()
-            result = suppliers_schema.dump(suppliers)
-            return {'success': True, 'data': result}, 200
+            after, limit = get_pagination_args()
+            projection = get_projection(suppliers_schema)
+            suppliers, next_cursor = Supplier.paginate(
+                after=after, limit=limit, sort=get_sort_arg(Supplier),
+                query=Supplier.query.options(*projection.options(Supplier)).filter(*get_filter_args(Supplier))
+            )
+            result = projection.dump(suppliers)
+            return {
+                'success': True,
+                'data': result,
+                'metadata': pagination_metadata(next_cursor, limit)
+            }, 200
+        except ValidationError as e:
+            raise e
         except Exception as e:
             raise DatabaseError(str(e))
     
@@ -81,17 +101,21 @@ class SupplierList(Resource):
 class SupplierResource(Resource):
     """Endpoints para obtener, actualizar y eliminar un proveedor específico."""
     
-    @ns.doc('get_supplier')
+    @ns.doc('get_supplier', params=projection_params)
     @ns.response(200, 'Éxito')
+    @ns.response(400, 'Parámetros de proyección inválidos')
+    @conditional(lambda id: record_state(Supplier, id))
+    @cached('supplier:{id}')
     def get(self, id):
         """Obtener un proveedor por su ID."""
         try:
-            supplier = Supplier.get_by_id(id)
+            projection = get_projection(supplier_schema)
+            supplier = Supplier.get_by_id(id, projection.options(Supplier))
             if not supplier:
                 raise NotFoundError(f"Proveedor con ID {id} no encontrado")
             
-            return {'success': True, 'data': supplier_schema.dump(supplier)}, 200
-        except NotFoundError as e:
+            return {'success': True, 'data': projection.dump(supplier)}, 200
+        except (NotFoundError, ValidationError) as e:
             raise e
         except Exception as e:
             raise DatabaseError(str(e))
@@ -136,5 +160,26 @@ class SupplierResource(Resource):
             return {'success': True, 'message': f"Proveedor con ID {id} eliminado"}, 200
         except NotFoundError as e:
             raise e
+        except IntegrityError:
+            db.session.rollback()
+            raise ValidationError(f"El proveedor con ID {id} tiene productos asociados y no se puede eliminar")
+        except Exception as e:
+            raise DatabaseError(str(e))
+
+@ns.route('/bulk')
+class SupplierBulk(Resource):
+    """Endpoint para la importación masiva de proveedores."""
+    
+    @ns.doc('bulk_import_suppliers', params=bulk_params)
+    @ns.response(201, 'Importación procesada (con errores por fila si los hay)')
+    @ns.response(400, 'Formato de entrada inválido')
+    def post(self):
+        """Importar proveedores desde un array JSON, NDJSON o CSV."""
+        try:
+            result = bulk_import(Supplier, suppliers_schema, unique=('email',))
+            return {'success': result['error_count'] == 0, 'data': result}, 201
+        except ValidationError as e:
+            raise e
         except Exception as e:
-            raise DatabaseError(str(e)) 
\ No newline at end of file
+            db.session.rollback()
+            raise DatabaseError(str(e))
\ No newline at end of file
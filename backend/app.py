@@ -4,11 +4,19 @@ Este archivo inicializa la aplicación Flask y configura sus componentes.
 """
 
 import os
+import click
 from flask import Flask
 from flask_cors import CORS
+from flask_migrate import Migrate
 from dotenv import load_dotenv
 from models.base import db
 from api import register_blueprints
+from utils.cache import init_cache
+from utils.database import init_database_config
+from utils.profiling import init_profiling
+from utils.replica import init_replica
+from utils.search import init_search
+from utils.sqlite import init_sqlite
 
 # Cargar variables de entorno
 load_dotenv()
@@ -24,6 +32,33 @@ def create_app(test_config=None):
         SQLALCHEMY_DATABASE_URI=os.environ.get('SQLALCHEMY_DATABASE_URI', 
                                               'sqlite:///' + os.path.join(app.instance_path, 'salesnexus.db')),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        RESTX_ERROR_404_HELP=False,
+        BULK_CHUNK_SIZE=int(os.environ.get('BULK_CHUNK_SIZE', 1000)),
+        CACHE_TYPE=os.environ.get('CACHE_TYPE', 'SimpleCache'),
+        CACHE_DEFAULT_TIMEOUT=int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300)),
+        CACHE_REDIS_URL=os.environ.get('CACHE_REDIS_URL'),
+        JSON_ORJSON=os.environ.get('JSON_ORJSON', 'False').lower() in ('true', '1', 't'),
+        SQLITE_PROFILE=os.environ.get('SQLITE_PROFILE', 'production'),
+        SQLITE_PRAGMAS={},
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE', 10)),
+        DB_MAX_OVERFLOW=int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        DB_POOL_TIMEOUT=int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        DB_POOL_RECYCLE=int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        DB_POOL_PRE_PING=os.environ.get('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't'),
+        SQLALCHEMY_REPLICA_URI=os.environ.get('SQLALCHEMY_REPLICA_URI'),
+        REPLICA_NAMESPACES=('dashboard', 'customers', 'products', 'suppliers', 'invoices'),
+        REPLICA_STICKY_SECONDS=int(os.environ.get('REPLICA_STICKY_SECONDS', 5)),
+        # El lote del dashboard (/api/dashboard/batch) espera a sus hilos y no se sirve en el bucle
+        ASYNC_PATHS=('/api/dashboard/overview', '/api/dashboard/stats', '/api/dashboard/sales-*',
+                     '/api/dashboard/top-products', '/api/dashboard/recent-invoices',
+                     '/api/dashboard/activities', '/api/dashboard/customer-statistics',
+                     '/api/customers/', '/api/suppliers/', '/api/products/',
+                     '/api/products/low-stock', '/api/invoices/'),
+        ASYNC_WSGI_THREADS=int(os.environ.get('ASYNC_WSGI_THREADS', 10)),
+        FANOUT_WORKERS=int(os.environ.get('FANOUT_WORKERS', 4)),
+        DASHBOARD_WIDGET_TIMEOUT_MS=int(os.environ.get('DASHBOARD_WIDGET_TIMEOUT_MS', 5000)),
+        PROFILING=os.environ.get('PROFILING', 'False').lower() in ('true', '1', 't'),
+        PROFILING_N_PLUS_ONE_THRESHOLD=int(os.environ.get('PROFILING_N_PLUS_ONE_THRESHOLD', 10)),
     )
     
     # Asegurar que la carpeta instance existe
@@ -40,17 +75,43 @@ def create_app(test_config=None):
     
     # Configurar CORS
     cors_origins = os.environ.get('CORS_ORIGINS', '*').split(',')
-    CORS(app, resources={r"/api/*": {"origins": cors_origins}}, supports_credentials=True)
+    CORS(app, resources={r"/api/*": {"origins": cors_origins}}, supports_credentials=True,
+         expose_headers=['ETag', 'Last-Modified', 'X-Cache', 'Server-Timing'])
     
-    # Inicializar la base de datos
+    # Inicializar la base de datos, las migraciones (Alembic) y la caché
+    init_database_config(app)
     db.init_app(app)
+    init_sqlite(app)
+    init_replica(app)
+    init_profiling(app)
+    Migrate(app, db)
+    init_cache(app)
     
     # Registrar blueprints
     register_blueprints(app)
     
-    # Crear todas las tablas
+    # Crear todas las tablas y el índice de búsqueda
     with app.app_context():
         db.create_all()
+    init_search(app)
+    
+    @app.cli.command('rebuild-daily-sales')
+    def rebuild_daily_sales_command():
+        """Recalcular el resumen diario de ventas a partir de las facturas."""
+        from models import DailySales
+        days = DailySales.rebuild()
+        click.echo(f"Resumen diario de ventas reconstruido: {days} días")
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Reconstruir el índice de búsqueda de texto completo."""
+        from utils.search import create_search_index, fts5_available
+        with db.engine.begin() as connection:
+            if not fts5_available(connection):
+                click.echo("El motor de base de datos no admite FTS5; se usa la búsqueda con LIKE")
+                return
+            tables = create_search_index(connection, rebuild=True)
+        click.echo(f"Índice de búsqueda reconstruido: {tables} tablas")
     
     @app.route('/health')
     def health_check():
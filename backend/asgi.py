@@ -0,0 +1,10 @@
+"""
+Punto de entrada ASGI (modo asíncrono, ver ``utils.asgi``).
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+from app import create_app
+from utils.asgi import create_asgi_app
+
+app = create_asgi_app(create_app())
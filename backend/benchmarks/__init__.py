@@ -0,0 +1,6 @@
+"""
+Benchmarks y generación de datos sintéticos para el backend.
+
+Los scripts se ejecutan como módulos desde el directorio ``backend/``,
+por ejemplo ``python -m benchmarks.bench_indexes``.
+"""
@@ -0,0 +1,177 @@
+"""
+Benchmark de escalado con conexiones simultáneas: modo asíncrono frente a hilos.
+
+Sirve la aplicación con uvicorn (``utils.asgi``) de dos maneras sobre el
+mismo conjunto de datos: ``threads``, con todas las peticiones en el pool de
+``--threads`` hilos WSGI (``ASYNC_PATHS`` vacío), y ``async``, con los
+endpoints del dashboard y los listados atendidos en el bucle de eventos con
+el engine asíncrono. Para cada nivel de ``--concurrency`` lanza
+``--requests`` GET repartidos entre esos endpoints y guarda p50, p99 y
+peticiones por segundo. Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_async --latency-ms 20 --output async.json
+
+La caché de respuestas se desactiva para que cada petición llegue a la base
+de datos. SQLite local responde en microsegundos, así que el modo asíncrono
+solo le añade coste; ``--latency-ms`` simula la espera de red de un servidor
+de base de datos añadiendo ese retardo a cada consulta (``time.sleep`` en el
+engine síncrono y ``asyncio.sleep`` en el asíncrono).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import uvicorn
+from sqlalchemy import event, select, func
+from sqlalchemy.util import await_only
+from app import create_app
+from models import Invoice
+from models.base import db
+from utils.asgi import create_asgi_app
+from benchmarks import datagen
+from benchmarks.bench_endpoints import summarize, _git_revision
+
+PATHS = [
+    '/api/dashboard/stats',
+    '/api/dashboard/overview',
+    '/api/dashboard/recent-invoices',
+    '/api/customers/?limit=20',
+    '/api/products/?limit=20',
+    '/api/products/low-stock',
+    '/api/invoices/?limit=20',
+]
+
+def add_latency(app, seconds):
+    """Retrasar ``seconds`` cada consulta de los engines síncrono y asíncronos."""
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: time.sleep(seconds))
+    for engine in app.extensions['async_engines'].values():
+        event.listen(
+            engine.sync_engine, 'before_cursor_execute',
+            lambda *args: await_only(asyncio.sleep(seconds))
+        )
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def serve(asgi):
+    """Servir ``asgi`` con uvicorn en un hilo y devolver el puerto."""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(asgi, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield port
+    finally:
+        server.should_exit = True
+        thread.join()
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(response.split(b' ', 2)[1])
+
+async def run_level(port, requests, concurrency):
+    """Lanzar ``requests`` GET con ``concurrency`` clientes simultáneos."""
+    pending = itertools.islice(itertools.cycle(PATHS), requests)
+    timings, errors = [], 0
+    
+    async def client():
+        nonlocal errors
+        for path in pending:
+            started = time.perf_counter()
+            status = await _get(port, path)
+            timings.append(time.perf_counter() - started)
+            errors += status >= 400
+    
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    result = summarize(timings, time.perf_counter() - started, errors, 0)
+    del result['cache_hits']
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', help='Ruta del fichero SQLite (por defecto, uno temporal)')
+    parser.add_argument('--size', choices=datagen.SIZES, default='small')
+    parser.add_argument('--requests', type=int, default=400, help='Peticiones por nivel de concurrencia')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128],
+                        help='Niveles de clientes simultáneos')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Retardo añadido a cada consulta')
+    parser.add_argument('--threads', type=int, default=10, help='Hilos WSGI (ASYNC_WSGI_THREADS)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    args = parser.parse_args()
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'bench_async.db')
+    config = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path),
+        'CACHE_TYPE': 'NullCache',
+        'ASYNC_WSGI_THREADS': args.threads,
+    }
+    modes = {'threads': {**config, 'ASYNC_PATHS': ()}, 'async': config}
+    
+    results = {}
+    for mode, mode_config in modes.items():
+        app = create_app(mode_config)
+        with app.app_context():
+            if not db.session.execute(select(func.count(Invoice.id))).scalar():
+                print(f"Generando datos ({args.size}) en {path}...")
+                print(f"  {datagen.generate(**datagen.SIZES[args.size], seed=args.seed)}")
+            db.session.remove()
+        asgi = create_asgi_app(app)
+        if args.latency_ms:
+            add_latency(app, args.latency_ms / 1000)
+        
+        print(f"\n{mode}")
+        print(f"{'clientes':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'rps':>10}{'errores':>9}")
+        results[mode] = {}
+        with serve(asgi) as port:
+            for concurrency in args.concurrency:
+                result = asyncio.run(run_level(port, args.requests, concurrency))
+                results[mode][concurrency] = result
+                print(f"{concurrency:>9}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                      f"{result['throughput_rps']:>10.1f}{result['errors']:>9}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'revision': _git_revision(),
+                'database': path,
+                'paths': PATHS,
+                'settings': {
+                    'size': args.size,
+                    'requests': args.requests,
+                    'latency_ms': args.latency_ms,
+                    'threads': args.threads,
+                    'seed': args.seed
+                },
+                'environment': {
+                    'python': platform.python_version(),
+                    'sqlite': sqlite3.sqlite_version,
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count()
+                },
+                'results': results
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""
+Benchmark de latencia y rendimiento de los endpoints de la API.
+
+Genera (o reutiliza) un conjunto de datos con ``datagen`` y pide cada
+endpoint de ``api/`` ``--requests`` veces, primero con el cliente de
+pruebas de Flask (sin red, una petición tras otra) y después contra un
+servidor WSGI real (el de werkzeug, con hilos) con ``--concurrency``
+clientes HTTP. Para cada endpoint se guardan p50, p99, media, peticiones
+por segundo, respuestas con error y aciertos de la caché en un JSON que se
+puede comparar entre versiones. Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_endpoints --size large --output after.json
+    python -m benchmarks.bench_endpoints --compare before.json after.json
+
+Las peticiones son las mismas en cada ejecución con la misma semilla. Las
+escrituras se hacen sobre registros que crea el propio benchmark (los
+``DELETE`` borran los que crearon los ``POST``), así que el conjunto de
+datos no cambia de una ejecución a otra salvo por los importes masivos.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import select, func
+from werkzeug.serving import make_server
+from app import create_app
+from models import Customer, Supplier, Product, Invoice
+from models.base import db
+from benchmarks import datagen
+
+# Rutas de ``api/`` que no son endpoints de la aplicación
+IGNORED_RULES = {'/api/', '/api/docs', '/api/swagger.json'}
+
+class Workload:
+    """Identificadores y datos de las peticiones, elegidos con una semilla."""
+    
+    def __init__(self, max_ids, last_invoice_date, seed):
+        self.rng = random.Random(seed)
+        self.max_ids = max_ids
+        self.export_window = {
+            'start': (last_invoice_date - timedelta(days=7)).date().isoformat(),
+            'end': last_invoice_date.date().isoformat()
+        }
+        self.sequence = itertools.count(1)
+        self.created = defaultdict(list)
+        self.lock = threading.Lock()
+    
+    def id(self, table):
+        """ID de un registro existente del conjunto de datos."""
+        return self.rng.randint(1, self.max_ids[table])
+    
+    def unique(self):
+        """Número distinto en cada llamada, para emails y nombres únicos."""
+        return next(self.sequence)
+    
+    def created_id(self, table, remove=False):
+        """ID de un registro creado por el benchmark (y olvidarlo si ``remove``)."""
+        ids = self.created[table]
+        if remove:
+            return ids.pop()
+        return ids[self.rng.randrange(len(ids))]
+    
+    def remember(self, table, body):
+        """Guardar el ID del registro creado por un ``POST``."""
+        with self.lock:
+            self.created[table].append(json.loads(body)['data']['id'])
+    
+    def customer(self):
+        n = self.unique()
+        return {'name': f"Cliente benchmark {n}", 'email': f"benchmark{n}@ejemplo.com"}
+    
+    def supplier(self):
+        n = self.unique()
+        return {'name': f"Proveedor benchmark {n}", 'email': f"proveedor.benchmark{n}@ejemplo.com"}
+    
+    def product(self):
+        return {
+            'name': f"Producto benchmark {self.unique()}",
+            'price': round(self.rng.uniform(1, 500), 2),
+            'stock': 1000000,
+            'supplier_id': self.id('supplier')
+        }
+
+def _scenario(method, rule, url, body=None, creates=None):
+    return {'method': method, 'rule': rule, 'url': url, 'body': body, 'creates': creates}
+
+# Peticiones por endpoint, en el orden en que se ejecutan. Los ``POST``
+# van antes que los ``PUT`` y ``DELETE`` que usan los registros que crean.
+SCENARIOS = [
+    _scenario('GET', '/api/customers/', lambda w: '/api/customers/'),
+    _scenario('GET', '/api/customers/<int:id>', lambda w: f"/api/customers/{w.id('customer')}"),
+    _scenario('GET', '/api/customers/<int:id>/invoices',
+              lambda w: f"/api/customers/{w.id('customer')}/invoices"),
+    _scenario('GET', '/api/suppliers/', lambda w: '/api/suppliers/'),
+    _scenario('GET', '/api/suppliers/<int:id>', lambda w: f"/api/suppliers/{w.id('supplier')}"),
+    _scenario('GET', '/api/products/', lambda w: '/api/products/?expand=supplier'),
+    _scenario('GET', '/api/products/<int:id>', lambda w: f"/api/products/{w.id('product')}"),
+    _scenario('GET', '/api/products/low-stock', lambda w: '/api/products/low-stock'),
+    _scenario('GET', '/api/invoices/', lambda w: '/api/invoices/?sort=-date'),
+    _scenario('GET', '/api/invoices/<int:id>', lambda w: f"/api/invoices/{w.id('invoice')}"),
+    _scenario('GET', '/api/invoices/<int:id>/items', lambda w: f"/api/invoices/{w.id('invoice')}/items"),
+    _scenario('GET', '/api/invoices/export',
+              lambda w: '/api/invoices/export?start={start}&end={end}'.format(**w.export_window)),
+    _scenario('GET', '/api/invoices/items/export',
+              lambda w: '/api/invoices/items/export?start={start}&end={end}'.format(**w.export_window)),
+    _scenario('GET', '/api/dashboard/overview', lambda w: '/api/dashboard/overview'),
+    _scenario('GET', '/api/dashboard/stats', lambda w: '/api/dashboard/stats'),
+    _scenario('GET', '/api/dashboard/sales-chart', lambda w: '/api/dashboard/sales-chart'),
+    _scenario('GET', '/api/dashboard/top-products', lambda w: '/api/dashboard/top-products'),
+    _scenario('GET', '/api/dashboard/recent-invoices', lambda w: '/api/dashboard/recent-invoices'),
+    _scenario('GET', '/api/dashboard/activities', lambda w: '/api/dashboard/activities'),
+    _scenario('GET', '/api/dashboard/sales-summary', lambda w: '/api/dashboard/sales-summary'),
+    _scenario('GET', '/api/dashboard/sales-by-period', lambda w: '/api/dashboard/sales-by-period'),
+    _scenario('GET', '/api/dashboard/customer-statistics', lambda w: '/api/dashboard/customer-statistics'),
+    _scenario('GET', '/api/search/', lambda w: f"/api/search/?q=cliente+{w.id('customer')}"),
+    _scenario('GET', '/api/cache/stats', lambda w: '/api/cache/stats'),
+    _scenario('POST', '/api/customers/', lambda w: '/api/customers/', lambda w: w.customer(), 'customer'),
+    _scenario('POST', '/api/suppliers/', lambda w: '/api/suppliers/', lambda w: w.supplier(), 'supplier'),
+    _scenario('POST', '/api/products/', lambda w: '/api/products/', lambda w: w.product(), 'product'),
+    _scenario('POST', '/api/invoices/', lambda w: '/api/invoices/', lambda w: {
+        'customer_id': w.id('customer'),
+        'items_data': [{'product_id': w.created_id('product'), 'quantity': w.rng.randint(1, 5)}]
+    }, 'invoice'),
+    _scenario('POST', '/api/invoices/<int:id>/items',
+              lambda w: f"/api/invoices/{w.created_id('invoice')}/items",
+              lambda w: {'product_id': w.created_id('product'), 'quantity': 1}),
+    _scenario('PUT', '/api/customers/<int:id>', lambda w: f"/api/customers/{w.created_id('customer')}",
+              lambda w: w.customer()),
+    _scenario('PUT', '/api/suppliers/<int:id>', lambda w: f"/api/suppliers/{w.created_id('supplier')}",
+              lambda w: w.supplier()),
+    _scenario('PUT', '/api/products/<int:id>', lambda w: f"/api/products/{w.created_id('product')}",
+              lambda w: w.product()),
+    _scenario('PUT', '/api/invoices/<int:id>', lambda w: f"/api/invoices/{w.created_id('invoice')}",
+              lambda w: {'customer_id': w.id('customer'), 'status': w.rng.choice(['paid', 'pending'])}),
+    _scenario('POST', '/api/customers/bulk', lambda w: '/api/customers/bulk',
+              lambda w: [w.customer() for _ in range(100)]),
+    _scenario('POST', '/api/suppliers/bulk', lambda w: '/api/suppliers/bulk',
+              lambda w: [w.supplier() for _ in range(100)]),
+    _scenario('POST', '/api/products/bulk', lambda w: '/api/products/bulk',
+              lambda w: [w.product() for _ in range(100)]),
+    _scenario('DELETE', '/api/invoices/<int:id>',
+              lambda w: f"/api/invoices/{w.created_id('invoice', remove=True)}"),
+    _scenario('DELETE', '/api/products/<int:id>',
+              lambda w: f"/api/products/{w.created_id('product', remove=True)}"),
+    _scenario('DELETE', '/api/suppliers/<int:id>',
+              lambda w: f"/api/suppliers/{w.created_id('supplier', remove=True)}"),
+    _scenario('DELETE', '/api/customers/<int:id>',
+              lambda w: f"/api/customers/{w.created_id('customer', remove=True)}"),
+]
+
+def uncovered_endpoints(app):
+    """Endpoints de ``api/`` (método y ruta) sin escenario en ``SCENARIOS``."""
+    covered = {(scenario['method'], scenario['rule']) for scenario in SCENARIOS}
+    endpoints = {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules()
+        if rule.rule.startswith('/api/') and rule.rule not in IGNORED_RULES
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+    }
+    return sorted(endpoints - covered)
+
+def percentile(values, fraction):
+    """Percentil por el método del rango más cercano."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))]
+
+def summarize(timings, elapsed, errors, cache_hits):
+    """Estadísticas de las latencias (en segundos) de un escenario."""
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'errors': errors,
+        'cache_hits': cache_hits
+    }
+
+def run_test_client(app, workload, requests, warmup):
+    """Pedir cada escenario con el cliente de pruebas de Flask."""
+    client = app.test_client()
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario['method'] == 'GET':
+            for _ in range(warmup):
+                client.get(scenario['url'](workload)).close()
+        
+        timings, errors, cache_hits = [], 0, 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            url = scenario['url'](workload)
+            body = scenario['body'](workload) if scenario['body'] else None
+            request_started = time.perf_counter()
+            response = client.open(url, method=scenario['method'], json=body)
+            data = response.get_data()
+            timings.append(time.perf_counter() - request_started)
+            
+            errors += response.status_code >= 400
+            cache_hits += response.headers.get('X-Cache') == 'HIT'
+            if scenario['creates'] and response.status_code == 201:
+                workload.remember(scenario['creates'], data)
+        results[f"{scenario['method']} {scenario['rule']}"] = summarize(
+            timings, time.perf_counter() - started, errors, cache_hits
+        )
+    return results
+
+def _http_request(port, method, url, body):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        connection.request(method, url, body=None if body is None else json.dumps(body), headers=headers)
+        response = connection.getresponse()
+        return response.status, response.getheader('X-Cache'), response.read()
+    finally:
+        connection.close()
+
+def run_wsgi_server(app, workload, requests, warmup, concurrency):
+    """Pedir cada escenario a un servidor WSGI real con ``concurrency`` clientes."""
+    # Sin el registro de cada petición de werkzeug, que además añadiría su coste
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    results = {}
+    try:
+        for scenario in SCENARIOS:
+            if scenario['method'] == 'GET':
+                for _ in range(warmup):
+                    _http_request(server.port, 'GET', scenario['url'](workload), None)
+            
+            # Las peticiones se preparan antes para que la semilla dé las mismas
+            pending = iter([
+                (scenario['url'](workload), scenario['body'](workload) if scenario['body'] else None)
+                for _ in range(requests)
+            ])
+            lock = threading.Lock()
+            timings, outcomes = [], []
+            
+            def worker():
+                while True:
+                    with lock:
+                        request = next(pending, None)
+                    if request is None:
+                        return
+                    request_started = time.perf_counter()
+                    status, cache, data = _http_request(server.port, scenario['method'], *request)
+                    elapsed = time.perf_counter() - request_started
+                    if scenario['creates'] and status == 201:
+                        workload.remember(scenario['creates'], data)
+                    with lock:
+                        timings.append(elapsed)
+                        outcomes.append((status, cache))
+            
+            workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+            started = time.perf_counter()
+            for client in workers:
+                client.start()
+            for client in workers:
+                client.join()
+            results[f"{scenario['method']} {scenario['rule']}"] = summarize(
+                timings,
+                time.perf_counter() - started,
+                sum(status >= 400 for status, _ in outcomes),
+                sum(cache == 'HIT' for _, cache in outcomes)
+            )
+    finally:
+        server.shutdown()
+        thread.join()
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(before_path, after_path):
+    """Imprimir la variación de p50, p99 y rendimiento entre dos resultados."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    
+    for mode, results in after['results'].items():
+        print(f"\n{mode} ({before['revision']} -> {after['revision']})")
+        print(f"{'endpoint':<42}{'p50 (ms)':>20}{'p99 (ms)':>20}{'rps':>18}")
+        for name, new in results.items():
+            old = before['results'].get(mode, {}).get(name)
+            if old is None:
+                continue
+            columns = ''.join(
+                f"{old[key]:>9.2f}{(new[key] / old[key] - 1) * 100 if old[key] else 0:>+10.1f}%"
+                for key in ('p50_ms', 'p99_ms')
+            )
+            print(f"{name:<42}{columns}{new['throughput_rps']:>10.1f}"
+                  f"{(new['throughput_rps'] / old['throughput_rps'] - 1) * 100:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', help='Ruta del fichero SQLite (por defecto, uno temporal)')
+    parser.add_argument('--size', choices=datagen.SIZES, default='small')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones por endpoint')
+    parser.add_argument('--warmup', type=int, default=5, help='Peticiones previas de los GET')
+    parser.add_argument('--concurrency', type=int, default=8, help='Clientes HTTP simultáneos')
+    parser.add_argument('--mode', choices=['test_client', 'wsgi', 'all'], default='all')
+    parser.add_argument('--no-cache', action='store_true', help='Desactivar la caché de respuestas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DESPUES'),
+                        help='Comparar dos ficheros de resultados en lugar de medir')
+    args = parser.parse_args()
+    
+    if args.compare:
+        compare(*args.compare)
+        return
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'bench_endpoints.db')
+    config = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path)}
+    if args.no_cache:
+        config['CACHE_TYPE'] = 'NullCache'
+    app = create_app(config)
+    
+    with app.app_context():
+        if not db.session.execute(select(func.count(Invoice.id))).scalar():
+            print(f"Generando datos ({args.size}) en {path}...")
+            started = time.perf_counter()
+            print(f"  {datagen.generate(**datagen.SIZES[args.size], seed=args.seed)}"
+                  f" en {time.perf_counter() - started:.1f}s")
+        max_ids = {
+            model.__tablename__: db.session.execute(select(func.max(model.id))).scalar()
+            for model in (Customer, Supplier, Product, Invoice)
+        }
+        last_invoice_date = db.session.execute(select(func.max(Invoice.date))).scalar()
+    
+    missing = uncovered_endpoints(app)
+    if missing:
+        print(f"Endpoints sin escenario: {', '.join(f'{method} {rule}' for method, rule in missing)}")
+    
+    results = {}
+    modes = ['test_client', 'wsgi'] if args.mode == 'all' else [args.mode]
+    for mode in modes:
+        # Cada modo repite las mismas peticiones con la misma semilla
+        workload = Workload(max_ids, last_invoice_date, args.seed)
+        print(f"\n{mode}")
+        if mode == 'test_client':
+            results[mode] = run_test_client(app, workload, args.requests, args.warmup)
+        else:
+            results[mode] = run_wsgi_server(app, workload, args.requests, args.warmup, args.concurrency)
+        
+        print(f"{'endpoint':<42}{'p50 (ms)':>10}{'p99 (ms)':>10}{'rps':>10}{'errores':>9}{'caché':>7}")
+        for name, result in results[mode].items():
+            print(f"{name:<42}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result['throughput_rps']:>10.1f}{result['errors']:>9}{result['cache_hits']:>7}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'revision': _git_revision(),
+                'database': path,
+                'max_ids': max_ids,
+                'settings': {
+                    'size': args.size,
+                    'requests': args.requests,
+                    'warmup': args.warmup,
+                    'concurrency': args.concurrency,
+                    'cache': not args.no_cache,
+                    'seed': args.seed
+                },
+                'environment': {
+                    'python': platform.python_version(),
+                    'sqlite': sqlite3.sqlite_version,
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count()
+                },
+                'uncovered': [f'{method} {rule}' for method, rule in missing],
+                'results': results
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
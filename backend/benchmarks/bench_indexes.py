@@ -0,0 +1,186 @@
+"""
+Benchmark de los índices de consulta.
+
+Mide el plan de ejecución y el tiempo de las consultas del dashboard y de
+la carga de relaciones sin los índices de los modelos y después de
+crearlos. Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_indexes --invoices 1000000 --output indexes.json
+
+Si la base de datos indicada con ``--database`` ya contiene datos, se
+reutiliza en lugar de generar un conjunto nuevo.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, desc, text
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from models import Customer, Product, Invoice, InvoiceItem
+from models.base import db
+from benchmarks import datagen
+
+def build_queries(now):
+    """Consultas a medir, tal y como las emiten los endpoints de la API."""
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    range_start = now - timedelta(days=30)
+    customer_id = db.session.execute(select(func.max(Customer.id))).scalar() // 2
+    invoice_id = db.session.execute(select(func.max(Invoice.id))).scalar() // 2
+    supplier_id = db.session.execute(select(func.min(Product.supplier_id))).scalar()
+    day = func.date(Invoice.date)
+    
+    return {
+        'recent_invoices': select(
+            Invoice.id, Invoice.invoice_number, Invoice.date, Invoice.total, Invoice.status
+        ).order_by(desc(Invoice.date)).limit(5),
+        'recent_invoice_activity': select(Invoice.id).order_by(desc(Invoice.created_at)).limit(3),
+        'recent_customers': select(Customer.id).order_by(desc(Customer.created_at)).limit(3),
+        'new_customers_this_month': select(func.count(Customer.id)).where(
+            Customer.created_at >= month_start
+        ),
+        'customers_with_purchases': select(func.count(Customer.id)).where(
+            select(Invoice.id).where(Invoice.customer_id == Customer.id).exists()
+        ),
+        'customer_invoices': select(Invoice).where(
+            Invoice.customer_id == customer_id
+        ).order_by(Invoice.id).limit(50),
+        'invoice_items': select(InvoiceItem).where(
+            InvoiceItem.invoice_id.in_(range(invoice_id, invoice_id + 50))
+        ),
+        'top_products': select(
+            Product.id,
+            Product.name,
+            func.sum(InvoiceItem.quantity).label('total_sold'),
+            func.sum(InvoiceItem.quantity * InvoiceItem.price).label('total_revenue')
+        ).join(InvoiceItem, InvoiceItem.product_id == Product.id).group_by(
+            Product.id
+        ).order_by(desc('total_sold')).limit(5),
+        'low_stock_products': select(Product.id).where(
+            Product.stock < Product.LOW_STOCK_THRESHOLD
+        ).order_by(Product.id).limit(50),
+        'supplier_products': select(Product.id).where(Product.supplier_id == supplier_id),
+        'sales_last_30_days': select(func.sum(Invoice.total)).where(
+            Invoice.date >= range_start
+        ),
+        'pending_last_30_days': select(func.count(Invoice.id), func.sum(Invoice.total)).where(
+            Invoice.status == 'pending', Invoice.date >= range_start
+        ),
+        'daily_sales_rebuild': select(
+            day, func.count(Invoice.id), func.sum(Invoice.total)
+        ).group_by(day)
+    }
+
+def explain(statement):
+    """Plan de ejecución de una consulta según el motor de base de datos."""
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    if db.engine.dialect.name == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in db.session.execute(text('EXPLAIN ' + sql)).all()]
+
+@contextmanager
+def time_limit(seconds):
+    """Interrumpir (solo en SQLite) las consultas que superen ``seconds`` segundos."""
+    if db.engine.dialect.name != 'sqlite' or not seconds:
+        yield
+        return
+    connection = db.session.connection().connection.driver_connection
+    deadline = time.perf_counter() + seconds
+    connection.set_progress_handler(lambda: int(time.perf_counter() > deadline), 10000)
+    try:
+        yield
+    finally:
+        connection.set_progress_handler(None, 0)
+
+def measure(queries, repeat, timeout):
+    """Medir cada consulta ``repeat`` veces y devolver plan y tiempos."""
+    results = {}
+    for name, statement in queries.items():
+        timings = []
+        try:
+            for _ in range(repeat):
+                with time_limit(timeout):
+                    started = time.perf_counter()
+                    db.session.execute(statement).all()
+                    timings.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            # Consulta interrumpida por superar el tiempo máximo
+            db.session.rollback()
+            timings = []
+        results[name] = {
+            'plan': explain(statement),
+            'median_ms': round(statistics.median(timings), 3) if timings else None,
+            'min_ms': round(min(timings), 3) if timings else None
+        }
+    return results
+
+def _format_ms(value, timeout):
+    """Formatear un tiempo en milisegundos (o el límite si se interrumpió)."""
+    return f"{value:.2f}" if value is not None else f"> {timeout * 1000:.0f}"
+
+def model_indexes():
+    """Índices declarados en los modelos (sin contar claves ni restricciones únicas)."""
+    return [index for table in db.metadata.sorted_tables for index in table.indexes]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', help='Ruta del fichero SQLite (por defecto, uno temporal)')
+    parser.add_argument('--invoices', type=int, default=1000000)
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30,
+                        help='Tiempo máximo por consulta en segundos (solo SQLite)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    args = parser.parse_args()
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path)})
+    
+    with app.app_context():
+        if not db.session.execute(select(func.count(Invoice.id))).scalar():
+            print(f"Generando datos en {path}...")
+            started = time.perf_counter()
+            counts = datagen.generate(
+                customers=args.customers,
+                products=args.products,
+                invoices=args.invoices,
+                seed=args.seed
+            )
+            print(f"  {counts} en {time.perf_counter() - started:.1f}s")
+        
+        indexes = model_indexes()
+        queries = build_queries(datetime.utcnow())
+        
+        for index in indexes:
+            index.drop(db.engine, checkfirst=True)
+        db.session.execute(text('ANALYZE'))
+        before = measure(queries, args.repeat, args.timeout)
+        
+        for index in indexes:
+            index.create(db.engine, checkfirst=True)
+        db.session.execute(text('ANALYZE'))
+        after = measure(queries, args.repeat, args.timeout)
+    
+    print(f"\n{'consulta':<28}{'sin índices (ms)':>18}{'con índices (ms)':>18}{'mejora':>10}")
+    for name in queries:
+        old, new = before[name]['median_ms'], after[name]['median_ms']
+        speedup = f"{old / max(new, 0.001):.1f}x" if old is not None and new is not None else '-'
+        print(f"{name:<28}{_format_ms(old, args.timeout):>18}{_format_ms(new, args.timeout):>18}{speedup:>10}")
+    for name in queries:
+        print(f"\n{name}\n  antes:   " + "\n           ".join(before[name]['plan']))
+        print("  después: " + "\n           ".join(after[name]['plan']))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'database': path, 'before': before, 'after': after}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
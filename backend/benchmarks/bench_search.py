@@ -0,0 +1,102 @@
+"""
+Benchmark de la búsqueda de texto completo.
+
+Mide la latencia de ``GET /api/search/`` con consultas selectivas y con
+términos que aparecen en todos los registros, sobre un millón de clientes.
+Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_search --customers 1000000 --output search.json
+
+Si la base de datos indicada con ``--database`` ya contiene datos, se
+reutiliza en lugar de generar un conjunto nuevo.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import select, func
+from app import create_app
+from models import Customer
+from models.base import db
+from benchmarks import datagen
+
+def build_queries(customers):
+    """Consultas a medir: de una sola coincidencia a palabras (o prefijos) presentes en todas las filas."""
+    middle = customers // 2
+    return {
+        'exact_customer': f'cliente {middle}',
+        'email': f'cliente{middle}@ejemplo.com',
+        'email_prefix': f'cliente{middle}@ejem',
+        'product_prefix': 'produc',
+        'broad_term': 'cliente',
+        'broad_prefix': 'ejempl',
+        'no_match': 'inexistente',
+    }
+
+def measure(client, query, repeat):
+    """Pedir la búsqueda ``repeat`` veces y devolver tiempos y número de resultados."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get('/api/search/', query_string={'q': query})
+        timings.append((time.perf_counter() - started) * 1000)
+    body = response.get_json()
+    return {
+        'results': len(body['data']),
+        'has_next': body['metadata']['pagination']['has_next'],
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', help='Ruta del fichero SQLite (por defecto, uno temporal)')
+    parser.add_argument('--customers', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    args = parser.parse_args()
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path)})
+    
+    with app.app_context():
+        customers = db.session.execute(select(func.count(Customer.id))).scalar()
+        if not customers:
+            print(f"Generando datos en {path}...")
+            started = time.perf_counter()
+            counts = datagen.generate(
+                customers=args.customers,
+                products=args.products,
+                invoices=0,
+                seed=args.seed
+            )
+            customers = counts['customer']
+            print(f"  {counts} en {time.perf_counter() - started:.1f}s")
+    
+    print(f"Motor de búsqueda: {app.extensions['search_backend']}")
+    client = app.test_client()
+    results = {
+        name: {'query': query, **measure(client, query, args.repeat)}
+        for name, query in build_queries(customers).items()
+    }
+    
+    print(f"\n{'consulta':<18}{'q':<28}{'resultados':>12}{'mediana (ms)':>14}{'máx. (ms)':>12}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['query']:<28}{result['results']:>12}"
+              f"{result['median_ms']:>14.2f}{result['max_ms']:>12.2f}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'database': path,
+                'backend': app.extensions['search_backend'],
+                'results': results
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark de la serialización de las respuestas.
+
+Carga ``--rows`` facturas con su cliente y sus líneas (y el producto de cada
+línea), igual que el listado de facturas, y mide el tiempo de ``dump`` con
+marshmallow y con la función compilada, y el de la codificación a JSON con
+``json`` y con orjson (si está instalado). Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_serializer --rows 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+from unittest import mock
+from marshmallow import Schema
+from sqlalchemy import select, func
+from app import create_app
+from models import Invoice
+from models.base import db
+from schemas.base import BaseSchema
+from schemas.invoice_schema import invoices_schema
+from benchmarks import datagen
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def measure(function, repeat):
+    """
+    Mediana en segundos de ``repeat`` ejecuciones y el resultado de la última.
+    
+    Como ``timeit``, el recolector de basura se desactiva durante la medición:
+    con cientos de miles de objetos del ORM en memoria sus pasadas dominarían
+    el tiempo de los dos serializadores.
+    """
+    times = []
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return statistics.median(times), result
+
+def marshmallow_dump(schema, obj):
+    """Serializar solo con marshmallow, también los esquemas anidados."""
+    with mock.patch.object(BaseSchema, 'dump', Schema.dump):
+        return schema.dump(obj)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', help='Ruta del fichero SQLite (por defecto, uno temporal)')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    args = parser.parse_args()
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'bench_serializer.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path)})
+    
+    with app.app_context():
+        if not db.session.execute(select(func.count(Invoice.id))).scalar():
+            print(f"Generando datos en {path}...")
+            print(f"  {datagen.generate(invoices=args.rows, seed=args.seed)}")
+        
+        invoices = Invoice.query_with_details().order_by(Invoice.id).limit(args.rows).all()
+        items = sum(len(invoice.items) for invoice in invoices)
+        print(f"{len(invoices)} facturas con {items} líneas cargadas")
+        
+        results = {}
+        results['marshmallow'], expected = measure(
+            lambda: marshmallow_dump(invoices_schema, invoices), args.repeat
+        )
+        results['compilado'], data = measure(lambda: invoices_schema.dump(invoices), args.repeat)
+        assert data == expected, 'La salida compilada no coincide con la de marshmallow'
+        
+        results['json'], encoded = measure(lambda: json.dumps(data).encode(), args.repeat)
+        assert encoded == json.dumps(expected).encode()
+        if orjson is not None:
+            results['orjson'], _ = measure(lambda: orjson.dumps(data), args.repeat)
+    
+    print(f"\n{'paso':<14}{'tiempo (s)':>12}{'filas/s':>14}")
+    for name, seconds in results.items():
+        print(f"{name:<14}{seconds:>12.3f}{len(invoices) / seconds:>14,.0f}")
+    print(f"\ndump compilado: {results['marshmallow'] / results['compilado']:.1f}x más rápido")
+    if 'orjson' in results:
+        print(f"orjson: {results['json'] / results['orjson']:.1f}x más rápido que json")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'database': path, 'rows': len(invoices), 'line_items': items,
+                       'seconds': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark de los perfiles de conexión de SQLite en la creación de facturas.
+
+Para cada perfil de ``utils.sqlite`` genera una base de datos en fichero y
+crea facturas con ``POST /api/invoices``: primero con un único cliente HTTP
+y después con varios hilos escritores mientras otros leen el listado de
+facturas. Uso (desde ``backend/``)::
+
+    python -m benchmarks.bench_sqlite_profiles --invoices 2000 --writers 4 --readers 4
+
+La diferencia depende sobre todo de lo que tarde un fsync en el disco de
+``--directory``, así que conviene medir en el mismo tipo de disco que el
+servidor.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import update
+from app import create_app
+from models import Product
+from models.base import db
+from utils.sqlite import SQLITE_PROFILES
+from benchmarks import datagen
+
+def prepare(profile, directory, args):
+    """Crear la aplicación con ``profile`` sobre una base de datos con datos sintéticos."""
+    path = os.path.join(directory, f'{profile}.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path, 'SQLITE_PROFILE': profile})
+    with app.app_context():
+        datagen.generate(
+            customers=args.customers,
+            products=args.products,
+            invoices=args.existing_invoices,
+            seed=args.seed
+        )
+        # Stock suficiente para que ninguna factura se rechace
+        db.session.execute(update(Product).values(stock=10 ** 9))
+        db.session.commit()
+    return app
+
+def invoice_payloads(count, args):
+    """Cuerpos de ``POST /api/invoices`` con entre 1 y 5 líneas."""
+    rng = random.Random(args.seed)
+    return [
+        {
+            'customer_id': rng.randint(1, args.customers),
+            'items_data': [
+                {'product_id': product_id, 'quantity': rng.randint(1, 5)}
+                for product_id in rng.sample(range(1, args.products + 1), rng.randint(1, 5))
+            ]
+        } for _ in range(count)
+    ]
+
+def write(app, payloads, results):
+    """Crear las facturas de ``payloads`` y anotar cuántas fallan."""
+    client = app.test_client()
+    for payload in payloads:
+        response = client.post('/api/invoices/', json=payload)
+        if response.status_code != 201:
+            results['errors'] += 1
+            results['last_error'] = response.get_json()['error']['message']
+
+def read(app, stop, results):
+    """Pedir la primera página del listado de facturas hasta que se indique ``stop``."""
+    client = app.test_client()
+    while not stop.is_set():
+        response = client.get('/api/invoices/?sort=-date&limit=50')
+        results['reads'] += 1
+        if response.status_code != 200:
+            results['read_errors'] += 1
+
+def run(app, payloads, writers, readers):
+    """Crear las facturas repartidas entre ``writers`` hilos con ``readers`` hilos leyendo."""
+    results = {'errors': 0, 'reads': 0, 'read_errors': 0, 'last_error': None}
+    stop = threading.Event()
+    write_threads = [
+        threading.Thread(target=write, args=(app, payloads[i::writers], results))
+        for i in range(writers)
+    ]
+    read_threads = [threading.Thread(target=read, args=(app, stop, results)) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in read_threads + write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in read_threads:
+        thread.join()
+    return {
+        'seconds': round(elapsed, 3),
+        'invoices_per_s': round((len(payloads) - results['errors']) / elapsed, 1),
+        'reads_per_s': round(results['reads'] / elapsed, 1),
+        'errors': results['errors'],
+        'read_errors': results['read_errors'],
+        'last_error': results['last_error']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--directory', help='Directorio de las bases de datos (por defecto, uno temporal)')
+    parser.add_argument('--profiles', default=','.join(SQLITE_PROFILES),
+                        help='Perfiles a comparar, separados por comas')
+    parser.add_argument('--invoices', type=int, default=2000, help='Facturas a crear por escenario')
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--existing-invoices', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Fichero JSON donde guardar los resultados')
+    args = parser.parse_args()
+    
+    directory = args.directory or tempfile.mkdtemp()
+    payloads = invoice_payloads(args.invoices * 2, args)
+    results = {}
+    for profile in args.profiles.split(','):
+        app = prepare(profile, directory, args)
+        results[profile] = {
+            'sequential': run(app, payloads[:args.invoices], writers=1, readers=0),
+            'concurrent': run(app, payloads[args.invoices:], args.writers, args.readers)
+        }
+    
+    print(f"\n{'perfil':<12}{'escenario':<12}{'facturas/s':>12}{'lecturas/s':>12}{'errores':>10}")
+    for profile, scenarios in results.items():
+        for scenario, result in scenarios.items():
+            print(f"{profile:<12}{scenario:<12}{result['invoices_per_s']:>12.1f}"
+                  f"{result['reads_per_s']:>12.1f}{result['errors'] + result['read_errors']:>10}")
+            if result['last_error']:
+                print(f"{'':<24}último error: {result['last_error']}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'directory': directory, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
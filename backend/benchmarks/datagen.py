@@ -0,0 +1,183 @@
+"""
+Generador reproducible de datos sintéticos.
+
+Inserta clientes, proveedores, productos, facturas e items directamente a
+través de las tablas de los modelos, en lotes con ``executemany``. Con la
+misma semilla se obtiene siempre el mismo conjunto de datos. También se
+puede ejecutar como script con uno de los tamaños de ``SIZES``::
+
+    python -m benchmarks.datagen --database large.db --size large
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app import create_app
+from models import Customer, Supplier, Product, Invoice, InvoiceItem, DailySales
+from models.base import db
+
+# Estados de factura y su peso relativo
+INVOICE_STATUSES = ['paid', 'pending', 'overdue', 'cancelled']
+INVOICE_STATUS_WEIGHTS = [60, 30, 7, 3]
+
+CATEGORIES = ['Electrónica', 'Hogar', 'Oficina', 'Deportes', 'Alimentación', 'Jardín']
+
+# Tamaños predefinidos de los conjuntos de datos (argumentos de ``generate``)
+SIZES = {
+    'small': {'customers': 1000, 'suppliers': 50, 'products': 500, 'invoices': 10000},
+    'medium': {'customers': 10000, 'suppliers': 200, 'products': 2000, 'invoices': 100000},
+    'large': {'customers': 100000, 'suppliers': 500, 'products': 10000, 'invoices': 1000000},
+}
+
+def _insert_chunks(model, rows, chunk_size):
+    """Insertar filas en lotes para no acumularlas todas en memoria."""
+    chunk = []
+    count = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(model), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(model), chunk)
+        count += len(chunk)
+    db.session.commit()
+    return count
+
+def generate(customers=1000, suppliers=50, products=500, invoices=10000,
+             max_items=5, days=730, seed=42, chunk_size=10000, now=None):
+    """
+    Generar un conjunto de datos sintéticos en la base de datos actual.
+    
+    Debe ejecutarse dentro de un contexto de aplicación y sobre tablas
+    vacías, ya que los IDs se asignan de forma explícita. Devuelve un
+    diccionario con el número de filas insertadas por tabla.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    start = now - timedelta(days=days)
+    counts = {}
+    
+    counts['supplier'] = _insert_chunks(Supplier, (
+        {
+            'id': i,
+            'name': f"Proveedor {i}",
+            'email': f"proveedor{i}@ejemplo.com",
+            'phone': f"+34 600 {i:06d}",
+            'address': f"Polígono {i}, nave {rng.randint(1, 50)}",
+            'relationship_status': rng.choice(['active', 'inactive', 'pending']),
+            'account_manager': f"Gestor {rng.randint(1, 20)}",
+            'notes': f"Proveedor de {rng.choice(CATEGORIES).lower()}",
+            'created_at': start,
+            'updated_at': start
+        } for i in range(1, suppliers + 1)
+    ), chunk_size)
+    
+    product_prices = [round(rng.uniform(1, 500), 2) for _ in range(products)]
+    counts['product'] = _insert_chunks(Product, (
+        {
+            'id': i,
+            'name': f"Producto {i}",
+            'description': f"Descripción del producto {i}",
+            'price': product_prices[i - 1],
+            'stock': rng.randint(0, 500),
+            'category': rng.choice(CATEGORIES),
+            'status': 'active',
+            'supplier_id': rng.randint(1, suppliers),
+            'created_at': start,
+            'updated_at': start
+        } for i in range(1, products + 1)
+    ), chunk_size)
+    
+    def customer_rows():
+        for i in range(1, customers + 1):
+            created_at = start + timedelta(seconds=rng.randint(0, days * 86400))
+            yield {
+                'id': i,
+                'name': f"Cliente {i}",
+                'email': f"cliente{i}@ejemplo.com",
+                'phone': f"+34 700 {i:06d}",
+                'address': f"Calle {rng.randint(1, 300)}, {rng.randint(1, 99)}",
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+    counts['customer'] = _insert_chunks(Customer, customer_rows(), chunk_size)
+    
+    # Las facturas y sus items se generan juntos para que el total cuadre
+    items = []
+    
+    def invoice_rows():
+        item_id = 0
+        for i in range(1, invoices + 1):
+            date = start + timedelta(seconds=rng.randint(0, days * 86400))
+            total = 0.0
+            for product_id in rng.sample(range(1, products + 1), rng.randint(1, max_items)):
+                item_id += 1
+                quantity = rng.randint(1, 10)
+                price = product_prices[product_id - 1]
+                total += quantity * price
+                items.append({
+                    'id': item_id,
+                    'invoice_id': i,
+                    'product_id': product_id,
+                    'quantity': quantity,
+                    'price': price,
+                    'created_at': date,
+                    'updated_at': date
+                })
+            yield {
+                'id': i,
+                'invoice_number': f"INV-{date.strftime('%Y%m%d')}-{i:07d}",
+                'date': date,
+                'customer_id': rng.randint(1, customers),
+                'total': round(total, 2),
+                'status': rng.choices(INVOICE_STATUSES, INVOICE_STATUS_WEIGHTS)[0],
+                'due_date': date + timedelta(days=30),
+                'created_at': date,
+                'updated_at': date
+            }
+    
+    def flush_items():
+        # Insertar los items acumulados por el lote de facturas actual
+        if items:
+            db.session.execute(insert(InvoiceItem), items)
+            counts['invoiceitem'] = counts.get('invoiceitem', 0) + len(items)
+            items.clear()
+    
+    counts['invoice'] = 0
+    chunk = []
+    for row in invoice_rows():
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(Invoice), chunk)
+            counts['invoice'] += len(chunk)
+            chunk = []
+            flush_items()
+    if chunk:
+        db.session.execute(insert(Invoice), chunk)
+        counts['invoice'] += len(chunk)
+    flush_items()
+    db.session.commit()
+    
+    counts['daily_sales'] = DailySales.rebuild()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database', required=True, help='Ruta del fichero SQLite, que debe estar vacío')
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(args.database)})
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate(**SIZES[args.size], seed=args.seed)
+        print(f"{counts} en {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
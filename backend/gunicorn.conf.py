@@ -0,0 +1,59 @@
+"""
+Configuración de gunicorn para producción.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Todos los valores se pueden cambiar con variables de entorno. La aplicación
+se crea una sola vez en el proceso maestro (``preload_app``) y los workers
+la heredan al hacer fork, compartiendo el código importado; cada worker
+descarta después las conexiones de base de datos heredadas y abre las suyas.
+
+Con ``kill -HUP`` gunicorn relee esta configuración y sustituye los workers
+de forma ordenada: los antiguos terminan sus peticiones en curso (hasta
+``GUNICORN_GRACEFUL_TIMEOUT`` segundos). Como el código se carga en el
+maestro, para desplegar código nuevo hay que reiniciar el maestro (o hacer
+``kill -USR2`` y después ``kill -QUIT`` al maestro antiguo).
+
+Con más de un worker la caché de respuestas debe ser compartida (por
+ejemplo ``CACHE_TYPE=RedisCache``); con el ``SimpleCache`` por defecto se
+desactiva al arrancar y se avisa en el log.
+"""
+
+import multiprocessing
+import os
+
+def _int_env(name, default):
+    return int(os.environ.get(name, default))
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+# (2 x núcleos) + 1 workers: mientras unos esperan a la base de datos, otros usan la CPU
+workers = _int_env('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = _int_env('GUNICORN_THREADS', 1)
+
+preload_app = True
+
+timeout = _int_env('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _int_env('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _int_env('GUNICORN_KEEPALIVE', 5)
+
+# Reiniciar cada worker tras un número de peticiones (0 lo desactiva)
+max_requests = _int_env('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = _int_env('GUNICORN_MAX_REQUESTS_JITTER', 0)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def when_ready(server):
+    """Desactivar la caché en memoria si hay varios workers (ver ``require_shared_cache``)."""
+    from wsgi import app
+    from utils.cache import require_shared_cache
+    require_shared_cache(app, server.cfg.workers, server.log)
+
+def post_fork(server, worker):
+    """Descartar en el worker las conexiones heredadas del maestro."""
+    from wsgi import app
+    from utils.database import dispose_engines
+    dispose_engines(app)
@@ -0,0 +1,43 @@
+"""Añadir índices para los filtros y joins más frecuentes
+
+Las tablas se crean con ``db.create_all()`` al iniciar la aplicación, que
+solo crea los índices de las tablas nuevas. Esta migración añade los índices
+a las bases de datos existentes; ``if_not_exists`` permite aplicarla también
+sobre una base de datos recién creada.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_invoice_date_total_status', 'invoice', ['date', 'total', 'status']),
+    ('ix_invoice_status_date', 'invoice', ['status', 'date']),
+    ('ix_invoice_customer_id_date', 'invoice', ['customer_id', 'date']),
+    ('ix_invoice_created_at', 'invoice', ['created_at']),
+    ('ix_invoiceitem_invoice_id', 'invoiceitem', ['invoice_id']),
+    ('ix_invoiceitem_product_id_quantity_price', 'invoiceitem', ['product_id', 'quantity', 'price']),
+    ('ix_product_stock', 'product', ['stock']),
+    ('ix_product_supplier_id', 'product', ['supplier_id']),
+    ('ix_customer_created_at', 'customer', ['created_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,59 @@
+"""Añadir el contador diario de números de factura
+
+La tabla se inicializa con el mayor número ya asignado cada día a las
+facturas existentes con formato ``INV-YYYYMMDD-N``, de modo que los nuevos
+números no colisionan con los anteriores.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import re
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INVOICE_NUMBER = re.compile(r'^INV-(\d{8})-(\d+)$')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('invoice_sequence'):
+        op.create_table(
+            'invoice_sequence',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('date', sa.Date(), nullable=False, unique=True),
+            sa.Column('last_number', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+    
+    last_numbers = {}
+    for (invoice_number,) in bind.execute(sa.text('SELECT invoice_number FROM invoice')):
+        match = INVOICE_NUMBER.match(invoice_number or '')
+        if match:
+            day = datetime.strptime(match.group(1), '%Y%m%d').date()
+            last_numbers[day] = max(last_numbers.get(day, 0), int(match.group(2)))
+    
+    sequence = sa.table(
+        'invoice_sequence',
+        sa.column('date', sa.Date),
+        sa.column('last_number', sa.Integer),
+    )
+    bind.execute(sequence.delete())
+    if last_numbers:
+        op.bulk_insert(sequence, [
+            {'date': day, 'last_number': number} for day, number in sorted(last_numbers.items())
+        ])
+
+
+def downgrade():
+    op.drop_table('invoice_sequence')
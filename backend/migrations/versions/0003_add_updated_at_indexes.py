@@ -0,0 +1,36 @@
+"""Añadir índices sobre updated_at para los ETag del dashboard
+
+Los ETag de los widgets del dashboard usan el mayor ``updated_at`` de cada
+tabla; con estos índices se obtiene sin recorrer la tabla.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_invoice_updated_at', 'invoice', ['updated_at']),
+    ('ix_invoiceitem_updated_at', 'invoiceitem', ['updated_at']),
+    ('ix_product_updated_at', 'product', ['updated_at']),
+    ('ix_customer_updated_at', 'customer', ['updated_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,41 @@
+"""Añadir índices para los filtros y el orden de los listados
+
+Los campos de ``FILTER_FIELDS`` y ``SORT_FIELDS`` de cada modelo deben estar
+indexados para que el filtrado y la paginación ordenada no recorran la tabla.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_customer_name', 'customer', ['name']),
+    ('ix_supplier_name', 'supplier', ['name']),
+    ('ix_supplier_relationship_status', 'supplier', ['relationship_status']),
+    ('ix_supplier_created_at', 'supplier', ['created_at']),
+    ('ix_product_name', 'product', ['name']),
+    ('ix_product_price', 'product', ['price']),
+    ('ix_product_category', 'product', ['category']),
+    ('ix_invoice_total', 'invoice', ['total']),
+    ('ix_invoice_due_date', 'invoice', ['due_date']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
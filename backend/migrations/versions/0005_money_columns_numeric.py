@@ -0,0 +1,57 @@
+"""Guardar los importes como NUMERIC(12, 2)
+
+Los precios y totales pasan de ``Float`` a ``Numeric(12, 2)`` para que las
+sumas en la base de datos sean exactas y los valores se redondeen a
+céntimos. En SQLite el tipo se mantiene (``MONEY`` usa REAL en ese motor),
+así que solo se redondean los valores existentes.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('product', 'price', False),
+    ('invoiceitem', 'price', False),
+    ('invoice', 'total', True),
+    ('daily_sales', 'total', False),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, column, nullable in COLUMNS:
+        if bind.dialect.name == 'sqlite':
+            op.execute(f"UPDATE {table} SET {column} = round({column}, 2)")
+            continue
+        op.alter_column(
+            table, column,
+            type_=sa.Numeric(12, 2),
+            existing_type=sa.Float(),
+            existing_nullable=nullable,
+            postgresql_using=f"round({column}::numeric, 2)"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        return
+    for table, column, nullable in reversed(COLUMNS):
+        op.alter_column(
+            table, column,
+            type_=sa.Float(),
+            existing_type=sa.Numeric(12, 2),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::double precision"
+        )
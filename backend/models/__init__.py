@@ -9,4 +9,6 @@ from models.customer import Customer
 from models.supplier import Supplier
 from models.product import Product
 from models.invoice import Invoice, InvoiceItem
+from models.daily_sales import DailySales
+from models.invoice_sequence import InvoiceSequence
 # A medida que se creen más modelos, se importarán aquí 
\ No newline at end of file
@@ -3,12 +3,43 @@ Modelo base y configuración de SQLAlchemy para la aplicación.
 """
 
 from datetime import datetime
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, DateTime
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Column, Integer, Float, Numeric, DateTime, and_, or_
 from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.sql.dml import UpdateBase
+
+class RoutingSession(Session):
+    """
+    Sesión que envía las lecturas al engine de solo lectura de la petición
+    actual (``g.read_bind``, la réplica que elige ``utils.replica``).
+    
+    Los flush y las sentencias INSERT, UPDATE y DELETE van siempre a la base
+    de datos principal, igual que todas las consultas fuera de una petición.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            read_bind = g.get('read_bind') if has_app_context() else None
+            if read_bind is not None:
+                return read_bind
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
 
 # Inicializar SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Tamaño de página por defecto y máximo para la paginación por cursor
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Tipo de los importes: decimal exacto en la base de datos (redondeado a
+# céntimos) y ``float`` en Python, igual que en los esquemas y en el JSON. En
+# SQLite se mantiene REAL: con afinidad NUMERIC guardaría 30.0 como entero
+MONEY = Numeric(12, 2, asdecimal=False).with_variant(Float(), 'sqlite')
+
+# Clave de ``session.info`` con las etiquetas de caché pendientes de invalidar
+CACHE_TAGS_KEY = 'cache_tags'
 
 class BaseModel:
     """Clase base para todos los modelos."""
@@ -22,6 +53,39 @@ class BaseModel:
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Campos indexados por los que se puede filtrar y ordenar en los listados;
+    # los NULL de los campos de orden van al final (ver ``keyset_page``)
+    FILTER_FIELDS = ()
+    SORT_FIELDS = ()
+    
+    # Campos de texto del índice de búsqueda y su peso en el ranking
+    SEARCH_FIELDS = {}
+    
+    @classmethod
+    def cache_tag(cls, id=None):
+        """Etiqueta de caché de la tabla o, si se indica ``id``, de uno de sus registros."""
+        table = cls.__table__.name
+        return table if id is None else f"{table}:{id}"
+    
+    def cache_tags(self):
+        """Etiquetas de caché que invalida un cambio en este registro."""
+        return {self.cache_tag(), self.cache_tag(self.id)}
+    
+    @classmethod
+    def mark_changed(cls, id=None):
+        """
+        Registrar un cambio hecho con un INSERT/UPDATE/DELETE directo.
+        
+        Los cambios que pasan por la sesión (``save``, ``update``, ``delete``
+        o cualquier ``flush``) se registran automáticamente; las sentencias
+        ejecutadas sin cargar los objetos deben indicarlo con este método
+        para que la caché se invalide al confirmar la transacción.
+        """
+        tags = db.session.info.setdefault(CACHE_TAGS_KEY, set())
+        tags.add(cls.cache_tag())
+        if id is not None:
+            tags.add(cls.cache_tag(id))
+    
     def save(self):
         """Guardar el modelo en la base de datos."""
         db.session.add(self)
@@ -42,21 +106,117 @@ class BaseModel:
         return self
     
     @classmethod
-    def get_by_id(cls, id):
-        """Obtener un registro por su ID."""
+    def get_by_id(cls, id, options=None):
+        """
+        Obtener un registro por su ID.
+        
+        ``options`` son opciones de carga del ORM (columnas y relaciones); con
+        ellas el registro se consulta siempre, aunque ya esté en la sesión.
+        """
+        if options:
+            return cls.query.options(*options).filter(cls.id == id).first()
         return cls.query.get(id)
     
+    @classmethod
+    def relation_loaders(cls):
+        """Opciones de carga por adelantado de cada relación que se serializa con el modelo."""
+        return {}
+    
     @classmethod
     def get_all(cls):
         """Obtener todos los registros."""
         return cls.query.all()
     
+    @classmethod
+    def keyset_page(cls, statement, after=None, limit=DEFAULT_PAGE_SIZE, sort=None):
+        """
+        Ordenar ``statement`` y limitarlo a la página que sigue al cursor ``after``.
+        
+        ``sort`` es ``(columna, descendente)``; por defecto se ordena por ID
+        y el cursor es el ID del último registro. Con otra columna el orden
+        es ``(columna, id)`` y el cursor es la tupla ``(valor, id)`` del
+        último registro, de modo que la página siguiente no depende de que
+        ese registro siga existiendo ni de que su valor no haya cambiado. Si
+        la columna admite NULL, esos registros van al final (al principio en
+        orden descendente). Se pide un registro más que ``limit`` para saber
+        si existe una página siguiente.
+        """
+        column, descending = sort or (cls.id, False)
+        nullable = column is not cls.id and column.nullable
+        if after is not None:
+            if column is cls.id:
+                statement = statement.where(cls.id < after if descending else cls.id > after)
+            else:
+                value, after_id = after
+                if isinstance(value, str) and column.type.python_type is datetime:
+                    value = datetime.fromisoformat(value)
+                statement = statement.where(cls._after_condition(column, descending, value, after_id))
+        
+        if column is cls.id:
+            order = [cls.id.desc() if descending else cls.id]
+        elif descending:
+            order = [column.desc().nulls_first() if nullable else column.desc(), cls.id.desc()]
+        else:
+            order = [column.nulls_last() if nullable else column, cls.id]
+        return statement.order_by(*order).limit(limit + 1)
+    
+    @classmethod
+    def _after_condition(cls, column, descending, value, after_id):
+        """
+        Condición de los registros que siguen a ``(value, after_id)`` en el orden de ``column``.
+        
+        Los NULL de las columnas que los admiten van al final en orden
+        ascendente y al principio en descendente, igual en todos los motores.
+        """
+        if value is None:
+            if descending:
+                return or_(column.isnot(None), and_(column.is_(None), cls.id < after_id))
+            return and_(column.is_(None), cls.id > after_id)
+        # ``column >= valor`` permite recorrer el índice de la columna
+        if descending:
+            return and_(column <= value, or_(column < value, cls.id < after_id))
+        condition = and_(column >= value, or_(column > value, cls.id > after_id))
+        return or_(condition, column.is_(None)) if column.nullable else condition
+    
+    @classmethod
+    def paginate(cls, after=None, limit=None, query=None, sort=None):
+        """
+        Obtener una página de registros usando paginación por cursor (keyset).
+        
+        Los registros se ordenan por ID (o por ``sort``, ver ``keyset_page``)
+        y se devuelven los que siguen al cursor ``after``. El tamaño de
+        página nunca supera MAX_PAGE_SIZE. Devuelve una tupla ``(items,
+        next_cursor)``, donde ``next_cursor`` es el cursor a usar como
+        ``after`` en la siguiente página, o ``None`` si no hay más registros.
+        """
+        limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        if query is None:
+            query = cls.query
+        
+        items = cls.keyset_page(query, after, limit, sort).all()
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            if sort is None or sort[0] is cls.id:
+                return items, last.id
+            return items, (getattr(last, sort[0].key), last.id)
+        return items, None
+    
+    @classmethod
+    def column_names(cls):
+        """Nombres de las columnas de la tabla, calculados una vez por modelo."""
+        names = cls.__dict__.get('_column_names')
+        if names is None:
+            names = tuple(column.name for column in cls.__table__.columns)
+            cls._column_names = names
+        return names
+    
     def to_dict(self):
         """Convertir el modelo a un diccionario."""
         result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
+        for name in self.column_names():
+            value = getattr(self, name)
             if isinstance(value, datetime):
                 value = value.isoformat()
-            result[column.name] = value
+            result[name] = value
         return result 
\ No newline at end of file
@@ -2,18 +2,31 @@
 Modelo para los clientes.
 """
 
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from models.base import db, BaseModel
 
 class Customer(db.Model, BaseModel):
     """Modelo para almacenar la información de los clientes."""
     
+    __table_args__ = (
+        # Clientes nuevos del mes y actividad reciente
+        Index('ix_customer_created_at', 'created_at'),
+        # Filtros y orden por nombre en el listado
+        Index('ix_customer_name', 'name'),
+        # Última modificación de la tabla (ETag del dashboard)
+        Index('ix_customer_updated_at', 'updated_at'),
+    )
+    
     # Campos específicos del cliente
     name = Column(String(100), nullable=False)
     email = Column(String(120), unique=True, nullable=False)
     phone = Column(String(20))
     address = Column(Text)
     
+    FILTER_FIELDS = ('name', 'email', 'created_at')
+    SORT_FIELDS = ('name', 'email', 'created_at')
+    SEARCH_FIELDS = {'name': 10.0, 'email': 5.0, 'phone': 1.0}
+    
     def __repr__(self):
         """Representación en cadena del cliente."""
         return f"<Customer {self.name}>" 
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Modelo para el resumen diario de ventas.
+"""
+
+from datetime import date
+from sqlalchemy import Column, Date, Integer, select, update, func, case
+from sqlalchemy.exc import IntegrityError
+from models.base import db, BaseModel, MONEY
+
+class DailySales(db.Model, BaseModel):
+    """
+    Resumen materializado de las facturas de cada día.
+    
+    Se mantiene de forma incremental desde la API de facturas, de modo que
+    los agregados del dashboard cuestan lo mismo que el número de días y no
+    que el número de facturas. ``rebuild`` lo recalcula desde cero.
+    """
+    
+    __tablename__ = 'daily_sales'
+    
+    # Campos específicos del resumen
+    date = Column(Date, unique=True, nullable=False)
+    invoice_count = Column(Integer, nullable=False, default=0)
+    total = Column(MONEY, nullable=False, default=0.0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+    
+    @classmethod
+    def add_invoice(cls, invoice):
+        """Sumar una factura al resumen de su día."""
+        cls._apply(invoice, 1)
+    
+    @classmethod
+    def remove_invoice(cls, invoice):
+        """Restar una factura del resumen de su día."""
+        cls._apply(invoice, -1)
+    
+    @classmethod
+    def _apply(cls, invoice, sign):
+        """Aplicar la contribución de una factura con un UPDATE atómico."""
+        if invoice.date is None:
+            return
+        day = invoice.date.date()
+        total = sign * (invoice.total or 0.0)
+        paid = sign if invoice.status == 'paid' else 0
+        pending = sign if invoice.status == 'pending' else 0
+        
+        statement = update(cls).where(cls.date == day).values(
+            invoice_count=cls.invoice_count + sign,
+            total=cls.total + total,
+            paid_count=cls.paid_count + paid,
+            pending_count=cls.pending_count + pending
+        ).execution_options(synchronize_session=False)
+        cls.mark_changed()
+        if db.session.execute(statement).rowcount or sign < 0:
+            return
+        
+        # Primera factura del día: crear la fila (otra petición puede
+        # haberla creado a la vez, en cuyo caso se repite el UPDATE)
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(
+                    date=day,
+                    invoice_count=1,
+                    total=total,
+                    paid_count=paid,
+                    pending_count=pending
+                ))
+        except IntegrityError:
+            db.session.execute(statement)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recalcular todo el resumen a partir de la tabla de facturas."""
+        from models.invoice import Invoice
+        
+        day = func.date(Invoice.date)
+        rows = db.session.execute(
+            select(
+                day.label('date'),
+                func.count(Invoice.id).label('invoice_count'),
+                func.coalesce(func.sum(Invoice.total), 0.0).label('total'),
+                func.count(case((Invoice.status == 'paid', 1))).label('paid_count'),
+                func.count(case((Invoice.status == 'pending', 1))).label('pending_count')
+            ).where(Invoice.date.isnot(None)).group_by(day)
+        ).all()
+        
+        db.session.query(cls).delete()
+        cls.mark_changed()
+        db.session.add_all([
+            cls(
+                date=row.date if isinstance(row.date, date) else date.fromisoformat(row.date),
+                invoice_count=row.invoice_count,
+                total=float(row.total),
+                paid_count=row.paid_count,
+                pending_count=row.pending_count
+            ) for row in rows
+        ])
+        db.session.commit()
+        return len(rows)
+    
+    def __repr__(self):
+        """Representación en cadena del resumen diario."""
+        return f"<DailySales {self.date}>"
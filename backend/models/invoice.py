@@ -3,18 +3,28 @@ Modelos para las facturas y sus items.
 """
 
 from datetime import datetime, timedelta
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship
-from models.base import db, BaseModel
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index, select, func
+from sqlalchemy.orm import relationship, joinedload, selectinload
+from models.base import db, BaseModel, MONEY
+from models.invoice_sequence import InvoiceSequence
 
 class InvoiceItem(db.Model, BaseModel):
     """Modelo para los items de una factura."""
     
+    __table_args__ = (
+        # Carga de los items de una factura
+        Index('ix_invoiceitem_invoice_id', 'invoice_id'),
+        # Índice de cobertura para el ranking de productos más vendidos
+        Index('ix_invoiceitem_product_id_quantity_price', 'product_id', 'quantity', 'price'),
+        # Última modificación de la tabla (ETag del dashboard)
+        Index('ix_invoiceitem_updated_at', 'updated_at'),
+    )
+    
     # Campos específicos del item
     invoice_id = Column(Integer, ForeignKey('invoice.id'), nullable=False)
     product_id = Column(Integer, ForeignKey('product.id'), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
-    price = Column(Float, nullable=False)
+    price = Column(MONEY, nullable=False)
     
     # Relaciones
     product = relationship('Product')
@@ -25,10 +35,24 @@ class InvoiceItem(db.Model, BaseModel):
         """Calcular el subtotal del item."""
         return self.price * self.quantity
     
+    @classmethod
+    def relation_loaders(cls):
+        """El producto se carga en la misma sentencia que los items."""
+        return {'product': joinedload(cls.product)}
+    
+    @classmethod
+    def query_with_product(cls):
+        """Consulta de items que carga su producto en la misma sentencia."""
+        return cls.query.options(*cls.relation_loaders().values())
+    
     def __repr__(self):
         """Representación en cadena del item."""
         return f"<InvoiceItem {self.id} - {self.product_id} x{self.quantity}>"
     
+    def cache_tags(self):
+        """Un cambio en un item también invalida su factura."""
+        return super().cache_tags() | {Invoice.cache_tag(self.invoice_id)}
+    
     def to_dict(self):
         """Convertir el modelo a un diccionario."""
         result = super().to_dict()
@@ -40,15 +64,34 @@ class InvoiceItem(db.Model, BaseModel):
 class Invoice(db.Model, BaseModel):
     """Modelo para las facturas."""
     
+    __table_args__ = (
+        # Rangos de fechas, facturas recientes y reconstrucción del resumen diario
+        Index('ix_invoice_date_total_status', 'date', 'total', 'status'),
+        # Filtros por estado dentro de un rango de fechas
+        Index('ix_invoice_status_date', 'status', 'date'),
+        # Facturas de un cliente y clientes con compras
+        Index('ix_invoice_customer_id_date', 'customer_id', 'date'),
+        # Actividad reciente
+        Index('ix_invoice_created_at', 'created_at'),
+        # Última modificación de la tabla (ETag del dashboard)
+        Index('ix_invoice_updated_at', 'updated_at'),
+        # Filtros y orden del listado
+        Index('ix_invoice_total', 'total'),
+        Index('ix_invoice_due_date', 'due_date'),
+    )
+    
     # Campos específicos de la factura
     invoice_number = Column(String(20), unique=True, nullable=False)
     date = Column(DateTime, default=datetime.utcnow)
     customer_id = Column(Integer, ForeignKey('customer.id'), nullable=False)
-    total = Column(Float, default=0.0)
+    total = Column(MONEY, default=0.0)
     status = Column(String(20), default='pending')
     due_date = Column(DateTime)
     payment_date = Column(DateTime, nullable=True)
     
+    FILTER_FIELDS = ('status', 'date', 'customer_id', 'total', 'due_date', 'invoice_number')
+    SORT_FIELDS = ('date', 'total', 'due_date', 'invoice_number', 'created_at')
+    
     # Relaciones
     customer = relationship('Customer', backref='invoices')
     items = relationship('InvoiceItem', cascade='all, delete-orphan')
@@ -57,15 +100,79 @@ class Invoice(db.Model, BaseModel):
         super().__init__(**kwargs)
         # Generar número de factura automáticamente si no se proporciona
         if 'invoice_number' not in kwargs:
-            self.invoice_number = f"INV-{datetime.utcnow().strftime('%Y%m%d')}-{func.count(Invoice.id)}"
+            self.invoice_number = self.next_invoice_number()
+        # La fecha de emisión se necesita ya para calcular el vencimiento
+        if self.date is None:
+            self.date = datetime.utcnow()
         # Establecer fecha de vencimiento predeterminada a 30 días después de la emisión
         if 'due_date' not in kwargs:
             self.due_date = self.date + timedelta(days=30)
     
+    @staticmethod
+    def next_invoice_number(day=None):
+        """
+        Asignar el siguiente número de factura (``INV-YYYYMMDD-NNNN``).
+        
+        Usa el contador diario de ``InvoiceSequence`` en lugar de contar las
+        facturas existentes; el número queda reservado en la transacción
+        actual y se libera si esta se deshace.
+        """
+        day = day or datetime.utcnow().date()
+        number = InvoiceSequence.allocate(day)
+        return f"INV-{day.strftime('%Y%m%d')}-{number:04d}"
+    
+    @classmethod
+    def relation_loaders(cls):
+        """
+        Opciones de carga del cliente y de los items (con sus productos).
+        
+        El cliente se obtiene con un JOIN en la consulta principal y los items
+        (junto con sus productos) en una única consulta adicional, de modo que
+        serializar N facturas cuesta siempre dos consultas y no 1 + N + N*M.
+        """
+        return {
+            'customer': joinedload(cls.customer),
+            'items': selectinload(cls.items).joinedload(InvoiceItem.product)
+        }
+    
+    @classmethod
+    def query_with_details(cls):
+        """Consulta de facturas que carga cliente, items y productos por adelantado."""
+        return cls.query.options(*cls.relation_loaders().values())
+    
+    @classmethod
+    def get_with_details(cls, id):
+        """Obtener una factura por su ID con sus relaciones ya cargadas."""
+        return cls.query_with_details().filter(cls.id == id).first()
+    
+    @staticmethod
+    def related_updated_at(invoices):
+        """
+        Consultas con la última modificación de lo que ``query_with_details``
+        carga junto a las facturas de ``invoices`` (subconsulta): clientes,
+        items y productos. El número de items detecta los items eliminados.
+        """
+        from models.customer import Customer
+        from models.product import Product
+        
+        items = InvoiceItem.invoice_id.in_(select(invoices.c.id))
+        return [
+            select(func.max(Customer.updated_at)).where(Customer.id.in_(select(invoices.c.customer_id))),
+            select(func.count(InvoiceItem.id)).where(items),
+            select(func.max(InvoiceItem.updated_at)).where(items),
+            select(func.max(Product.updated_at))
+            .join(InvoiceItem, InvoiceItem.product_id == Product.id)
+            .where(items),
+        ]
+    
     def calculate_total(self):
-        """Calcular el total de la factura."""
-        self.total = sum(item.subtotal for item in self.items)
-        db.session.commit()
+        """
+        Calcular el total de la factura a partir de sus items.
+        
+        No confirma la transacción: el llamador guarda la factura junto con
+        sus items y el stock en un único commit.
+        """
+        self.total = round(sum(item.subtotal for item in self.items), 2)
         return self.total
     
     def __repr__(self):
@@ -0,0 +1,48 @@
+"""
+Modelo para la numeración de facturas.
+"""
+
+from sqlalchemy import Column, Date, Integer, update
+from sqlalchemy.exc import IntegrityError
+from models.base import db, BaseModel
+
+class InvoiceSequence(db.Model, BaseModel):
+    """
+    Contador diario de números de factura.
+    
+    Cada día tiene una fila con el último número asignado. ``allocate``
+    incrementa el contador con un UPDATE atómico dentro de la transacción
+    de la factura, de modo que el coste no depende del número de facturas y
+    dos peticiones concurrentes nunca reciben el mismo número. Como el
+    incremento se confirma o se deshace junto con la factura, la numeración
+    de cada día es correlativa y sin huecos.
+    """
+    
+    __tablename__ = 'invoice_sequence'
+    
+    # Campos específicos del contador
+    date = Column(Date, unique=True, nullable=False)
+    last_number = Column(Integer, nullable=False, default=0)
+    
+    @classmethod
+    def allocate(cls, day):
+        """Reservar el siguiente número del día ``day``. No confirma la transacción."""
+        statement = (
+            update(cls)
+            .where(cls.date == day)
+            .values(last_number=cls.last_number + 1)
+            .returning(cls.last_number)
+            .execution_options(synchronize_session=False)
+        )
+        number = db.session.execute(statement).scalar()
+        if number is not None:
+            return number
+        
+        # Primera factura del día: crear la fila (otra petición puede
+        # haberla creado a la vez, en cuyo caso se repite el UPDATE)
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(date=day, last_number=1))
+            return 1
+        except IntegrityError:
+            return db.session.execute(statement).scalar_one()
@@ -2,17 +2,33 @@
 Modelo para los productos.
 """
 
-from sqlalchemy import Column, String, Float, Integer, Text, ForeignKey
-from sqlalchemy.orm import relationship
-from models.base import db, BaseModel
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, Index, update, select, func
+from sqlalchemy.orm import relationship, joinedload
+from models.base import db, BaseModel, MONEY
 
 class Product(db.Model, BaseModel):
     """Modelo para almacenar la información de los productos."""
     
+    __table_args__ = (
+        # Productos con stock bajo
+        Index('ix_product_stock', 'stock'),
+        # Productos de un proveedor
+        Index('ix_product_supplier_id', 'supplier_id'),
+        # Última modificación de la tabla (ETag del dashboard)
+        Index('ix_product_updated_at', 'updated_at'),
+        # Filtros y orden del listado
+        Index('ix_product_name', 'name'),
+        Index('ix_product_price', 'price'),
+        Index('ix_product_category', 'category'),
+    )
+    
+    # Umbral por debajo del cual se considera que un producto tiene stock bajo
+    LOW_STOCK_THRESHOLD = 10
+    
     # Campos específicos del producto
     name = Column(String(100), nullable=False)
     description = Column(Text)
-    price = Column(Float, nullable=False)
+    price = Column(MONEY, nullable=False)
     stock = Column(Integer, default=0)
     category = Column(String(50))
     status = Column(String(20), default='active')
@@ -21,6 +37,53 @@ class Product(db.Model, BaseModel):
     supplier_id = Column(Integer, ForeignKey('supplier.id'), nullable=False)
     supplier = relationship('Supplier', backref='products')
     
+    FILTER_FIELDS = ('name', 'price', 'stock', 'category', 'supplier_id')
+    SORT_FIELDS = ('name', 'price', 'stock')
+    SEARCH_FIELDS = {'name': 10.0, 'category': 3.0, 'description': 1.0}
+    
+    @classmethod
+    def relation_loaders(cls):
+        """El proveedor se carga con un JOIN en la consulta de los productos."""
+        return {'supplier': joinedload(cls.supplier)}
+    
+    @staticmethod
+    def related_updated_at(products):
+        """Consultas con la última modificación de los proveedores de ``products`` (subconsulta)."""
+        from models.supplier import Supplier
+        return [
+            select(func.max(Supplier.updated_at)).where(Supplier.id.in_(select(products.c.supplier_id)))
+        ]
+    
+    @classmethod
+    def reserve_stock(cls, product_id, quantity):
+        """
+        Descontar ``quantity`` unidades del stock de forma atómica.
+        
+        La comprobación y el descuento se hacen en un único UPDATE
+        condicional (``stock = stock - q WHERE stock >= q``), de modo que dos
+        peticiones concurrentes no pueden vender el mismo stock. Devuelve
+        ``False`` si no hay stock suficiente. No confirma la transacción.
+        """
+        result = db.session.execute(
+            update(cls)
+            .where(cls.id == product_id, cls.stock >= quantity)
+            .values(stock=cls.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        cls.mark_changed(product_id)
+        return result.rowcount == 1
+    
+    @classmethod
+    def release_stock(cls, product_id, quantity):
+        """Devolver ``quantity`` unidades al stock de forma atómica."""
+        db.session.execute(
+            update(cls)
+            .where(cls.id == product_id)
+            .values(stock=cls.stock + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        cls.mark_changed(product_id)
+    
     def __repr__(self):
         """Representación en cadena del producto."""
         return f"<Product {self.name}>" 
\ No newline at end of file
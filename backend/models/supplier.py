@@ -2,12 +2,19 @@
 Modelo para los proveedores.
 """
 
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from models.base import db, BaseModel
 
 class Supplier(db.Model, BaseModel):
     """Modelo para almacenar la información de los proveedores."""
     
+    __table_args__ = (
+        # Filtros y orden del listado
+        Index('ix_supplier_name', 'name'),
+        Index('ix_supplier_relationship_status', 'relationship_status'),
+        Index('ix_supplier_created_at', 'created_at'),
+    )
+    
     # Campos específicos del proveedor
     name = Column(String(100), nullable=False)
     email = Column(String(120), unique=True, nullable=False)
@@ -17,6 +24,10 @@ class Supplier(db.Model, BaseModel):
     account_manager = Column(String(100))
     notes = Column(Text)
     
+    FILTER_FIELDS = ('name', 'email', 'relationship_status', 'created_at')
+    SORT_FIELDS = ('name', 'email', 'created_at')
+    SEARCH_FIELDS = {'name': 10.0, 'account_manager': 3.0, 'notes': 1.0}
+    
     def __repr__(self):
         """Representación en cadena del proveedor."""
         return f"<Supplier {self.name}>" 
\ No newline at end of file
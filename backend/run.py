@@ -1,10 +1,15 @@
 """
-Script para ejecutar la aplicación Flask.
+Script para ejecutar la aplicación con el servidor de desarrollo.
+
+En producción se usa gunicorn (``gunicorn -c gunicorn.conf.py wsgi:app``).
 """
 
+import os
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    port = int(os.environ.get('PORT', 5000))
+    debug = os.environ.get('DEBUG', 'False').lower() in ('true', '1', 't')
+    app.run(debug=debug, host='0.0.0.0', port=port)
@@ -0,0 +1,40 @@
+"""
+Esquema base con serialización compilada.
+"""
+
+from marshmallow import Schema
+from utils.profiling import serialization_timer
+from utils.serializer import MissingAttribute, compile_dumper
+
+class BaseSchema(Schema):
+    """
+    Esquema base para todos los esquemas de la API.
+    
+    ``dump`` usa una función generada con ``compile_dumper`` la primera vez
+    que se serializa con cada instancia del esquema; la salida es idéntica a
+    la de marshmallow, que se sigue usando para ``load`` y ``validate`` y
+    como alternativa si el objeto no tiene todos los atributos del esquema
+    (``MissingAttribute``); otros ``AttributeError`` se propagan.
+    Con ``PROFILING`` activo, el tiempo de ``dump`` se suma al de la petición.
+    """
+    
+    _dumper = None
+    
+    def dump(self, obj, *, many=None):
+        """Serializar ``obj`` (o una lista si ``many``) con la función compilada."""
+        with serialization_timer():
+            return self._dump(obj, many)
+    
+    def _dump(self, obj, many):
+        if self._dumper is None:
+            self._dumper = compile_dumper(self) or False
+        if not self._dumper:
+            return super().dump(obj, many=many)
+        
+        many = self.many if many is None else bool(many)
+        try:
+            if many:
+                return [self._dumper(item) for item in obj]
+            return self._dumper(obj)
+        except MissingAttribute:
+            return super().dump(obj, many=many)
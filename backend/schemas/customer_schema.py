@@ -2,9 +2,10 @@
 Esquema para serializar/deserializar el modelo Customer.
 """
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
+from schemas.base import BaseSchema
 
-class CustomerSchema(Schema):
+class CustomerSchema(BaseSchema):
     """Esquema para el modelo Customer."""
     
     id = fields.Int(dump_only=True)
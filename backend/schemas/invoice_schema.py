@@ -2,9 +2,13 @@
 Esquemas para serializar/deserializar los modelos Invoice e InvoiceItem.
 """
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
+from schemas.base import BaseSchema
 
-class InvoiceItemSchema(Schema):
+# Estados válidos de una factura
+INVOICE_STATUSES = ('pending', 'paid', 'overdue', 'cancelled')
+
+class InvoiceItemSchema(BaseSchema):
     """Esquema para el modelo InvoiceItem."""
     
     id = fields.Int(dump_only=True)
@@ -19,7 +23,7 @@ class InvoiceItemSchema(Schema):
     # Campos para relaciones
     product = fields.Nested('ProductSchema', exclude=('supplier',), dump_only=True)
 
-class InvoiceSchema(Schema):
+class InvoiceSchema(BaseSchema):
     """Esquema para el modelo Invoice."""
     
     id = fields.Int(dump_only=True)
@@ -27,14 +31,14 @@ class InvoiceSchema(Schema):
     date = fields.DateTime()
     customer_id = fields.Int(required=True)
     total = fields.Float(dump_only=True)
-    status = fields.Str(validate=validate.OneOf(['pending', 'paid', 'overdue', 'cancelled']))
+    status = fields.Str(validate=validate.OneOf(INVOICE_STATUSES))
     due_date = fields.DateTime()
     payment_date = fields.DateTime(allow_none=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
     
     # Campos para relaciones
-    customer = fields.Nested('CustomerSchema', exclude=('invoices',), dump_only=True)
+    customer = fields.Nested('CustomerSchema', dump_only=True)
     items = fields.Nested(InvoiceItemSchema, many=True, dump_only=True)
     
     # Campos para entrada de items en la creación de facturas
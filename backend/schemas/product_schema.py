@@ -2,9 +2,10 @@
 Esquema para serializar/deserializar el modelo Product.
 """
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
+from schemas.base import BaseSchema
 
-class ProductSchema(Schema):
+class ProductSchema(BaseSchema):
     """Esquema para el modelo Product."""
     
     id = fields.Int(dump_only=True)
@@ -19,7 +20,7 @@ class ProductSchema(Schema):
     updated_at = fields.DateTime(dump_only=True)
     
     # Campos para relaciones
-    supplier = fields.Nested('SupplierSchema', exclude=('products',), dump_only=True)
+    supplier = fields.Nested('SupplierSchema', dump_only=True)
 
 # Instancias del esquema para uso común
 product_schema = ProductSchema()
@@ -2,9 +2,10 @@
 Esquema para serializar/deserializar el modelo Supplier.
 """
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
+from schemas.base import BaseSchema
 
-class SupplierSchema(Schema):
+class SupplierSchema(BaseSchema):
     """Esquema para el modelo Supplier."""
     
     id = fields.Int(dump_only=True)
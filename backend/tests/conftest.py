@@ -0,0 +1,94 @@
+"""
+Fixtures compartidas por las pruebas.
+
+Por defecto las pruebas usan SQLite. Con ``TEST_DATABASE_URI`` apuntando a
+un servidor (por ejemplo, un PostgreSQL en Docker) se ejecutan contra él:
+sus tablas se borran y se crean de nuevo en cada prueba, y se omiten las
+marcadas con ``sqlite``.
+"""
+
+import os
+from contextlib import contextmanager, nullcontext
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from app import create_app
+from models.base import db
+
+TEST_DATABASE_URI = os.environ.get('TEST_DATABASE_URI', 'sqlite:///:memory:')
+SERVER_DATABASE = make_url(TEST_DATABASE_URI).get_backend_name() != 'sqlite'
+
+def pytest_collection_modifyitems(config, items):
+    """Omitir las pruebas específicas de SQLite al usar otro motor."""
+    if not SERVER_DATABASE:
+        return
+    skip = pytest.mark.skip(reason=f'Solo SQLite; TEST_DATABASE_URI usa {make_url(TEST_DATABASE_URI).drivername}')
+    for item in items:
+        if 'sqlite' in item.keywords:
+            item.add_marker(skip)
+
+@contextmanager
+def _clean_server_database():
+    """Vaciar la base de datos de ``TEST_DATABASE_URI`` antes y después de usarla."""
+    engine = create_engine(TEST_DATABASE_URI)
+    db.metadata.drop_all(engine)
+    try:
+        yield TEST_DATABASE_URI
+    finally:
+        db.metadata.drop_all(engine)
+        engine.dispose()
+
+@pytest.fixture
+def shared_database_uri(tmp_path):
+    """
+    Base de datos para pruebas con varios hilos o procesos: la de
+    ``TEST_DATABASE_URI`` si es un servidor o, si no, un fichero SQLite.
+    """
+    if not SERVER_DATABASE:
+        yield f"sqlite:///{tmp_path / 'shared.db'}"
+        return
+    with _clean_server_database() as uri:
+        yield uri
+
+@pytest.fixture
+def app():
+    """Crear una instancia de la aplicación para pruebas."""
+    with _clean_server_database() if SERVER_DATABASE else nullcontext():
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URI,
+        })
+        
+        with app.app_context():
+            db.create_all()
+        
+        yield app
+        
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    """Cliente para realizar peticiones a la aplicación."""
+    return app.test_client()
+
+@pytest.fixture
+def count_queries(app):
+    """Contexto que registra las sentencias SQL ejecutadas dentro del bloque."""
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    
+    return counter
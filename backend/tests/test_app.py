@@ -2,28 +2,6 @@
 Pruebas básicas para la aplicación.
 """
 
-import pytest
-from app import create_app
-
-@pytest.fixture
-def app():
-    """Crear una instancia de la aplicación para pruebas."""
-    app = create_app({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
-    })
-    
-    with app.app_context():
-        from models.base import db
-        db.create_all()
-    
-    yield app
-
-@pytest.fixture
-def client(app):
-    """Cliente para realizar peticiones a la aplicación."""
-    return app.test_client()
-
 def test_health_check(client):
     """Probar el endpoint de verificación de salud."""
     response = client.get('/health')
@@ -36,4 +14,4 @@ def test_api_docs(client):
     """Probar que la documentación de la API esté disponible."""
     response = client.get('/api/docs/')
     assert response.status_code == 200
-    assert b'Swagger' in response.data or b'swagger' in response.data 
\ No newline at end of file
+    assert b'Swagger' in response.data or b'swagger' in response.data
@@ -0,0 +1,210 @@
+"""
+Pruebas para el modo de servicio asíncrono (ASGI).
+
+Las pruebas de enrutado y de errores sustituyen los engines asíncronos por
+engines síncronos sobre el mismo fichero, de modo que no necesitan
+aiosqlite; las que miden la concurrencia sí lo usan.
+"""
+
+import asyncio
+import json
+import time
+from importlib.util import find_spec
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.util import await_only
+
+pytest.importorskip('a2wsgi')
+
+import utils.asgi
+from api.dashboard_api import DashboardService
+from app import create_app
+from models.base import db
+from utils.asgi import create_asgi_app
+
+pytestmark = pytest.mark.sqlite
+
+requires_aiosqlite = pytest.mark.skipif(find_spec('aiosqlite') is None, reason='aiosqlite no está instalado')
+
+@pytest.fixture
+def flask_app(tmp_path):
+    """Aplicación sobre un fichero SQLite, que comparten los engines síncrono y asíncrono."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'async.db'}",
+        'CACHE_TYPE': 'NullCache',
+    })
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+async def _request(asgi, method, path, query='', body=None):
+    """Enviar una petición a la aplicación ASGI y devolver estado, cabeceras y JSON."""
+    payload = b'' if body is None else json.dumps(body).encode()
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'root_path': '', 'query_string': query.encode(),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())],
+    }
+    messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    disconnected = asyncio.Event()
+    
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+    
+    sent = []
+    
+    async def send(message):
+        sent.append(message)
+    
+    try:
+        await asgi(scope, receive, send)
+    finally:
+        disconnected.set()
+    headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], headers, json.loads(body)
+
+async def _shutdown(asgi):
+    """Enviar el apagado del ciclo de vida ASGI, que cierra los engines asíncronos."""
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+    
+    async def receive():
+        return messages.pop(0)
+    
+    async def send(message):
+        sent.append(message['type'])
+    
+    await asgi({'type': 'lifespan'}, receive, send)
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+class SyncReadEngine:
+    """Sustituto de un engine asíncrono con la interfaz que usa ``utils.asgi``."""
+    
+    def __init__(self, uri):
+        self.sync_engine = create_engine(uri)
+        self.disposed = False
+    
+    async def dispose(self):
+        self.sync_engine.dispose()
+        self.disposed = True
+
+@pytest.fixture
+def sync_asgi(flask_app, monkeypatch):
+    """Aplicación ASGI cuyas lecturas asíncronas usan un engine síncrono."""
+    monkeypatch.setattr(utils.asgi, 'create_read_engine', lambda config, uri, **pragmas: SyncReadEngine(uri))
+    return create_asgi_app(flask_app)
+
+def _count_statements(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+def test_requests_are_routed_by_method_and_path(flask_app, sync_asgi):
+    """Solo los GET de ``ASYNC_PATHS`` se leen con el engine del modo asíncrono."""
+    engine = flask_app.extensions['async_engines']['primary']
+    async_statements = _count_statements(engine.sync_engine)
+    
+    async def scenario():
+        status, _, created = await _request(
+            sync_asgi, 'POST', '/api/customers/', body={'name': 'Ana', 'email': 'ana@ejemplo.com'}
+        )
+        assert status == 201 and async_statements == []
+        
+        status, _, detail = await _request(sync_asgi, 'GET', f"/api/customers/{created['data']['id']}")
+        assert status == 200 and detail['data']['name'] == 'Ana'
+        status, _, _ = await _request(sync_asgi, 'GET', '/api/dashboard/batch', 'widgets=stats')
+        assert status == 200 and async_statements == []
+        
+        status, _, listing = await _request(sync_asgi, 'GET', '/api/customers/')
+        assert status == 200 and async_statements
+        assert [row['name'] for row in listing['data']] == ['Ana']
+        
+        await _shutdown(sync_asgi)
+    
+    asyncio.run(scenario())
+    assert engine.disposed
+
+def test_errors_in_async_requests_are_api_responses(flask_app, sync_asgi, monkeypatch):
+    """Los errores de las vistas atendidas en el bucle responden igual que en WSGI."""
+    flask_app.config['TESTING'] = False
+    flask_app.config['PROPAGATE_EXCEPTIONS'] = False
+    
+    def broken_stats(self):
+        raise RuntimeError('conexión perdida')
+    
+    async def scenario():
+        results = [
+            await _request(sync_asgi, 'GET', '/api/products/', 'sort=bogus'),
+            await _request(sync_asgi, 'GET', '/api/dashboard/sales-chart', 'granularity=bogus'),
+        ]
+        monkeypatch.setattr(DashboardService, 'stats', broken_stats)
+        results.append(await _request(sync_asgi, 'GET', '/api/dashboard/stats'))
+        await _shutdown(sync_asgi)
+        return results
+    
+    assert [(status, body['error']['code']) for status, _, body in asyncio.run(scenario())] == [
+        (400, 'VALIDATION_ERROR'), (400, 'VALIDATION_ERROR'), (500, 'DATABASE_ERROR')
+    ]
+
+@requires_aiosqlite
+def test_hot_reads_use_the_async_engine(flask_app):
+    """Los listados se leen con el engine asíncrono y devuelven lo mismo que la vista síncrona."""
+    asgi = create_asgi_app(flask_app)
+    async_statements = _count_statements(flask_app.extensions['async_engines']['primary'].sync_engine)
+    
+    async def requests():
+        status, _, created = await _request(
+            asgi, 'POST', '/api/customers/', body={'name': 'Ana', 'email': 'ana@ejemplo.com'}
+        )
+        assert status == 201 and async_statements == []
+        
+        status, _, detail = await _request(asgi, 'GET', f"/api/customers/{created['data']['id']}")
+        assert status == 200 and async_statements == []
+        
+        status, headers, listing = await _request(asgi, 'GET', '/api/customers/', 'fields=name')
+        assert status == 200 and async_statements
+        return detail, headers, listing
+    
+    async def scenario():
+        try:
+            return await requests()
+        finally:
+            await _shutdown(asgi)
+    
+    detail, headers, listing = asyncio.run(scenario())
+    assert detail['data']['name'] == 'Ana'
+    expected = flask_app.test_client().get('/api/customers/?fields=name')
+    assert listing == expected.get_json()
+    assert headers['etag'] == expected.headers['ETag']
+
+@requires_aiosqlite
+def test_concurrent_requests_wait_for_the_database_together(flask_app):
+    """Mientras una petición espera a la base de datos, el bucle atiende las demás."""
+    asgi = create_asgi_app(flask_app)
+    delay = 0.05
+    
+    @event.listens_for(flask_app.extensions['async_engines']['primary'].sync_engine, 'before_cursor_execute')
+    def slow_database(*args):
+        await_only(asyncio.sleep(delay))
+    
+    async def timed(requests):
+        started = time.perf_counter()
+        results = await asyncio.gather(*[_request(asgi, 'GET', '/api/dashboard/stats') for _ in range(requests)])
+        assert all(status == 200 for status, _, _ in results)
+        return time.perf_counter() - started
+    
+    async def scenario():
+        try:
+            return await timed(1), await timed(10)
+        finally:
+            await _shutdown(asgi)
+    
+    single, concurrent = asyncio.run(scenario())
+    assert single >= delay
+    assert concurrent < single * 3
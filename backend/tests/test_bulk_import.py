@@ -0,0 +1,115 @@
+"""
+Pruebas para la importación masiva de registros.
+"""
+
+import json
+import threading
+from app import create_app
+from models import Customer, Supplier, Product
+from models.base import db
+
+def test_bulk_import_json_with_row_errors(app, client):
+    """Las filas válidas se insertan y las inválidas se devuelven con su error."""
+    with app.app_context():
+        db.session.add(Customer(name='Existente', email='existente@ejemplo.com'))
+        db.session.commit()
+    
+    rows = [
+        {'name': 'Cliente 0', 'email': 'cliente0@ejemplo.com'},
+        {'name': 'Cliente 1', 'email': 'no-es-un-email'},
+        {'name': 'Cliente 2', 'email': 'existente@ejemplo.com'},
+        {'name': 'Cliente 3', 'email': 'cliente0@ejemplo.com'},
+        {'name': 'Cliente 4', 'email': 'cliente4@ejemplo.com', 'phone': '600000000'}
+    ]
+    response = client.post('/api/customers/bulk?chunk_size=2', json=rows)
+    assert response.status_code == 201
+    
+    data = response.get_json()['data']
+    assert data['received'] == 5
+    assert data['inserted'] == 2
+    assert data['error_count'] == 3
+    assert [error['row'] for error in data['errors']] == [1, 2, 3]
+    assert 'email' in data['errors'][0]['errors']
+    with app.app_context():
+        assert Customer.query.count() == 3
+
+def test_bulk_import_ndjson(app, client):
+    """Importar proveedores enviados como NDJSON."""
+    lines = [json.dumps({'name': f"Proveedor {i}", 'email': f"proveedor{i}@ejemplo.com"}) for i in range(50)]
+    lines.insert(10, '{esto no es json')
+    response = client.post(
+        '/api/suppliers/bulk',
+        data='\n'.join(lines) + '\n',
+        content_type='application/x-ndjson'
+    )
+    data = response.get_json()['data']
+    assert data['inserted'] == 50
+    assert data['error_count'] == 1
+    assert data['errors'][0]['row'] == 10
+    with app.app_context():
+        assert Supplier.query.count() == 50
+
+def test_bulk_import_csv_checks_references(app, client):
+    """Los productos en CSV se validan y se comprueba que su proveedor existe."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        db.session.add(supplier)
+        db.session.commit()
+        supplier_id = supplier.id
+    
+    body = '\n'.join([
+        'name,price,stock,category,supplier_id',
+        f'Producto A,10.5,3,Oficina,{supplier_id}',
+        f'Producto B,abc,3,Oficina,{supplier_id}',
+        'Producto C,2,,Oficina,999',
+        f'Producto D,7,,,{supplier_id}'
+    ])
+    response = client.post('/api/products/bulk', data=body, content_type='text/csv')
+    data = response.get_json()['data']
+    assert data['inserted'] == 2
+    assert [error['row'] for error in data['errors']] == [1, 2]
+    assert 'supplier_id' in data['errors'][1]['errors']
+    
+    with app.app_context():
+        product = Product.query.filter_by(name='Producto A').one()
+        assert product.price == 10.5
+        assert product.stock == 3
+        assert product.created_at is not None
+
+def test_bulk_import_requires_array(client):
+    """Un cuerpo JSON que no es un array devuelve un error de validación."""
+    response = client.post('/api/customers/bulk', json={'name': 'Cliente'})
+    assert response.status_code == 400
+
+def test_concurrent_bulk_imports_do_not_lock(shared_database_uri):
+    """Varias importaciones a la vez esperan el bloqueo de escritura en lugar de fallar."""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': shared_database_uri})
+    with app.app_context():
+        db.create_all()
+        db.session.add(Supplier(name='Proveedor', email='proveedor@ejemplo.com'))
+        db.session.commit()
+    
+    workers, chunks = 8, 5
+    barrier = threading.Barrier(workers)
+    statuses = []
+    
+    def worker(index):
+        client = app.test_client()
+        barrier.wait()
+        for chunk in range(chunks):
+            rows = [
+                {'name': f'Producto {index}-{chunk}-{i}', 'price': 1.0, 'stock': 1, 'supplier_id': 1}
+                for i in range(20)
+            ]
+            statuses.append(client.post('/api/products/bulk', json=rows).status_code)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    with app.app_context():
+        assert statuses == [201] * workers * chunks
+        assert db.session.query(Product).count() == workers * chunks * 20
+        db.engine.dispose()
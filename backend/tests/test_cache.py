@@ -0,0 +1,118 @@
+"""
+Pruebas para la caché de respuestas.
+"""
+
+import pytest
+from models import Customer, Supplier, Product
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear un cliente, un proveedor y dos productos."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com')
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        db.session.add_all([
+            Product(name='Producto A', price=10.0, stock=50, supplier_id=supplier.id),
+            Product(name='Producto B', price=4.0, stock=50, supplier_id=supplier.id)
+        ])
+        db.session.commit()
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['X-Cache'], response.get_json()['data']
+
+def test_dashboard_cached_until_invoice_write(client, catalog, count_queries):
+    """Los widgets se sirven desde la caché hasta que cambia una factura."""
+    assert _get(client, '/api/dashboard/stats')[0] == 'MISS'
+    with count_queries() as statements:
+        state, data = _get(client, '/api/dashboard/stats')
+    assert state == 'HIT'
+    # Solo se consulta el estado de las tablas para el ETag
+    assert len(statements) == 1
+    assert data['total_invoices'] == 0
+    
+    client.post('/api/invoices/', json={
+        'customer_id': 1,
+        'items_data': [{'product_id': 1, 'quantity': 2}]
+    })
+    state, data = _get(client, '/api/dashboard/stats')
+    assert state == 'MISS'
+    assert data['total_invoices'] == 1
+
+def test_query_parameters_are_part_of_the_key(client, catalog):
+    """Cada combinación de parámetros tiene su propia entrada."""
+    assert _get(client, '/api/dashboard/sales-chart?granularity=day')[0] == 'MISS'
+    assert _get(client, '/api/dashboard/sales-chart?granularity=month')[0] == 'MISS'
+    assert _get(client, '/api/dashboard/sales-chart?granularity=day')[0] == 'HIT'
+
+def test_write_evicts_only_affected_entries(client, catalog):
+    """Modificar un producto no invalida los demás ni otros widgets."""
+    for url in ['/api/products/1', '/api/products/2', '/api/customers/1', '/api/dashboard/sales-chart']:
+        _get(client, url)
+    
+    response = client.put('/api/products/1', json={'name': 'Producto A', 'price': 12.0, 'supplier_id': 1})
+    assert response.status_code == 200
+    
+    state, data = _get(client, '/api/products/1')
+    assert (state, data['price']) == ('MISS', 12.0)
+    assert _get(client, '/api/products/2')[0] == 'HIT'
+    assert _get(client, '/api/customers/1')[0] == 'HIT'
+    assert _get(client, '/api/dashboard/sales-chart')[0] == 'HIT'
+
+def test_stock_reservation_and_nested_records_evict(client, catalog):
+    """Las escrituras directas (stock) y las de registros anidados invalidan la caché."""
+    response = client.post('/api/invoices/', json={
+        'customer_id': 1,
+        'items_data': [{'product_id': 1, 'quantity': 2}]
+    })
+    invoice_id = response.get_json()['data']['id']
+    _get(client, '/api/products/1')
+    _get(client, '/api/products/2')
+    _get(client, f'/api/invoices/{invoice_id}')
+    
+    # Añadir un item reserva stock con un UPDATE directo e invalida la factura
+    client.post(f'/api/invoices/{invoice_id}/items', json={'product_id': 1, 'quantity': 3})
+    state, data = _get(client, '/api/products/1')
+    assert (state, data['stock']) == ('MISS', 45)
+    assert _get(client, '/api/products/2')[0] == 'HIT'
+    state, data = _get(client, f'/api/invoices/{invoice_id}')
+    assert (state, len(data['items'])) == ('MISS', 2)
+    
+    # El cliente anidado en la factura también forma parte de sus dependencias
+    client.put('/api/customers/1', json={'name': 'Cliente Renombrado', 'email': 'cliente@ejemplo.com'})
+    state, data = _get(client, f'/api/invoices/{invoice_id}')
+    assert (state, data['customer']['name']) == ('MISS', 'Cliente Renombrado')
+
+def test_failed_write_does_not_invalidate(client, catalog):
+    """Una transacción deshecha no invalida nada."""
+    _get(client, '/api/products/1')
+    response = client.post('/api/invoices/', json={
+        'customer_id': 1,
+        'items_data': [{'product_id': 1, 'quantity': 500}]
+    })
+    assert response.status_code == 400
+    assert _get(client, '/api/products/1')[0] == 'HIT'
+
+def test_errors_are_not_cached(client, catalog):
+    """Las respuestas de error no se guardan en la caché."""
+    assert client.get('/api/products/99').status_code == 404
+    assert client.get('/api/products/99').status_code == 404
+    assert client.get('/api/cache/stats').get_json()['data']['misses'] == 2
+
+def test_cache_stats(client, catalog):
+    """El endpoint de estadísticas expone aciertos, fallos e invalidaciones."""
+    _get(client, '/api/customers/1')
+    _get(client, '/api/customers/1')
+    _get(client, '/api/customers/1')
+    client.put('/api/customers/1', json={'name': 'Cliente', 'email': 'cliente@ejemplo.com', 'phone': '555'})
+    
+    stats = client.get('/api/cache/stats').get_json()['data']
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['invalidations'] >= 2
+    assert stats['hit_ratio'] == round(2 / 3, 4)
+    assert stats['backend'] == 'SimpleCache'
@@ -0,0 +1,105 @@
+"""
+Pruebas para las peticiones condicionales (ETag y Last-Modified).
+"""
+
+import pytest
+from models import Customer, Supplier, Product
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear un proveedor, tres clientes y un producto."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        db.session.add(supplier)
+        db.session.add_all([
+            Customer(name=f'Cliente {i}', email=f'cliente{i}@ejemplo.com') for i in range(3)
+        ])
+        db.session.flush()
+        db.session.add(Product(name='Producto', price=10.0, stock=50, supplier_id=supplier.id))
+        db.session.commit()
+
+def _revalidate(client, url, response):
+    """Repetir la petición con el ETag de ``response``."""
+    return client.get(url, headers={'If-None-Match': response.headers['ETag']})
+
+def test_record_etag_and_not_modified(client, catalog):
+    """Un registro sin cambios responde 304 sin cuerpo."""
+    response = client.get('/api/customers/1')
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('W/"')
+    assert response.headers['Last-Modified']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    
+    not_modified = _revalidate(client, '/api/customers/1', response)
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.headers['ETag'] == response.headers['ETag']
+    
+    client.put('/api/customers/1', json={'name': 'Otro nombre', 'email': 'cliente0@ejemplo.com'})
+    modified = _revalidate(client, '/api/customers/1', response)
+    assert modified.status_code == 200
+    assert modified.get_json()['data']['name'] == 'Otro nombre'
+    assert modified.headers['ETag'] != response.headers['ETag']
+
+def test_nested_records_change_etag(client, catalog):
+    """El ETag de un producto cambia si cambia su proveedor anidado."""
+    response = client.get('/api/products/1')
+    client.put('/api/suppliers/1', json={'name': 'Proveedor 2', 'email': 'proveedor@ejemplo.com'})
+    assert _revalidate(client, '/api/products/1', response).status_code == 200
+
+def test_invoice_etag_follows_items(client, catalog):
+    """Añadir un item cambia el ETag de la factura y de su lista de items."""
+    invoice_id = client.post('/api/invoices/', json={
+        'customer_id': 1,
+        'items_data': [{'product_id': 1, 'quantity': 1}]
+    }).get_json()['data']['id']
+    detail = client.get(f'/api/invoices/{invoice_id}')
+    items = client.get(f'/api/invoices/{invoice_id}/items')
+    assert _revalidate(client, f'/api/invoices/{invoice_id}', detail).status_code == 304
+    
+    client.post(f'/api/invoices/{invoice_id}/items', json={'product_id': 1, 'quantity': 2})
+    assert _revalidate(client, f'/api/invoices/{invoice_id}', detail).status_code == 200
+    assert _revalidate(client, f'/api/invoices/{invoice_id}/items', items).status_code == 200
+
+def test_if_modified_since(client, catalog):
+    """Sin ETag se usa If-Modified-Since."""
+    response = client.get('/api/customers/1')
+    last_modified = response.headers['Last-Modified']
+    assert client.get('/api/customers/1', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get('/api/customers/1', headers={
+        'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'
+    }).status_code == 200
+
+def test_list_etag_is_scoped_to_the_page(client, catalog):
+    """El ETag de un listado solo depende de los registros de su página."""
+    first = client.get('/api/customers/?limit=2')
+    second = client.get('/api/customers/?limit=2&after=2')
+    assert first.headers['ETag'] != second.headers['ETag']
+    
+    client.put('/api/customers/1', json={'name': 'Otro nombre', 'email': 'cliente0@ejemplo.com'})
+    assert _revalidate(client, '/api/customers/?limit=2', first).status_code == 200
+    assert _revalidate(client, '/api/customers/?limit=2&after=2', second).status_code == 304
+    
+    # Un registro nuevo entra en la última página
+    client.post('/api/customers/', json={'name': 'Nuevo', 'email': 'nuevo@ejemplo.com'})
+    assert _revalidate(client, '/api/customers/?limit=2&after=2', second).status_code == 200
+
+def test_dashboard_not_modified_until_write(client, catalog):
+    """Los widgets del dashboard responden 304 hasta que cambian sus tablas."""
+    stats = client.get('/api/dashboard/stats')
+    chart = client.get('/api/dashboard/sales-chart')
+    assert _revalidate(client, '/api/dashboard/stats', stats).status_code == 304
+    
+    client.post('/api/customers/', json={'name': 'Nuevo', 'email': 'nuevo@ejemplo.com'})
+    response = _revalidate(client, '/api/dashboard/stats', stats)
+    assert response.status_code == 200
+    assert response.get_json()['data']['total_customers'] == 4
+    # El gráfico de ventas no depende de los clientes
+    assert _revalidate(client, '/api/dashboard/sales-chart', chart).status_code == 304
+
+def test_missing_record_has_no_etag(client, catalog):
+    """Un 404 no lleva ETag."""
+    response = client.get('/api/customers/99')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
@@ -0,0 +1,346 @@
+"""
+Pruebas para los endpoints del dashboard.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from api.dashboard_api import DashboardService
+from models import Customer, Supplier, Product, Invoice, InvoiceItem, DailySales
+from models.base import db
+
+def _create_dashboard_data(app):
+    """Crear clientes, productos y facturas con distintos estados y fechas."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customers = [
+            Customer(name=f"Cliente {i}", email=f"cliente{i}@ejemplo.com")
+            for i in range(3)
+        ]
+        db.session.add(supplier)
+        db.session.add_all(customers)
+        db.session.flush()
+        
+        products = [
+            Product(name='Producto A', price=10.0, stock=5, supplier_id=supplier.id),
+            Product(name='Producto B', price=20.0, stock=50, supplier_id=supplier.id)
+        ]
+        db.session.add_all(products)
+        db.session.flush()
+        
+        now = datetime.utcnow()
+        invoices = [
+            (customers[0], now, 'paid', 100.0),
+            (customers[0], now, 'pending', 50.0),
+            (customers[1], now - timedelta(days=90), 'paid', 30.0)
+        ]
+        for i, (customer, date, status, total) in enumerate(invoices):
+            invoice = Invoice(
+                invoice_number=f"INV-TEST-{i}",
+                date=date,
+                customer_id=customer.id,
+                status=status,
+                total=total
+            )
+            invoice.items = [InvoiceItem(product_id=products[i % 2].id, quantity=i + 1, price=10.0)]
+            db.session.add(invoice)
+        db.session.commit()
+        DailySales.rebuild()
+
+def test_dashboard_stats(app, client, count_queries):
+    """Las estadísticas se calculan con dos sentencias agregadas (más la del ETag)."""
+    _create_dashboard_data(app)
+    
+    with count_queries() as statements:
+        response = client.get('/api/dashboard/stats')
+    assert response.status_code == 200
+    assert len(statements) == 3
+    
+    data = response.get_json()['data']
+    assert data['total_customers'] == 3
+    assert data['total_products'] == 2
+    assert data['total_invoices'] == 3
+    assert data['total_sales'] == 180.0
+    assert data['avg_invoice_value'] == 60.0
+    assert data['pending_invoices'] == 1
+    assert data['low_stock_products'] == 1
+    assert data['monthly_sales'] >= 150.0
+
+def test_dashboard_summary_and_customer_statistics(app, client):
+    """Resumen de ventas y estadísticas de clientes."""
+    _create_dashboard_data(app)
+    
+    summary = client.get('/api/dashboard/sales-summary').get_json()['data']
+    assert summary == {
+        'total_sales': 180.0,
+        'total_orders': 3,
+        'average_order_value': 60.0,
+        'paid_invoices': 2,
+        'pending_invoices': 1
+    }
+    
+    statistics = client.get('/api/dashboard/customer-statistics').get_json()['data']
+    assert statistics['total_customers'] == 3
+    assert statistics['new_customers'] == 3
+    assert statistics['repeat_customers'] == 2
+    assert statistics['inactive_customers'] == 1
+
+def test_dashboard_overview_matches_widgets(app, client):
+    """El overview combina las respuestas de los widgets individuales."""
+    _create_dashboard_data(app)
+    
+    overview = client.get('/api/dashboard/overview').get_json()['data']
+    for key, path in [
+        ('stats', 'stats'),
+        ('sales_summary', 'sales-summary'),
+        ('customer_statistics', 'customer-statistics'),
+        ('sales_chart', 'sales-chart'),
+        ('top_products', 'top-products'),
+        ('recent_invoices', 'recent-invoices'),
+        ('activities', 'activities')
+    ]:
+        assert overview[key] == client.get(f'/api/dashboard/{path}').get_json()['data']
+
+def test_dashboard_batch_matches_overview(app, client):
+    """El lote devuelve los mismos widgets que el overview, con su estado y duración."""
+    _create_dashboard_data(app)
+    
+    response = client.get('/api/dashboard/batch')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['data'] == client.get('/api/dashboard/overview').get_json()['data']
+    assert all(widget['status'] == 'ok' and widget['duration_ms'] >= 0
+               for widget in body['metadata']['widgets'].values())
+    
+    body = client.get('/api/dashboard/batch?widgets=top_products,stats').get_json()
+    assert list(body['data']) == ['top_products', 'stats']
+    assert client.get('/api/dashboard/batch?widgets=stats,unknown').status_code == 400
+    assert client.get('/api/dashboard/batch?timeout_ms=0').status_code == 400
+
+def test_dashboard_batch_runs_in_parallel_and_degrades(app, client, monkeypatch):
+    """Los widgets se calculan en hilos distintos; uno lento o con error no impide los demás."""
+    _create_dashboard_data(app)
+    threads = set()
+    original_top_products = DashboardService.top_products
+    
+    def top_products(self):
+        threads.add(threading.get_ident())
+        time.sleep(0.3)
+        return original_top_products(self)
+    
+    def recent_invoices(self):
+        threads.add(threading.get_ident())
+        time.sleep(0.3)
+        return []
+    
+    def activities(self):
+        raise RuntimeError('sin conexión')
+    
+    monkeypatch.setattr(DashboardService, 'top_products', top_products)
+    monkeypatch.setattr(DashboardService, 'recent_invoices', recent_invoices)
+    monkeypatch.setattr(DashboardService, 'activities', activities)
+    
+    started = time.perf_counter()
+    body = client.get('/api/dashboard/batch?widgets=top_products,recent_invoices,stats').get_json()
+    assert time.perf_counter() - started < 0.55
+    assert len(threads) == 2 and threading.get_ident() not in threads
+    assert body['data']['top_products'][0]['name'] == 'Producto A'
+    assert body['data']['stats']['total_customers'] == 3
+    
+    body = client.get('/api/dashboard/batch?widgets=recent_invoices,activities,stats&timeout_ms=100').get_json()
+    widgets = body['metadata']['widgets']
+    assert (body['data']['recent_invoices'], widgets['recent_invoices']['status']) == (None, 'timeout')
+    assert (body['data']['activities'], widgets['activities']['status']) == (None, 'error')
+    assert widgets['activities']['error'] == 'sin conexión'
+    assert widgets['stats']['status'] == 'ok'
+    
+    response = client.get('/api/dashboard/batch?widgets=activities')
+    assert response.status_code == 500
+
+def test_saturated_pool_does_not_delay_the_next_batch(app, client, monkeypatch):
+    """Con todos los hilos ocupados por widgets lentos, el lote siguiente responde dentro del plazo."""
+    _create_dashboard_data(app)
+    app.config['FANOUT_WORKERS'] = 1
+    release = threading.Event()
+    
+    def top_products(self):
+        release.wait(5)
+        return []
+    
+    monkeypatch.setattr(DashboardService, 'top_products', top_products)
+    try:
+        response = client.get('/api/dashboard/batch?widgets=top_products,stats&timeout_ms=50')
+        assert response.status_code == 503
+        
+        started = time.perf_counter()
+        response = client.get('/api/dashboard/batch?widgets=stats,customer_statistics&timeout_ms=50')
+        assert time.perf_counter() - started < 0.5
+        assert response.status_code == 503
+        assert response.get_json()['error']['code'] == 'SERVICE_UNAVAILABLE'
+    finally:
+        release.set()
+    
+    for _ in range(50):
+        body = client.get('/api/dashboard/batch?widgets=top_products,stats&timeout_ms=100').get_json()
+        if body.get('success'):
+            break
+    widgets = body['metadata']['widgets']
+    assert {widget['status'] for widget in widgets.values()} == {'ok'}
+
+def test_queued_widgets_are_reported_as_skipped(app, client, monkeypatch):
+    """Los widgets que no encuentran un hilo libre antes del plazo se devuelven como ``skipped``."""
+    _create_dashboard_data(app)
+    app.config['FANOUT_WORKERS'] = 1
+    release = threading.Event()
+    
+    def recent_invoices(self):
+        release.wait(1)
+        return []
+    
+    monkeypatch.setattr(DashboardService, 'recent_invoices', recent_invoices)
+    try:
+        body = client.get('/api/dashboard/batch?widgets=top_products,recent_invoices,stats&timeout_ms=200').get_json()
+    finally:
+        release.set()
+    widgets = body['metadata']['widgets']
+    assert [widgets[name]['status'] for name in ('top_products', 'recent_invoices', 'stats')] == ['ok', 'timeout', 'skipped']
+    assert body['data']['stats'] is None
+
+def _create_invoices_on(app, dates_and_totals):
+    """Crear facturas en fechas concretas."""
+    with app.app_context():
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com')
+        db.session.add(customer)
+        db.session.flush()
+        for i, (date, total) in enumerate(dates_and_totals):
+            db.session.add(Invoice(
+                invoice_number=f"INV-SERIES-{i}",
+                date=date,
+                customer_id=customer.id,
+                total=total
+            ))
+        db.session.commit()
+        DailySales.rebuild()
+
+def test_sales_series_uses_calendar_months(app, client, count_queries):
+    """Los meses se agrupan por calendario en una sola consulta (más la del ETag)."""
+    _create_invoices_on(app, [
+        (datetime(2025, 1, 31, 23, 0), 10.0),
+        (datetime(2025, 2, 1, 0, 30), 20.0),
+        (datetime(2025, 2, 28, 12, 0), 5.0),
+        (datetime(2025, 3, 1, 8, 0), 7.0),
+        (datetime(2025, 12, 31, 23, 59), 1.0)
+    ])
+    
+    with count_queries() as statements:
+        response = client.get('/api/dashboard/sales-chart?start=2025-01-01&end=2025-12-31&granularity=month')
+    assert response.status_code == 200
+    assert len(statements) == 2
+    
+    data = response.get_json()['data']
+    assert len(data['labels']) == 12
+    assert data['labels'][:3] == ['January', 'February', 'March']
+    assert data['datasets'][0]['data'][:4] == [10.0, 25.0, 7.0, 0.0]
+    assert data['datasets'][0]['data'][-1] == 1.0
+
+def test_sales_by_period_weeks_and_days(app, client):
+    """Las semanas empiezan en lunes y se incluyen los días sin ventas."""
+    _create_invoices_on(app, [
+        (datetime(2025, 6, 1, 10, 0), 1.0),   # domingo
+        (datetime(2025, 6, 2, 10, 0), 2.0),   # lunes
+        (datetime(2025, 6, 8, 10, 0), 4.0)    # domingo
+    ])
+    
+    weeks = client.get(
+        '/api/dashboard/sales-by-period?start=2025-05-26&end=2025-06-08&granularity=week'
+    ).get_json()['data']
+    assert [(w['start'], w['value']) for w in weeks] == [('2025-05-26', 1.0), ('2025-06-02', 6.0)]
+    
+    days = client.get(
+        '/api/dashboard/sales-by-period?start=2025-06-01&end=2025-06-03&period=day'
+    ).get_json()['data']
+    assert [(d['label'], d['value']) for d in days] == [
+        ('2025-06-01', 1.0), ('2025-06-02', 2.0), ('2025-06-03', 0.0)
+    ]
+
+def test_sales_series_default_ranges(client):
+    """Sin parámetros se devuelven los intervalos por defecto."""
+    chart = client.get('/api/dashboard/sales-chart').get_json()['data']
+    assert len(chart['labels']) == 6
+    assert len(client.get('/api/dashboard/sales-by-period').get_json()['data']) == 7
+    assert len(client.get('/api/dashboard/sales-by-period?period=week').get_json()['data']) == 4
+
+def test_sales_series_invalid_args(client):
+    """Los parámetros inválidos devuelven un error de validación."""
+    assert client.get('/api/dashboard/sales-chart?granularity=year').status_code == 400
+    assert client.get('/api/dashboard/sales-chart?start=2025-13-01').status_code == 400
+    assert client.get('/api/dashboard/sales-chart?start=2025-02-01&end=2025-01-01').status_code == 400
+    assert client.get('/api/dashboard/sales-by-period?start=1900-01-01&end=2025-01-01').status_code == 400
+
+def _daily_sales_rows():
+    """Filas del resumen diario como tuplas comparables."""
+    return sorted(
+        (row.date, row.invoice_count, row.total, row.paid_count, row.pending_count)
+        for row in DailySales.query.all()
+    )
+
+def test_daily_sales_follows_invoice_writes(app, client):
+    """El resumen diario se mantiene al actualizar y eliminar facturas."""
+    _create_dashboard_data(app)
+    with app.app_context():
+        invoice = Invoice.query.filter_by(status='pending').first()
+        invoice_id, customer_id = invoice.id, invoice.customer_id
+    
+    response = client.put(f'/api/invoices/{invoice_id}', json={
+        'customer_id': customer_id,
+        'status': 'paid'
+    })
+    assert response.status_code == 200
+    stats = client.get('/api/dashboard/sales-summary').get_json()['data']
+    assert stats['paid_invoices'] == 3
+    assert stats['pending_invoices'] == 0
+    
+    assert client.delete(f'/api/invoices/{invoice_id}').status_code == 200
+    stats = client.get('/api/dashboard/stats').get_json()['data']
+    assert stats['total_invoices'] == 2
+    assert stats['total_sales'] == 130.0
+    
+    # El mantenimiento incremental coincide con una reconstrucción completa
+    with app.app_context():
+        incremental = _daily_sales_rows()
+        DailySales.rebuild()
+        assert _daily_sales_rows() == incremental
+
+def test_daily_sales_add_and_remove_invoice(app):
+    """Sumar y restar una factura deja el resumen como estaba."""
+    _create_invoices_on(app, [(datetime(2025, 3, 10, 9, 0), 10.0)])
+    with app.app_context():
+        before = _daily_sales_rows()
+        invoice = Invoice(
+            invoice_number='INV-EXTRA',
+            date=datetime(2025, 3, 11, 9, 0),
+            customer_id=Customer.query.first().id,
+            total=15.0,
+            status='paid'
+        )
+        DailySales.add_invoice(invoice)
+        db.session.commit()
+        assert DailySales.query.count() == 2
+        
+        DailySales.remove_invoice(invoice)
+        db.session.commit()
+        after = _daily_sales_rows()
+        assert after[0] == before[0]
+        assert after[1][1:] == (0, 0.0, 0, 0)
+
+def test_rebuild_daily_sales_command(app):
+    """El comando de la CLI reconstruye el resumen diario."""
+    _create_invoices_on(app, [(datetime(2025, 3, 10, 9, 0), 10.0)])
+    with app.app_context():
+        db.session.query(DailySales).delete()
+        db.session.commit()
+    
+    result = app.test_cli_runner().invoke(args=['rebuild-daily-sales'])
+    assert result.exit_code == 0
+    with app.app_context():
+        assert _daily_sales_rows()[0][1:] == (1, 10.0, 0, 1)
@@ -0,0 +1,59 @@
+"""
+Pruebas para la configuración del motor de base de datos.
+"""
+
+from flask import Flask
+from models import Customer, Supplier, Product
+from models.base import db
+from utils.database import engine_options, init_database_config
+
+POOL_CONFIG = {
+    'DB_POOL_SIZE': 10,
+    'DB_MAX_OVERFLOW': 20,
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+}
+
+def test_server_databases_get_a_configured_pool():
+    """PostgreSQL recibe las opciones del pool; SQLite conserva el suyo."""
+    options = engine_options({**POOL_CONFIG, 'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/crm'})
+    assert options == {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
+    assert engine_options({**POOL_CONFIG, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) == {}
+
+def test_explicit_engine_options_take_precedence():
+    """``postgres://`` se normaliza y ``SQLALCHEMY_ENGINE_OPTIONS`` prevalece."""
+    app = Flask(__name__)
+    app.config.update(
+        POOL_CONFIG,
+        SQLALCHEMY_DATABASE_URI='postgres://u:p@db/crm',
+        SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 2, 'echo': True}
+    )
+    init_database_config(app)
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == 'postgresql://u:p@db/crm'
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 2
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['max_overflow'] == 20
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['echo'] is True
+
+def test_money_is_rounded_to_cents(app, client):
+    """Los totales se redondean a céntimos y se devuelven como números decimales."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        db.session.add_all([supplier, Customer(name='Cliente', email='cliente@ejemplo.com')])
+        db.session.flush()
+        db.session.add(Product(name='Producto', price=0.1, stock=10, supplier_id=supplier.id))
+        db.session.commit()
+    
+    response = client.post('/api/invoices/', json={
+        'customer_id': 1,
+        'items_data': [{'product_id': 1, 'quantity': 3}]
+    })
+    assert response.status_code == 201
+    assert response.get_json()['data']['total'] == 0.3
+    assert client.get('/api/products/1').get_json()['data']['price'] == 0.1
@@ -0,0 +1,52 @@
+"""
+Pruebas para el manejo de errores de la API.
+
+flask-restx atiende las excepciones de los recursos antes que Flask; sin
+el manejador registrado en ``api``, fuera del modo de pruebas todos los
+``APIError`` respondían 500.
+"""
+
+import pytest
+from api.dashboard_api import DashboardService
+from utils.errors import APIError, NotFoundError
+
+@pytest.fixture
+def production_client(app):
+    """Cliente con ``TESTING`` desactivado, como en producción."""
+    app.config['TESTING'] = False
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    return app.test_client()
+
+def _error(response):
+    return response.status_code, response.get_json()['error']['code']
+
+def test_api_error_data_is_the_json_body():
+    """``data`` es el cuerpo que devuelve flask-restx para el error."""
+    error = NotFoundError('No existe')
+    assert error.data == error.to_dict() == {
+        'success': False,
+        'error': {'code': 'NOT_FOUND', 'message': 'No existe'}
+    }
+    assert APIError('Conflicto', 409, 'CONFLICT').data['error']['code'] == 'CONFLICT'
+
+def test_api_errors_keep_their_status_without_testing_mode(production_client):
+    """Los errores de validación, de recurso inexistente y de base de datos conservan su código."""
+    response = production_client.get('/api/customers/99')
+    assert response.status_code == 404
+    assert response.get_json() == {
+        'success': False,
+        'error': {'code': 'NOT_FOUND', 'message': 'Cliente con ID 99 no encontrado'}
+    }
+    assert _error(production_client.post('/api/customers/', json={'name': 'Sin email'})) == (400, 'VALIDATION_ERROR')
+    assert _error(production_client.get('/api/products/?limit=-1')) == (400, 'VALIDATION_ERROR')
+
+def test_unexpected_errors_are_database_errors(production_client, monkeypatch):
+    """Una excepción inesperada en un recurso se devuelve como DATABASE_ERROR, sin la ayuda de flask-restx."""
+    def stats(self):
+        raise RuntimeError('sin conexión')
+    
+    monkeypatch.setattr(DashboardService, 'stats', stats)
+    response = production_client.get('/api/dashboard/stats')
+    assert _error(response) == (500, 'DATABASE_ERROR')
+    assert response.get_json()['error']['message'] == 'sin conexión'
+    assert 'message' not in response.get_json()
@@ -0,0 +1,90 @@
+"""
+Pruebas para la exportación en streaming de facturas.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+import pytest
+from models import Customer, Supplier, Product, Invoice, InvoiceItem
+from models.base import db
+import utils.export
+
+@pytest.fixture
+def invoices(app):
+    """Crear tres facturas en días distintos con una línea cada una."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customer = Customer(name='Cliente, S.A.', email='cliente@ejemplo.com')
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        product = Product(name='Producto', price=10.0, stock=100, supplier_id=supplier.id)
+        db.session.add(product)
+        db.session.flush()
+        for day, status in [(1, 'paid'), (2, 'pending'), (3, 'paid')]:
+            invoice = Invoice(
+                customer_id=customer.id,
+                invoice_number=f'INV-EXP-{day}',
+                date=datetime(2024, 3, day, 12),
+                status=status
+            )
+            invoice.items = [InvoiceItem(product_id=product.id, quantity=day, price=10.0)]
+            invoice.calculate_total()
+            db.session.add(invoice)
+        db.session.commit()
+
+def _csv(response):
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+def test_export_invoices_csv(client, invoices):
+    """La exportación CSV se envía en streaming con una fila por factura."""
+    response = client.get('/api/invoices/export')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'invoices.csv' in response.headers['Content-Disposition']
+    
+    rows = _csv(response)
+    assert [row['invoice_number'] for row in rows] == ['INV-EXP-1', 'INV-EXP-2', 'INV-EXP-3']
+    assert rows[0]['customer_name'] == 'Cliente, S.A.'
+    assert rows[2]['total'] == '30.0'
+    assert rows[0]['date'] == '2024-03-01T12:00:00'
+
+def test_export_invoices_filters_ndjson(client, invoices):
+    """Los filtros de fecha (inclusivos) y estado se aplican a la exportación."""
+    response = client.get('/api/invoices/export?format=ndjson&start=2024-03-01&end=2024-03-02&status=paid')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['invoice_number'] for row in rows] == ['INV-EXP-1']
+    assert rows[0]['status'] == 'paid'
+
+def test_export_invoice_items_in_batches(client, invoices, monkeypatch):
+    """Las líneas se leen y se escriben por bloques de ``EXPORT_BATCH_SIZE`` filas."""
+    monkeypatch.setattr(utils.export, 'EXPORT_BATCH_SIZE', 2)
+    response = client.get('/api/invoices/items/export?end=2024-03-03')
+    assert response.status_code == 200
+    
+    chunks = list(response.response)
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert [row['quantity'] for row in rows] == ['1', '2', '3']
+    assert rows[1]['product_name'] == 'Producto'
+    assert rows[1]['subtotal'] == '20.0'
+
+def test_export_empty_result(client, invoices):
+    """Un resultado vacío devuelve solo la cabecera."""
+    response = client.get('/api/invoices/export?start=2025-01-01')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).splitlines() == [
+        'id,invoice_number,date,customer_id,customer_name,status,total,due_date,payment_date'
+    ]
+
+@pytest.mark.parametrize('query', ['format=xml', 'status=unknown', 'start=03-01-2024', 'start=2024-03-02&end=2024-03-01'])
+def test_export_invalid_params(client, invoices, query):
+    """Los parámetros inválidos se rechazan antes de empezar el streaming."""
+    response = client.get(f'/api/invoices/export?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,150 @@
+"""
+Pruebas para los filtros y el orden de los listados.
+"""
+
+from datetime import datetime
+import pytest
+from models import Customer, Supplier, Product, Invoice
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear productos con precios repetidos y facturas de varios días y estados."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customers = [Customer(name=f'Cliente {i}', email=f'c{i}@ejemplo.com') for i in range(2)]
+        db.session.add_all([supplier, *customers])
+        db.session.flush()
+        for i in range(12):
+            db.session.add(Product(
+                name=f'Producto {i:02d}', price=float(i % 4), stock=i,
+                category='Hogar' if i % 3 == 0 else 'Oficina', supplier_id=supplier.id
+            ))
+        for i in range(10):
+            db.session.add(Invoice(
+                customer_id=customers[i % 2].id,
+                invoice_number=f'INV-FLT-{i}',
+                date=datetime(2024, 3, 1 + i, 18, 30),
+                status='paid' if i % 2 else 'pending',
+                total=float(i % 3) * 100
+            ))
+        db.session.commit()
+
+def _data(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+def _walk(client, url):
+    """Recorrer todas las páginas de un listado siguiendo el cursor."""
+    rows, after = [], None
+    while True:
+        page = client.get(url + (f'&after={after}' if after else '')).get_json()
+        rows.extend(page['data'])
+        after = page['metadata']['pagination']['next_cursor']
+        if after is None:
+            return rows
+
+def test_filters_are_applied_in_the_database(client, catalog):
+    """Los filtros por igualdad, rango e ``in`` se combinan."""
+    data = _data(client, '/api/invoices/?status=paid&total__gte=100')
+    assert [row['invoice_number'] for row in data] == ['INV-FLT-1', 'INV-FLT-5', 'INV-FLT-7']
+    
+    data = _data(client, '/api/products/?category__in=Hogar,Otra&price__lt=2')
+    assert [row['name'] for row in data] == ['Producto 00', 'Producto 09']
+    
+    data = _data(client, '/api/products/?stock__ne=0&category=Hogar&fields=id')
+    assert [row['id'] for row in data] == [4, 7, 10]
+
+def test_date_without_time_covers_the_whole_day(client, catalog):
+    """``date__lte`` con una fecha incluye las facturas de ese día a cualquier hora."""
+    data = _data(client, '/api/invoices/?date__gte=2024-03-02&date__lte=2024-03-03')
+    assert [row['invoice_number'] for row in data] == ['INV-FLT-1', 'INV-FLT-2']
+    data = _data(client, '/api/invoices/?date=2024-03-05')
+    assert [row['invoice_number'] for row in data] == ['INV-FLT-4']
+    data = _data(client, '/api/invoices/?date__gt=2024-03-09T00:00:00')
+    assert [row['invoice_number'] for row in data] == ['INV-FLT-8', 'INV-FLT-9']
+
+@pytest.mark.parametrize('sort', ['-total', 'total', 'name', '-price', 'date'])
+def test_sorted_pages_cover_every_row_once(client, catalog, sort):
+    """El cursor recorre los listados ordenados sin saltar ni repetir filas con valores iguales."""
+    resource = 'products' if sort.lstrip('-') in ('name', 'price') else 'invoices'
+    rows = _walk(client, f'/api/{resource}/?sort={sort}&limit=3')
+    expected = _data(client, f'/api/{resource}/?limit=200')
+    
+    key = sort.lstrip('-')
+    expected.sort(key=lambda row: (row[key], row['id']), reverse=sort.startswith('-'))
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+
+@pytest.mark.parametrize('sort', ['due_date', '-due_date'])
+def test_sorted_pages_cross_null_values(app, client, catalog, sort):
+    """Los NULL de una columna de orden van al final (al principio en descendente) sin cortar el cursor."""
+    with app.app_context():
+        db.session.execute(
+            db.update(Invoice).where(Invoice.id.in_([2, 3, 5, 8])).values(due_date=None)
+        )
+        db.session.commit()
+    
+    rows = _walk(client, f'/api/invoices/?sort={sort}&limit=3')
+    assert sorted(row['id'] for row in rows) == list(range(1, 11))
+    
+    dated = sorted((row for row in rows if row['due_date']), key=lambda row: (row['due_date'], row['id']))
+    undated = [row for row in rows if row['due_date'] is None]
+    if sort.startswith('-'):
+        expected = sorted(undated, key=lambda row: row['id'], reverse=True) + dated[::-1]
+    else:
+        expected = dated + sorted(undated, key=lambda row: row['id'])
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+
+def test_customer_invoices_accept_filters(client, catalog):
+    """Los filtros también se aplican a las facturas de un cliente."""
+    data = _data(client, '/api/customers/2/invoices?status=paid&sort=-date')
+    assert [row['invoice_number'] for row in data] == [f'INV-FLT-{i}' for i in (9, 7, 5, 3, 1)]
+
+def test_filtered_pages_have_their_own_etag(client, catalog):
+    """El ETag de un listado depende de los filtros y del orden."""
+    etags = {
+        client.get(url).headers['ETag']
+        for url in ['/api/invoices/', '/api/invoices/?status=paid', '/api/invoices/?sort=-total']
+    }
+    assert len(etags) == 3
+
+@pytest.mark.parametrize('query', [
+    'notes=x',
+    'description__gte=a',
+    'price__like=1',
+    'price=abc',
+    'date__gte=03/01/2024',
+    'category__isnull=maybe',
+    'sort=description',
+])
+def test_invalid_filters_are_rejected(client, catalog, query):
+    """Los campos fuera de la lista, los operadores y los valores inválidos devuelven 400."""
+    resource = 'invoices' if 'date' in query else 'products'
+    assert client.get(f'/api/{resource}/?{query}').status_code == 400
+
+@pytest.mark.parametrize('change', ['delete', 'rename'])
+def test_sorted_cursor_survives_changes_to_the_last_row(app, client, change):
+    """La página siguiente no depende del registro usado como cursor."""
+    with app.app_context():
+        db.session.add_all([Customer(name=f'Cliente {i}', email=f'c{i}@ejemplo.com') for i in range(3)])
+        db.session.commit()
+    first = client.get('/api/customers/?sort=name&limit=1').get_json()
+    anchor = first['data'][0]['id']
+    cursor = first['metadata']['pagination']['next_cursor']
+    assert cursor != anchor
+    
+    if change == 'delete':
+        assert client.delete(f'/api/customers/{anchor}').status_code == 200
+    else:
+        response = client.put(f'/api/customers/{anchor}', json={'name': 'Zeta', 'email': 'zeta@ejemplo.com'})
+        assert response.status_code == 200
+    
+    page = client.get(f'/api/customers/?sort=name&limit=1&after={cursor}').get_json()
+    assert [row['name'] for row in page['data']] == ['Cliente 1']
+
+def test_sorted_listing_rejects_bare_ids_as_cursor(client, catalog):
+    """Con un orden distinto del ID el cursor debe ser el token de ``next_cursor``."""
+    assert client.get('/api/customers/?sort=name&after=1').status_code == 400
+    assert client.get('/api/customers/?sort=name&after=no-es-un-cursor').status_code == 400
+    assert client.get('/api/customers/?sort=-id&after=2').status_code == 200
@@ -0,0 +1,107 @@
+"""
+Pruebas para la numeración de facturas.
+"""
+
+import multiprocessing
+import re
+import threading
+from datetime import date
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from models import Customer, Invoice, InvoiceSequence
+from models.base import db
+
+DAY = date(2024, 3, 1)
+
+def _shared_app(uri):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLITE_PRAGMAS': {'busy_timeout': 30000},
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+def _allocate_numbers(uri, count):
+    """Reservar ``count`` números, cada uno en su propia transacción."""
+    app = _shared_app(uri)
+    numbers = []
+    with app.app_context():
+        for _ in range(count):
+            # Reintentar si SQLite no concede el bloqueo de escritura
+            for _ in range(50):
+                try:
+                    numbers.append(Invoice.next_invoice_number(DAY))
+                    db.session.commit()
+                    break
+                except OperationalError:
+                    db.session.rollback()
+            else:
+                raise RuntimeError('No se pudo reservar un número de factura')
+        db.engine.dispose()
+    return numbers
+
+def test_invoice_numbers_are_sequential(app, client):
+    """Las facturas sin número reciben números correlativos del día."""
+    with app.app_context():
+        db.session.add(Customer(name='Cliente', email='cliente@ejemplo.com'))
+        db.session.commit()
+    
+    numbers = [
+        client.post('/api/invoices/', json={'customer_id': 1}).get_json()['data']['invoice_number']
+        for _ in range(3)
+    ]
+    prefix = numbers[0][:-4]
+    assert prefix.startswith('INV-')
+    assert numbers == [f'{prefix}0001', f'{prefix}0002', f'{prefix}0003']
+
+def test_invoice_number_does_not_scan_invoices(app, count_queries):
+    """Asignar un número no consulta la tabla de facturas."""
+    with app.app_context():
+        with count_queries() as statements:
+            assert Invoice.next_invoice_number(DAY) == 'INV-20240301-0001'
+            assert Invoice.next_invoice_number(DAY) == 'INV-20240301-0002'
+    assert statements
+    assert not [s for s in statements if re.search(r'\binvoice\b', s)]
+
+def test_rolled_back_number_is_reused(app):
+    """Un número de una transacción deshecha se vuelve a asignar, sin huecos."""
+    with app.app_context():
+        assert Invoice.next_invoice_number(DAY) == 'INV-20240301-0001'
+        db.session.commit()
+        assert Invoice.next_invoice_number(DAY) == 'INV-20240301-0002'
+        db.session.rollback()
+        assert Invoice.next_invoice_number(DAY) == 'INV-20240301-0002'
+
+def test_concurrent_threads_get_unique_numbers(shared_database_uri):
+    """Varios hilos reservando a la vez obtienen números únicos y correlativos."""
+    _shared_app(shared_database_uri)
+    workers, per_worker = 8, 10
+    barrier = threading.Barrier(workers)
+    results = []
+    
+    def worker():
+        barrier.wait()
+        results.extend(_allocate_numbers(shared_database_uri, per_worker))
+    
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(results) == [f'INV-20240301-{n:04d}' for n in range(1, workers * per_worker + 1)]
+
+def test_concurrent_processes_get_unique_numbers(shared_database_uri):
+    """Varios procesos sobre la misma base de datos tampoco repiten números."""
+    _shared_app(shared_database_uri)
+    workers, per_worker = 4, 10
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        results = pool.starmap(_allocate_numbers, [(shared_database_uri, per_worker)] * workers)
+    
+    numbers = [number for result in results for number in result]
+    assert sorted(numbers) == [f'INV-20240301-{n:04d}' for n in range(1, workers * per_worker + 1)]
+    app = _shared_app(shared_database_uri)
+    with app.app_context():
+        assert db.session.execute(db.select(InvoiceSequence.last_number)).scalar_one() == workers * per_worker
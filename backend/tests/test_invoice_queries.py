@@ -0,0 +1,81 @@
+"""
+Pruebas para la carga anticipada de relaciones en las facturas.
+"""
+
+from datetime import datetime
+from models import Customer, Supplier, Product, Invoice, InvoiceItem
+from models.base import db
+
+def _create_invoices(app, count, items_per_invoice=3, start=0):
+    """Crear facturas con varios items, cada uno con un producto distinto."""
+    with app.app_context():
+        supplier = Supplier(name=f"Proveedor {start}", email=f"proveedor{start}@ejemplo.com")
+        db.session.add(supplier)
+        db.session.flush()
+        
+        for i in range(start, start + count):
+            customer = Customer(name=f"Cliente {i}", email=f"cliente{i}@ejemplo.com")
+            products = [
+                Product(name=f"Producto {i}-{j}", price=10.0, stock=100, supplier_id=supplier.id)
+                for j in range(items_per_invoice)
+            ]
+            db.session.add(customer)
+            db.session.add_all(products)
+            db.session.flush()
+            
+            invoice = Invoice(
+                invoice_number=f"INV-TEST-{i}",
+                date=datetime.utcnow(),
+                customer_id=customer.id
+            )
+            invoice.items = [
+                InvoiceItem(product_id=product.id, quantity=2, price=product.price)
+                for product in products
+            ]
+            db.session.add(invoice)
+        db.session.commit()
+
+def test_invoice_list_query_count_is_constant(app, client, count_queries):
+    """El número de consultas no crece con el número de facturas."""
+    _create_invoices(app, 2)
+    with count_queries() as small:
+        response = client.get('/api/invoices/')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) == 2
+    
+    _create_invoices(app, 8, start=2)
+    with count_queries() as large:
+        response = client.get('/api/invoices/')
+    data = response.get_json()['data']
+    assert len(data) == 10
+    assert all(len(invoice['items']) == 3 for invoice in data)
+    assert all(invoice['customer']['name'] for invoice in data)
+    assert all(item['product']['name'] for invoice in data for item in invoice['items'])
+    
+    assert len(large) == len(small)
+
+def test_invoice_detail_and_items_query_count(app, client, count_queries):
+    """El detalle, sus items y las facturas de un cliente usan pocas consultas.
+    
+    Cada petición incluye además una consulta de validación para el ETag.
+    """
+    _create_invoices(app, 3, items_per_invoice=5)
+    with app.app_context():
+        invoice = Invoice.query.first()
+        invoice_id, customer_id = invoice.id, invoice.customer_id
+    
+    with count_queries() as statements:
+        response = client.get(f'/api/invoices/{invoice_id}')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']['items']) == 5
+    assert len(statements) <= 3
+    
+    with count_queries() as statements:
+        response = client.get(f'/api/invoices/{invoice_id}/items')
+    assert len(response.get_json()['data']) == 5
+    assert len(statements) <= 3
+    
+    with count_queries() as statements:
+        response = client.get(f'/api/customers/{customer_id}/invoices')
+    assert len(response.get_json()['data']) == 1
+    assert len(statements) <= 4
@@ -0,0 +1,142 @@
+"""
+Pruebas para la creación y modificación de facturas.
+"""
+
+import pytest
+from sqlalchemy import event
+from models import Customer, Supplier, Product, Invoice, InvoiceItem, DailySales
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear un cliente y dos productos con stock."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com')
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        products = [
+            Product(name='Producto A', price=10.0, stock=5, supplier_id=supplier.id),
+            Product(name='Producto B', price=4.0, stock=100, supplier_id=supplier.id)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        return {
+            'customer_id': customer.id,
+            'product_ids': [product.id for product in products]
+        }
+
+def _stock(app, product_id):
+    with app.app_context():
+        return db.session.get(Product, product_id).stock
+
+def test_create_invoice_single_commit(app, client, catalog, count_queries):
+    """La factura, sus items y el stock se guardan con un solo commit."""
+    product_a, product_b = catalog['product_ids']
+    commits = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn: commits.append(conn)
+    event.listen(engine, 'commit', listener)
+    try:
+        with count_queries() as statements:
+            response = client.post('/api/invoices/', json={
+                'customer_id': catalog['customer_id'],
+                'invoice_number': 'INV-TEST-1',
+                'items_data': [
+                    {'product_id': product_a, 'quantity': 2},
+                    {'product_id': product_b, 'quantity': 3, 'price': 5.0},
+                    {'product_id': product_a, 'quantity': 1}
+                ]
+            })
+    finally:
+        event.remove(engine, 'commit', listener)
+    
+    assert response.status_code == 201
+    data = response.get_json()['data']
+    assert data['total'] == 45.0
+    assert len(data['items']) == 3
+    assert data['due_date'] is not None
+    assert len(commits) == 1
+    
+    # Los productos se obtienen con una sola consulta
+    product_selects = [s for s in statements if s.startswith('SELECT') and 'FROM product' in s]
+    assert len(product_selects) == 1
+    assert 'IN' in product_selects[0]
+    
+    assert _stock(app, product_a) == 2
+    assert _stock(app, product_b) == 97
+    with app.app_context():
+        assert DailySales.query.one().total == 45.0
+
+def test_create_invoice_insufficient_stock_changes_nothing(app, client, catalog):
+    """Un error de stock no deja facturas, items ni stock modificados."""
+    product_a, product_b = catalog['product_ids']
+    response = client.post('/api/invoices/', json={
+        'customer_id': catalog['customer_id'],
+        'invoice_number': 'INV-TEST-1',
+        'items_data': [
+            {'product_id': product_b, 'quantity': 3},
+            {'product_id': product_a, 'quantity': 4},
+            {'product_id': product_a, 'quantity': 2}
+        ]
+    })
+    assert response.status_code == 400
+    
+    with app.app_context():
+        assert Invoice.query.count() == 0
+        assert InvoiceItem.query.count() == 0
+        assert DailySales.query.count() == 0
+    assert _stock(app, product_a) == 5
+    assert _stock(app, product_b) == 100
+
+def test_create_invoice_unknown_product(client, catalog):
+    """Un producto inexistente devuelve un error de validación."""
+    response = client.post('/api/invoices/', json={
+        'customer_id': catalog['customer_id'],
+        'items_data': [{'product_id': 999, 'quantity': 1}]
+    })
+    assert response.status_code == 400
+
+def test_update_invoice_items_adjusts_stock(app, client, catalog):
+    """Sustituir los items devuelve el stock anterior y reserva el nuevo."""
+    product_a, product_b = catalog['product_ids']
+    invoice_id = client.post('/api/invoices/', json={
+        'customer_id': catalog['customer_id'],
+        'invoice_number': 'INV-TEST-1',
+        'items_data': [{'product_id': product_a, 'quantity': 5}]
+    }).get_json()['data']['id']
+    assert _stock(app, product_a) == 0
+    
+    response = client.put(f'/api/invoices/{invoice_id}', json={
+        'customer_id': catalog['customer_id'],
+        'items_data': [
+            {'product_id': product_a, 'quantity': 2},
+            {'product_id': product_b, 'quantity': 10}
+        ]
+    })
+    assert response.status_code == 200
+    assert response.get_json()['data']['total'] == 60.0
+    assert _stock(app, product_a) == 3
+    assert _stock(app, product_b) == 90
+    
+    # Añadir un item a la factura existente
+    response = client.post(f'/api/invoices/{invoice_id}/items', json={
+        'product_id': product_a,
+        'quantity': 3
+    })
+    assert response.status_code == 201
+    assert response.get_json()['data']['subtotal'] == 30.0
+    assert _stock(app, product_a) == 0
+    with app.app_context():
+        assert db.session.get(Invoice, invoice_id).total == 90.0
+        assert DailySales.query.one().total == 90.0
+    
+    # Sin stock suficiente no se añade nada
+    response = client.post(f'/api/invoices/{invoice_id}/items', json={
+        'product_id': product_a,
+        'quantity': 1
+    })
+    assert response.status_code == 400
+    with app.app_context():
+        assert InvoiceItem.query.filter_by(invoice_id=invoice_id).count() == 3
@@ -0,0 +1,54 @@
+"""
+Pruebas para la paginación por cursor de los endpoints de listado.
+"""
+
+from models import Customer
+from models.base import db, MAX_PAGE_SIZE
+
+def _create_customers(app, count):
+    """Crear clientes de prueba."""
+    with app.app_context():
+        db.session.add_all([
+            Customer(name=f"Cliente {i}", email=f"cliente{i}@ejemplo.com")
+            for i in range(count)
+        ])
+        db.session.commit()
+
+def test_list_walks_all_pages(app, client):
+    """Recorrer todas las páginas siguiendo next_cursor."""
+    _create_customers(app, 25)
+    
+    seen = []
+    after = None
+    while True:
+        url = '/api/customers/?limit=10' + (f'&after={after}' if after else '')
+        data = client.get(url).get_json()
+        assert data['success'] is True
+        assert len(data['data']) <= 10
+        seen.extend(c['id'] for c in data['data'])
+        pagination = data['metadata']['pagination']
+        after = pagination['next_cursor']
+        if not pagination['has_next']:
+            assert after is None
+            break
+    
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 25
+
+def test_limit_is_capped(app, client):
+    """El tamaño de página nunca supera MAX_PAGE_SIZE."""
+    _create_customers(app, MAX_PAGE_SIZE + 5)
+    
+    data = client.get(f'/api/customers/?limit={MAX_PAGE_SIZE * 10}').get_json()
+    assert len(data['data']) == MAX_PAGE_SIZE
+    assert data['metadata']['pagination']['limit'] == MAX_PAGE_SIZE
+    assert data['metadata']['pagination']['has_next'] is True
+
+def test_invalid_pagination_args(client):
+    """Los parámetros inválidos devuelven un error de validación."""
+    response = client.get('/api/customers/?after=abc')
+    assert response.status_code == 400
+    response = client.get('/api/products/?limit=-1')
+    assert response.status_code == 400
+    response = client.get('/api/products/?limit=0')
+    assert response.status_code == 400
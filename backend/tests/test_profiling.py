@@ -0,0 +1,82 @@
+"""
+Pruebas para la instrumentación de las peticiones.
+"""
+
+import pytest
+from sqlalchemy import select
+from app import create_app
+from models import Customer
+from models.base import db
+from tests.conftest import TEST_DATABASE_URI
+
+@pytest.fixture
+def profiled_app(app):
+    """Aplicación con ``PROFILING`` activo sobre la base de datos de pruebas."""
+    profiled = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URI,
+        'PROFILING': True,
+        'PROFILING_N_PLUS_ONE_THRESHOLD': 3,
+    })
+    with profiled.app_context():
+        db.session.add_all([Customer(name=f'Cliente {i}', email=f'cliente{i}@ejemplo.com') for i in range(5)])
+        db.session.commit()
+    
+    @profiled.route('/customer-names')
+    def customer_names():
+        ids = db.session.scalars(select(Customer.id).order_by(Customer.id)).all()
+        return {'names': [db.session.scalar(select(Customer.name).where(Customer.id == id)) for id in ids]}
+    
+    yield profiled
+    with profiled.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+def _metric(text, name, endpoint, method='GET'):
+    prefix = f'{name}{{method="{method}",endpoint="{endpoint}"}} '
+    return next(float(line[len(prefix):]) for line in text.splitlines() if line.startswith(prefix))
+
+def test_requests_report_server_timing_and_metrics(profiled_app):
+    """Cada petición devuelve ``Server-Timing`` y se acumula por endpoint en ``/metrics``."""
+    client = profiled_app.test_client()
+    for _ in range(2):
+        response = client.get('/api/customers/')
+        assert response.status_code == 200
+    
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert ' queries, ' in timing and ' rows"' in timing
+    assert 'serialize;dur=' in timing and 'total;dur=' in timing
+    
+    metrics = client.get('/metrics')
+    assert metrics.mimetype == 'text/plain'
+    assert 'Server-Timing' not in metrics.headers
+    text = metrics.get_data(as_text=True)
+    assert '# TYPE salesnexus_sql_queries_total counter' in text
+    assert _metric(text, 'salesnexus_requests_total', '/api/customers/') == 2
+    assert _metric(text, 'salesnexus_sql_queries_total', '/api/customers/') >= 2
+    assert _metric(text, 'salesnexus_sql_rows_total', '/api/customers/') >= 10
+    assert _metric(text, 'salesnexus_serialization_seconds_total', '/api/customers/') > 0
+    assert _metric(text, 'salesnexus_n_plus_one_total', '/api/customers/') == 0
+
+def test_repeated_statements_are_flagged(profiled_app, caplog):
+    """Una consulta repetida más veces que el umbral se avisa como N+1."""
+    client = profiled_app.test_client()
+    assert len(client.get('/customer-names').get_json()['names']) == 5
+    
+    assert 'Posible N+1 en /customer-names: la consulta se ha ejecutado 5 veces' in caplog.text
+    text = client.get('/metrics').get_data(as_text=True)
+    assert _metric(text, 'salesnexus_n_plus_one_total', '/customer-names') == 1
+    assert _metric(text, 'salesnexus_sql_queries_total', '/customer-names') == 6
+
+def test_profiling_is_disabled_by_default(client):
+    """Sin ``PROFILING`` no hay cabecera ni endpoint de métricas."""
+    assert 'Server-Timing' not in client.get('/api/customers/').headers
+    assert client.get('/metrics').status_code == 404
+
+def test_fan_out_queries_are_added_to_the_request(profiled_app):
+    """Las consultas de los hilos del lote del dashboard cuentan en la petición."""
+    client = profiled_app.test_client()
+    assert client.get('/api/dashboard/batch?widgets=top_products,recent_invoices').status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+    assert _metric(text, 'salesnexus_sql_queries_total', '/api/dashboard/batch') >= 2
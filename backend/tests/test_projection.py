@@ -0,0 +1,87 @@
+"""
+Pruebas para la proyección de campos con ``fields`` y ``expand``.
+"""
+
+import pytest
+from models import Customer, Supplier, Product, Invoice, InvoiceItem
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear un proveedor con un producto y una factura con una línea."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com', notes='Notas largas')
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com', address='Calle Mayor 1')
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        product = Product(name='Producto', description='Descripción larga', price=10.0,
+                          stock=5, supplier_id=supplier.id)
+        db.session.add(product)
+        db.session.flush()
+        invoice = Invoice(customer_id=customer.id, invoice_number='INV-PRJ-1')
+        invoice.items = [InvoiceItem(product_id=product.id, quantity=2, price=10.0)]
+        invoice.calculate_total()
+        db.session.add(invoice)
+        db.session.commit()
+
+def _selects(statements, table):
+    """Sentencias del ORM que leen filas de ``table`` (sin las del ETag)."""
+    return [s for s in statements if s.startswith(f'SELECT {table}.')]
+
+def test_fields_limit_output_and_select(client, catalog, count_queries):
+    """Solo se devuelven y se leen las columnas pedidas, sin relaciones."""
+    with count_queries() as statements:
+        response = client.get('/api/products/?fields=id,name,price')
+    assert response.status_code == 200
+    assert response.get_json()['data'] == [{'id': 1, 'name': 'Producto', 'price': 10.0}]
+    
+    [select] = _selects(statements, 'product')
+    assert 'product.description' not in select
+    assert 'supplier' not in select
+
+def test_fields_with_relation_loads_foreign_key(client, catalog, count_queries):
+    """Una relación en ``fields`` se carga por adelantado junto a su clave."""
+    with count_queries() as statements:
+        response = client.get('/api/invoices/?fields=invoice_number,total,customer')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert list(data[0]) == ['invoice_number', 'total', 'customer']
+    assert data[0]['customer']['name'] == 'Cliente'
+    [select] = _selects(statements, 'invoice')
+    assert 'invoice.customer_id' in select and 'JOIN customer' in select
+    assert 'invoice.status' not in select
+    assert not _selects(statements, 'invoiceitem')
+
+def test_expand_selects_relations(client, catalog):
+    """``expand`` sin ``fields`` devuelve los campos propios y solo las relaciones indicadas."""
+    data = client.get('/api/invoices/?expand=items').get_json()['data'][0]
+    assert 'customer' not in data
+    assert data['items'][0]['product']['name'] == 'Producto'
+    assert data['customer_id'] == 1
+    
+    data = client.get('/api/invoices/1?expand=').get_json()['data']
+    assert 'customer' not in data and 'items' not in data
+    assert data['invoice_number'] == 'INV-PRJ-1'
+    
+    data = client.get('/api/invoices/1').get_json()['data']
+    assert 'customer' in data and 'items' in data
+
+def test_detail_projection_is_cached_separately(client, catalog):
+    """Cada proyección de un registro tiene su propia entrada de caché."""
+    narrow = client.get('/api/suppliers/1?fields=name')
+    full = client.get('/api/suppliers/1')
+    assert narrow.get_json()['data'] == {'name': 'Proveedor'}
+    assert full.get_json()['data']['notes'] == 'Notas largas'
+    assert full.headers['X-Cache'] == 'MISS'
+    assert narrow.headers['ETag'] != full.headers['ETag']
+
+def test_computed_fields(client, catalog):
+    """Los campos calculados se pueden pedir aunque no sean columnas."""
+    response = client.get('/api/invoices/1/items?fields=id,subtotal')
+    assert response.get_json()['data'] == [{'id': 1, 'subtotal': 20.0}]
+
+def test_unknown_fields_are_rejected(client, catalog):
+    """Los campos o relaciones desconocidos devuelven 400."""
+    assert client.get('/api/customers/?fields=name,password').status_code == 400
+    assert client.get('/api/customers/1?fields=items_data').status_code == 400
+    assert client.get('/api/products/?expand=name').status_code == 400
@@ -0,0 +1,90 @@
+"""
+Pruebas para el enrutado de lecturas a la réplica.
+
+La réplica es un segundo fichero SQLite que no recibe las escrituras, de
+modo que lo que devuelve cada petición indica de qué base de datos ha leído.
+"""
+
+import time
+import pytest
+from app import create_app
+from models import Customer
+from models.base import db
+from utils.replica import READ_YOUR_WRITES_COOKIE, replica_engine
+
+pytestmark = pytest.mark.sqlite
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """Aplicación con la base de datos principal y una réplica vacía."""
+    replica_uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': replica_uri})
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_REPLICA_URI': replica_uri,
+    })
+    yield app
+    replica_engine(app).dispose()
+    with app.app_context():
+        db.engine.dispose()
+
+def _names(client, url='/api/customers/'):
+    response = client.get(url)
+    assert response.status_code == 200
+    return [row['name'] for row in response.get_json()['data']]
+
+def test_reads_use_the_replica_except_right_after_a_write(replica_app):
+    """Quien escribe lee de la principal durante la ventana; el resto, de la réplica."""
+    writer, reader = replica_app.test_client(), replica_app.test_client()
+    response = writer.post('/api/customers/', json={'name': 'Ana', 'email': 'ana@ejemplo.com'})
+    assert response.status_code == 201
+    assert READ_YOUR_WRITES_COOKIE in response.headers['Set-Cookie']
+    
+    assert _names(writer) == ['Ana']
+    assert _names(reader) == []
+    
+    writer.set_cookie(READ_YOUR_WRITES_COOKIE, str(time.time() - 1), path='/api')
+    assert _names(writer) == []
+
+def test_search_reads_the_primary(replica_app):
+    """Los endpoints fuera de ``REPLICA_NAMESPACES`` leen de la principal."""
+    replica_app.test_client().post('/api/customers/', json={'name': 'Ana', 'email': 'ana@ejemplo.com'})
+    reader = replica_app.test_client()
+    assert [hit['data']['name'] for hit in reader.get('/api/search/?q=ana').get_json()['data']] == ['Ana']
+
+def test_cached_reads_use_the_replica(replica_app):
+    """Los GET cacheados (dashboard y detalle) leen de la réplica al no estar en la caché."""
+    replica_app.test_client().post('/api/customers/', json={'name': 'Ana', 'email': 'ana@ejemplo.com'})
+    reader = replica_app.test_client()
+    
+    assert reader.get('/api/customers/1').status_code == 404
+    response = reader.get('/api/dashboard/stats')
+    assert response.get_json()['data']['total_customers'] == 0
+    assert response.headers['X-Cache'] == 'MISS'
+
+def test_replica_reads_are_not_cached_right_after_a_change(replica_app):
+    """Lo leído de la réplica no se guarda si sus etiquetas han cambiado durante el retraso supuesto."""
+    replica_app.test_client().post('/api/customers/', json={'name': 'Ana', 'email': 'ana@ejemplo.com'})
+    reader = replica_app.test_client()
+    
+    for _ in range(2):
+        assert reader.get('/api/dashboard/stats').headers['X-Cache'] == 'MISS'
+    
+    replica_app.config['REPLICA_STICKY_SECONDS'] = 0
+    assert reader.get('/api/dashboard/stats').headers['X-Cache'] == 'MISS'
+    response = reader.get('/api/dashboard/stats')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.get_json()['data']['total_customers'] == 0
+
+def test_writes_during_a_replica_read_go_to_the_primary(replica_app):
+    """Un flush dentro de un GET enrutado a la réplica escribe en la principal."""
+    with replica_app.test_request_context('/api/customers/'):
+        replica_app.preprocess_request()
+        assert db.session.query(Customer).count() == 0
+        Customer(name='Luis', email='luis@ejemplo.com').save()
+        db.session.remove()
+    
+    assert _names(replica_app.test_client()) == []
+    with replica_app.app_context():
+        assert db.session.query(Customer.name).scalar() == 'Luis'
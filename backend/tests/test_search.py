@@ -0,0 +1,123 @@
+"""
+Pruebas para la búsqueda de texto completo.
+"""
+
+import pytest
+from models import Customer, Supplier, Product
+from models.base import db
+
+@pytest.fixture
+def catalog(app):
+    """Crear clientes, un proveedor y productos con textos que se solapan."""
+    with app.app_context():
+        supplier = Supplier(name='Distribuciones Lumbre', email='lumbre@ejemplo.com',
+                            account_manager='Lucía Ortega', notes='Entrega de lámparas los lunes')
+        db.session.add_all([
+            supplier,
+            Customer(name='José García', email='jgarcia@ejemplo.com', phone='+34 600 123456'),
+            Customer(name='Ana Pérez', email='ana.perez@correo.es', phone='+34 611 654321'),
+        ])
+        db.session.flush()
+        db.session.add_all([
+            Product(name='Lámpara de mesa', description='Luz cálida', category='Hogar',
+                    price=25.0, stock=3, supplier_id=supplier.id),
+            Product(name='Flexo', description='Flexo con lámpara LED orientable', category='Oficina',
+                    price=18.0, stock=9, supplier_id=supplier.id),
+        ])
+        db.session.commit()
+
+def _search(client, query):
+    response = client.get(f'/api/search/?{query}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def _hits(client, query):
+    return [(hit['type'], hit['data']['name']) for hit in _search(client, query)['data']]
+
+@pytest.mark.sqlite
+def test_search_ignores_case_and_accents(client, catalog):
+    """La última palabra se busca como prefijo, sin distinguir mayúsculas ni acentos."""
+    assert _hits(client, 'q=garc') == [('customer', 'José García')]
+    assert _hits(client, 'q=jose garc') == [('customer', 'José García')]
+    assert _hits(client, 'q=garc jose') == []
+    assert _hits(client, 'q=PEREZ') == [('customer', 'Ana Pérez')]
+    assert _hits(client, 'q=ana.perez@correo') == [('customer', 'Ana Pérez')]
+    assert _hits(client, 'q=654') == [('customer', 'Ana Pérez')]
+    assert _hits(client, 'q=lucia') == [('supplier', 'Distribuciones Lumbre')]
+
+@pytest.mark.sqlite
+def test_results_are_ranked_across_types(client, catalog):
+    """Las coincidencias en el nombre pesan más que en la descripción o las notas."""
+    body = _search(client, 'q=lampara')
+    assert body['metadata']['backend'] == 'fts5'
+    hits = [(hit['type'], hit['data']['name']) for hit in body['data']]
+    assert hits[0] == ('product', 'Lámpara de mesa')
+    assert set(hits[1:]) == {('product', 'Flexo'), ('supplier', 'Distribuciones Lumbre')}
+    scores = [hit['score'] for hit in body['data']]
+    assert scores == sorted(scores, reverse=True)
+    
+    assert _hits(client, 'q=lampara&type=supplier') == [('supplier', 'Distribuciones Lumbre')]
+
+@pytest.mark.sqlite
+def test_pagination(client, catalog):
+    """``offset`` y ``limit`` paginan los resultados ordenados."""
+    first = _search(client, 'q=lampara&limit=2')
+    assert first['metadata']['pagination']['next_offset'] == 2
+    last = _search(client, 'q=lampara&limit=2&offset=2')
+    assert last['metadata']['pagination']['has_next'] is False
+    ids = [(hit['type'], hit['id']) for hit in first['data'] + last['data']]
+    assert len(set(ids)) == 3
+
+@pytest.mark.sqlite
+def test_index_follows_writes(client, catalog):
+    """Las altas, cambios y bajas (también las masivas) se reflejan en el índice."""
+    response = client.put('/api/customers/1', json={'name': 'José Martín', 'email': 'jm@ejemplo.com'})
+    assert response.status_code == 200
+    assert _hits(client, 'q=garcia') == []
+    assert _hits(client, 'q=martin') == [('customer', 'José Martín')]
+    
+    assert client.delete('/api/customers/2').status_code == 200
+    assert _hits(client, 'q=perez') == []
+    
+    response = client.post('/api/customers/bulk', json=[
+        {'name': 'Marta Quintero', 'email': 'marta@ejemplo.com'}
+    ])
+    assert response.status_code == 201
+    assert _hits(client, 'q=quint') == [('customer', 'Marta Quintero')]
+
+@pytest.mark.parametrize('backend', ['fts5', 'like'])
+def test_ranking_happens_before_the_candidate_limit(app, client, monkeypatch, backend):
+    """Con más coincidencias que el límite se ordenan las más relevantes y se indica el corte."""
+    if backend == 'fts5' and app.extensions['search_backend'] != 'fts5':
+        pytest.skip('SQLite sin FTS5')
+    app.extensions['search_backend'] = backend
+    monkeypatch.setattr('utils.search.MAX_SEARCH_CANDIDATES', 20)
+    with app.app_context():
+        db.session.add_all([Customer(name=f'Cliente {i}', email=f'c{i}@garcia.com') for i in range(30)])
+        db.session.add(Customer(name='Garcia', email='contacto@ejemplo.com'))
+        db.session.commit()
+    
+    body = _search(client, 'q=garcia&type=customer&limit=5')
+    assert body['data'][0]['data']['name'] == 'Garcia'
+    assert body['metadata']['pagination']['truncated'] is True
+    
+    body = _search(client, 'q=garcia&type=customer&offset=15&limit=10')
+    assert len(body['data']) == 5
+    assert body['metadata']['pagination']['has_next'] is False
+    assert body['metadata']['pagination']['truncated'] is True
+    
+    body = _search(client, 'q=contacto&type=customer')
+    assert body['metadata']['pagination']['truncated'] is False
+
+def test_like_fallback(app, client, catalog):
+    """Sin FTS5 se busca con LIKE sobre los mismos campos."""
+    app.extensions['search_backend'] = 'like'
+    body = _search(client, 'q=ana perez')
+    assert body['metadata']['backend'] == 'like'
+    assert [hit['data']['name'] for hit in body['data']] == ['Ana Pérez']
+    assert {hit['type'] for hit in _search(client, 'q=lámpara')['data']} == {'product', 'supplier'}
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=%20!!', 'q=ana&type=invoice', 'q=ana&offset=-1', 'q=ana&limit=0'])
+def test_invalid_search(client, catalog, query):
+    """La consulta es obligatoria y los tipos deben existir."""
+    assert client.get(f'/api/search/?{query}').status_code == 400
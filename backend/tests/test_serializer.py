@@ -0,0 +1,127 @@
+"""
+Pruebas para los serializadores compilados de los esquemas.
+"""
+
+import json
+from datetime import datetime
+from unittest import mock
+import pytest
+from marshmallow import Schema, fields, post_dump
+from models import Customer, Supplier, Product, Invoice, InvoiceItem
+from models.base import db
+from schemas.base import BaseSchema
+from schemas.customer_schema import customers_schema
+from schemas.invoice_schema import invoice_schema, invoices_schema
+from schemas.product_schema import products_schema
+from utils.serializer import compile_dumper
+
+@pytest.fixture
+def catalog(app):
+    """Crear facturas con líneas, productos y valores nulos y no ASCII."""
+    with app.app_context():
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customer = Customer(name='Cliente ñandú', email='cliente@ejemplo.com', phone=None)
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        products = [
+            Product(name='Con proveedor', price=9.99, stock=10, supplier_id=supplier.id),
+            Product(name='Sin categoría', price=3, stock=0, description='«Descripción»',
+                    supplier_id=supplier.id),
+        ]
+        db.session.add_all(products)
+        db.session.flush()
+        for day in (1, 2):
+            invoice = Invoice(
+                customer_id=customer.id,
+                invoice_number=f'INV-SER-{day}',
+                date=datetime(2024, 5, day, 8, 30),
+                payment_date=datetime(2024, 5, day + 1) if day == 2 else None
+            )
+            invoice.items = [
+                InvoiceItem(product_id=product.id, quantity=day, price=product.price)
+                for product in products
+            ]
+            invoice.calculate_total()
+            db.session.add(invoice)
+        db.session.commit()
+
+def _marshmallow_dump(schema, obj):
+    """Serializar solo con marshmallow, también los esquemas anidados."""
+    with mock.patch.object(BaseSchema, 'dump', Schema.dump):
+        return schema.dump(obj)
+
+def test_compiled_output_is_identical(app, catalog):
+    """La salida compilada coincide con marshmallow, también al codificarla en JSON."""
+    with app.app_context():
+        cases = [
+            (invoices_schema, Invoice.query_with_details().all()),
+            (invoice_schema, Invoice.get_with_details(2)),
+            (products_schema, Product.query.all()),
+            (customers_schema, Customer.query.all()),
+        ]
+        for schema, obj in cases:
+            compiled = schema.dump(obj)
+            expected = _marshmallow_dump(schema, obj)
+            assert compiled == expected
+            assert json.dumps(compiled).encode() == json.dumps(expected).encode()
+            assert list(compiled if isinstance(compiled, dict) else compiled[0]) == \
+                list(expected if isinstance(expected, dict) else expected[0])
+        
+        assert invoices_schema._dumper
+
+def test_rows_without_all_attributes_fall_back(app, catalog):
+    """Un objeto sin todos los atributos del esquema se serializa con marshmallow."""
+    with app.app_context():
+        row = db.session.execute(db.select(Customer.id, Customer.name)).one()
+        assert customers_schema.dump([row]) == [{'id': row.id, 'name': row.name}]
+
+def test_attribute_errors_inside_properties_propagate():
+    """Un ``AttributeError`` dentro de una propiedad no se confunde con un atributo ausente."""
+    class BrokenLine:
+        quantity = 1
+        
+        @property
+        def total(self):
+            return self.price * self.quantity
+    
+    class LineSchema(BaseSchema):
+        quantity = fields.Int()
+        total = fields.Float()
+    
+    class OrderSchema(BaseSchema):
+        lines = fields.Nested(LineSchema, many=True)
+    
+    class Order:
+        lines = [BrokenLine()]
+    
+    with pytest.raises(AttributeError, match='price'):
+        LineSchema().dump(BrokenLine())
+    with pytest.raises(AttributeError, match='price'):
+        OrderSchema().dump(Order())
+
+def test_schemas_with_dump_processors_are_not_compiled():
+    """Los esquemas con ``post_dump`` se siguen serializando con marshmallow."""
+    class TaggedSchema(BaseSchema):
+        name = fields.Str()
+        
+        @post_dump
+        def add_tag(self, data, **kwargs):
+            data['tag'] = 'x'
+            return data
+    
+    class Item:
+        name = 'a'
+    
+    assert compile_dumper(TaggedSchema()) is None
+    assert TaggedSchema().dump(Item()) == {'name': 'a', 'tag': 'x'}
+
+def test_orjson_representation(app, client, catalog):
+    """Con ``JSON_ORJSON`` la respuesta tiene el mismo contenido en JSON compacto."""
+    orjson = pytest.importorskip('orjson')
+    expected = client.get('/api/invoices/').get_json()
+    
+    app.config['JSON_ORJSON'] = True
+    response = client.get('/api/invoices/')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.data == orjson.dumps(expected, option=orjson.OPT_APPEND_NEWLINE)
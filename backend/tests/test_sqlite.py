@@ -0,0 +1,60 @@
+"""
+Pruebas para los perfiles de conexión de SQLite.
+"""
+
+import pytest
+from sqlalchemy import text
+from app import create_app
+from models import Customer, Invoice
+from models.base import db
+
+def _pragmas(app, *names):
+    with app.app_context():
+        return {name: db.session.execute(text(f'PRAGMA {name}')).scalar() for name in names}
+
+def _file_app(path, **config):
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(path),
+        **config
+    })
+
+@pytest.mark.sqlite
+def test_production_profile_is_applied_to_every_connection(tmp_path):
+    """El perfil por defecto activa WAL, synchronous=NORMAL y las claves foráneas."""
+    app = _file_app(tmp_path / 'production.db')
+    assert _pragmas(app, 'journal_mode', 'synchronous', 'foreign_keys', 'busy_timeout') == {
+        'journal_mode': 'wal',
+        'synchronous': 1,
+        'foreign_keys': 1,
+        'busy_timeout': 5000
+    }
+
+@pytest.mark.sqlite
+def test_profile_can_be_overridden(tmp_path):
+    """``SQLITE_PRAGMAS`` sustituye valores del perfil y ``default`` no cambia nada."""
+    app = _file_app(tmp_path / 'custom.db', SQLITE_PRAGMAS={'synchronous': 'FULL', 'busy_timeout': 100})
+    assert _pragmas(app, 'synchronous', 'busy_timeout') == {'synchronous': 2, 'busy_timeout': 100}
+    
+    app = _file_app(tmp_path / 'default.db', SQLITE_PROFILE='default')
+    assert _pragmas(app, 'journal_mode', 'foreign_keys') == {'journal_mode': 'delete', 'foreign_keys': 0}
+
+@pytest.mark.sqlite
+def test_unknown_profile_is_rejected(tmp_path):
+    """Un perfil desconocido impide arrancar la aplicación."""
+    with pytest.raises(ValueError):
+        _file_app(tmp_path / 'unknown.db', SQLITE_PROFILE='turbo')
+
+def test_rows_with_dependents_cannot_be_deleted(app, client):
+    """Con las claves foráneas activas, borrar un cliente con facturas devuelve 400."""
+    with app.app_context():
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com')
+        db.session.add(customer)
+        db.session.flush()
+        db.session.add(Invoice(customer_id=customer.id, invoice_number='INV-FK-1', total=10.0))
+        db.session.commit()
+    
+    response = client.delete('/api/customers/1')
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == 'VALIDATION_ERROR'
+    assert client.get('/api/invoices/').get_json()['data'][0]['customer_id'] == 1
@@ -0,0 +1,96 @@
+"""
+Pruebas de concurrencia de la reserva de stock.
+"""
+
+import threading
+import pytest
+from app import create_app
+from models import Customer, Supplier, Product, Invoice, InvoiceItem
+from models.base import db
+
+INITIAL_STOCK = 20
+WORKERS = 16
+QUANTITY = 3
+
+@pytest.fixture
+def shared_app(shared_database_uri):
+    """Aplicación sobre una base de datos compartida por varios hilos."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': shared_database_uri,
+        'SQLITE_PRAGMAS': {'busy_timeout': 30000},
+    })
+    with app.app_context():
+        db.create_all()
+        supplier = Supplier(name='Proveedor', email='proveedor@ejemplo.com')
+        customer = Customer(name='Cliente', email='cliente@ejemplo.com')
+        db.session.add_all([supplier, customer])
+        db.session.flush()
+        db.session.add(Product(name='Producto', price=10.0, stock=INITIAL_STOCK, supplier_id=supplier.id))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+def _run_concurrently(app, request_for_worker):
+    """Lanzar ``WORKERS`` peticiones a la vez y devolver sus códigos de estado."""
+    barrier = threading.Barrier(WORKERS)
+    statuses = [None] * WORKERS
+    
+    def worker(index):
+        client = app.test_client()
+        barrier.wait()
+        # Reintentar si SQLite no concede el bloqueo de escritura
+        for _ in range(20):
+            response = request_for_worker(client, index)
+            if response.status_code != 500:
+                break
+        statuses[index] = response.status_code
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+def _state(app):
+    with app.app_context():
+        stock = db.session.execute(db.select(Product.stock)).scalar_one()
+        sold = db.session.execute(db.select(db.func.coalesce(db.func.sum(InvoiceItem.quantity), 0))).scalar_one()
+        return stock, sold
+
+def test_concurrent_invoices_never_oversell(shared_app):
+    """Con muchas facturas simultáneas el stock nunca queda negativo."""
+    def create_invoice(client, index):
+        return client.post('/api/invoices/', json={
+            'customer_id': 1,
+            'invoice_number': f'INV-CONC-{index}',
+            'items_data': [{'product_id': 1, 'quantity': QUANTITY}]
+        })
+    
+    statuses = _run_concurrently(shared_app, create_invoice)
+    
+    assert set(statuses) <= {201, 400}
+    stock, sold = _state(shared_app)
+    assert statuses.count(201) == INITIAL_STOCK // QUANTITY
+    assert stock == INITIAL_STOCK - statuses.count(201) * QUANTITY
+    assert stock >= 0
+    assert sold == INITIAL_STOCK - stock
+
+def test_concurrent_items_never_oversell(shared_app):
+    """Añadir items a la vez a la misma factura tampoco vende de más."""
+    with shared_app.app_context():
+        db.session.add(Invoice(customer_id=1, invoice_number='INV-CONC'))
+        db.session.commit()
+    
+    def add_item(client, index):
+        return client.post('/api/invoices/1/items', json={'product_id': 1, 'quantity': QUANTITY})
+    
+    statuses = _run_concurrently(shared_app, add_item)
+    
+    assert set(statuses) <= {201, 400}
+    stock, sold = _state(shared_app)
+    assert statuses.count(201) == INITIAL_STOCK // QUANTITY
+    assert stock == INITIAL_STOCK % QUANTITY
+    assert sold == INITIAL_STOCK - stock
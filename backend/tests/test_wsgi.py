@@ -0,0 +1,80 @@
+"""
+Pruebas para el punto de entrada de producción (gunicorn).
+"""
+
+import logging
+import os
+import runpy
+from pathlib import Path
+import pytest
+from sqlalchemy import text
+from app import create_app
+from models import Customer
+from models.base import db
+from utils.cache import require_shared_cache
+from utils.database import dispose_engines
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / 'gunicorn.conf.py'
+
+def test_gunicorn_settings_from_environment(monkeypatch):
+    """Los workers dependen de los núcleos y los tiempos se configuran por entorno."""
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    settings = runpy.run_path(str(GUNICORN_CONF))
+    assert settings['workers'] == os.cpu_count() * 2 + 1
+    assert settings['preload_app'] is True
+    assert callable(settings['post_fork'])
+    assert callable(settings['when_ready'])
+    
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('GUNICORN_TIMEOUT', '60')
+    monkeypatch.setenv('GUNICORN_KEEPALIVE', '2')
+    settings = runpy.run_path(str(GUNICORN_CONF))
+    assert (settings['workers'], settings['timeout'], settings['keepalive']) == (3, 60, 2)
+
+def test_process_local_cache_is_disabled_with_several_workers(app, client, caplog):
+    """Con varios workers y SimpleCache la caché se desactiva para no servir respuestas antiguas."""
+    logger = logging.getLogger('gunicorn.error')
+    assert app.config['CACHE_TYPE'] == 'SimpleCache'
+    assert require_shared_cache(app, 1, logger) is False
+    
+    with caplog.at_level(logging.WARNING, logger='gunicorn.error'):
+        assert require_shared_cache(app, 4, logger) is True
+    assert 'NullCache' in caplog.text
+    assert app.config['CACHE_TYPE'] == 'NullCache'
+    assert require_shared_cache(app, 4, logger) is False
+    
+    with app.app_context():
+        db.session.add(Customer(name='Ana', email='ana@ejemplo.com'))
+        db.session.commit()
+    assert client.get('/api/customers/1').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/customers/1').headers['X-Cache'] == 'MISS'
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requiere os.fork')
+def test_forked_worker_opens_its_own_connections(shared_database_uri):
+    """Tras el fork el worker no reutiliza las conexiones del maestro, que siguen abiertas."""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': shared_database_uri})
+    with app.app_context():
+        engine = db.engine
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        assert engine.pool.checkedin() == 1
+    
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            dispose_engines(app)
+            with app.app_context():
+                if engine.pool.checkedin() == 0:
+                    with engine.connect() as connection:
+                        status = 0 if connection.execute(text('SELECT 1')).scalar() == 1 else 1
+        finally:
+            os._exit(status)
+    
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    with app.app_context():
+        assert engine.pool.checkedin() == 1
+        with engine.connect() as connection:
+            assert connection.execute(text('SELECT 1')).scalar() == 1
+        engine.dispose()
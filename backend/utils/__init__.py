@@ -2,4 +2,5 @@
 Inicialización del paquete utils.
 """
 
-from utils.errors import register_error_handlers, APIError, NotFoundError, ValidationError, DatabaseError 
\ No newline at end of file
+from utils.errors import register_error_handlers, APIError, NotFoundError, ValidationError, DatabaseError
+from utils.pagination import get_pagination_args, pagination_metadata, pagination_params
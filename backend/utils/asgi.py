@@ -0,0 +1,142 @@
+"""
+Modo de servicio asíncrono (ASGI).
+
+``create_asgi_app`` envuelve la aplicación Flask en una aplicación ASGI
+para servirla con uvicorn (``asgi.py``). Los GET de ``ASYNC_PATHS`` (el
+dashboard y los listados) se atienden en el bucle de eventos: la vista de
+Flask se ejecuta dentro de un greenlet de SQLAlchemy y sus lecturas van a
+un engine asíncrono (aiosqlite o asyncpg), de modo que mientras una
+consulta espera a la base de datos el bucle atiende otras peticiones. Se
+reutilizan las mismas vistas, modelos, esquemas, caché y ETags; solo cambia
+el engine con el que se leen los datos (``g.read_bind``, ver
+``RoutingSession``). El resto de peticiones, incluidas todas las escrituras,
+se atienden con la aplicación WSGI en ``ASYNC_WSGI_THREADS`` hilos.
+
+Todo el trabajo de CPU de esas peticiones (serialización, JSON) y las
+llamadas bloqueantes que no pasan por los engines asíncronos (por ejemplo,
+una caché en Redis) se ejecutan en el bucle de eventos, por lo que este modo
+compensa cuando las peticiones pasan la mayor parte del tiempo esperando a
+la base de datos.
+"""
+
+import io
+from fnmatch import fnmatch
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import g, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import greenlet_spawn
+from utils.database import engine_options, normalize_database_uri
+from utils.profiling import instrument_engine
+from utils.replica import replica_engine
+from utils.sqlite import listen_pragmas, sqlite_pragmas
+
+# Clave del entorno WSGI que marca las peticiones atendidas en el bucle de eventos
+ASYNC_ENVIRON_KEY = 'salesnexus.async'
+
+# Driver asíncrono de cada motor de base de datos
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+def async_database_uri(uri):
+    """URI equivalente a ``uri`` con el driver asíncrono de su motor."""
+    url = make_url(normalize_database_uri(uri))
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono para '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def create_read_engine(config, uri, **pragmas):
+    """Engine asíncrono de lectura para ``uri`` con las opciones de pool de la aplicación."""
+    url = async_database_uri(uri)
+    options = engine_options(config, str(uri))
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        # aiosqlite usa por defecto una conexión (y un hilo) nueva por consulta
+        options = {
+            'poolclass': AsyncAdaptedQueuePool,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+        }
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == 'sqlite':
+        listen_pragmas(engine.sync_engine, {**sqlite_pragmas(config), **pragmas})
+    return engine
+
+def init_async(app):
+    """Crear los engines asíncronos y enrutar a ellos las lecturas de las peticiones asíncronas."""
+    engines = {'primary': create_read_engine(app.config, app.config['SQLALCHEMY_DATABASE_URI'])}
+    if replica_engine(app) is not None:
+        engines['replica'] = create_read_engine(
+            app.config, app.config['SQLALCHEMY_REPLICA_URI'], query_only='ON'
+        )
+    if 'profiling' in app.extensions:
+        for engine in engines.values():
+            instrument_engine(engine.sync_engine)
+    app.extensions['async_engines'] = engines
+    
+    @app.before_request
+    def choose_async_read_bind():
+        if not request.environ.get(ASYNC_ENVIRON_KEY):
+            return
+        g.primary_read_bind = engines['primary'].sync_engine
+        if 'replica' in engines and g.get('read_bind') is replica_engine(app):
+            g.read_bind = engines['replica'].sync_engine
+        else:
+            g.read_bind = g.primary_read_bind
+
+def is_async_path(app, path):
+    """Indicar si los GET a ``path`` se atienden en el bucle de eventos."""
+    return any(fnmatch(path, pattern) for pattern in app.config['ASYNC_PATHS'])
+
+def _call_wsgi(app, environ):
+    """Ejecutar la aplicación WSGI y devolver el estado, las cabeceras y el cuerpo."""
+    response = {}
+    chunks = []
+    
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+        return chunks.append
+    
+    result = app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+async def _serve_async(app, scope, send):
+    environ = build_environ(scope, io.BytesIO())
+    environ[ASYNC_ENVIRON_KEY] = True
+    status, headers, body = await greenlet_spawn(_call_wsgi, app, environ)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+def create_asgi_app(app):
+    """Aplicación ASGI que sirve ``app`` con las lecturas de ``ASYNC_PATHS`` asíncronas."""
+    init_async(app)
+    wsgi = WSGIMiddleware(app, workers=app.config['ASYNC_WSGI_THREADS'])
+    
+    async def asgi(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    for engine in app.extensions['async_engines'].values():
+                        await engine.dispose()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] == 'http' and scope['method'] == 'GET' and is_async_path(app, scope['path']):
+            await _serve_async(app, scope, send)
+        else:
+            await wsgi(scope, receive, send)
+    
+    return asgi
@@ -0,0 +1,215 @@
+"""
+Utilidades para la importación masiva de registros.
+
+Los registros se leen de la petición como un array JSON o, en streaming,
+como NDJSON (``application/x-ndjson``) o CSV (``text/csv``). Se procesan en
+lotes: cada lote se valida con el esquema en modo ``many=True`` y las filas
+válidas se insertan con un único ``executemany``, de modo que la memoria
+usada depende del tamaño del lote y no del de la importación.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from flask import request, current_app
+from marshmallow import ValidationError as SchemaValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from models.base import db
+from utils.errors import ValidationError
+from utils.sqlite import begin_write
+
+# Tamaño de lote por defecto y máximo, y número máximo de errores devueltos
+DEFAULT_BULK_CHUNK_SIZE = 1000
+MAX_BULK_CHUNK_SIZE = 10000
+MAX_BULK_ERRORS = 1000
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+CSV_MIMETYPES = ('text/csv', 'application/csv')
+
+# Parámetros de la importación masiva para la documentación Swagger
+bulk_params = {
+    'chunk_size': f'Registros por lote (por defecto {DEFAULT_BULK_CHUNK_SIZE}, máximo {MAX_BULK_CHUNK_SIZE})'
+}
+
+def _read_ndjson(stream):
+    """Leer un registro por línea; las líneas inválidas se devuelven como texto."""
+    for line in io.TextIOWrapper(stream, encoding='utf-8'):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+def _read_csv(stream):
+    """Leer filas CSV con cabecera, ignorando las columnas vacías."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for row in reader:
+        yield {key: value for key, value in row.items() if key and value not in ('', None)}
+
+def read_bulk_payload():
+    """Obtener un iterador sobre los registros enviados en la petición."""
+    mimetype = request.mimetype
+    if mimetype in NDJSON_MIMETYPES:
+        return _read_ndjson(io.BufferedReader(request.stream))
+    if mimetype in CSV_MIMETYPES:
+        return _read_csv(io.BufferedReader(request.stream))
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValidationError('Se esperaba un array JSON, NDJSON o CSV')
+    return iter(data)
+
+def get_chunk_size():
+    """Tamaño de lote de la petición o de la configuración de la aplicación."""
+    value = request.args.get('chunk_size')
+    default = current_app.config.get('BULK_CHUNK_SIZE', DEFAULT_BULK_CHUNK_SIZE)
+    if not value:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError("El parámetro 'chunk_size' debe ser un número entero")
+    return min(max(value, 1), MAX_BULK_CHUNK_SIZE)
+
+class BulkImporter:
+    """
+    Importador masivo de registros para un modelo.
+    
+    ``unique`` son las columnas con restricción de unicidad, que se
+    comprueban contra la base de datos y contra las filas ya importadas.
+    ``references`` asocia columnas de clave foránea con el modelo al que
+    apuntan para comprobar que existen. Cada lote se confirma por separado.
+    """
+    
+    def __init__(self, model, schema, unique=(), references=None):
+        self.model = model
+        self.schema = schema
+        self.unique = unique
+        self.references = references or {}
+        self.inserted = 0
+        self.errors = []
+        self.error_count = 0
+        self._seen = {column: set() for column in unique}
+    
+    def run(self, rows, chunk_size):
+        """Importar todos los registros y devolver el resumen."""
+        rows = iter(rows)
+        offset = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk, offset)
+            offset += len(chunk)
+        return {
+            'received': offset,
+            'inserted': self.inserted,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+    
+    def _add_error(self, row, errors):
+        """Registrar el error de una fila (numeradas desde 0)."""
+        self.error_count += 1
+        if len(self.errors) < MAX_BULK_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+    
+    def _import_chunk(self, chunk, offset):
+        """Validar e insertar un lote de registros."""
+        # Las comprobaciones leen antes de insertar: con SQLite el lote toma
+        # el bloqueo de escritura desde el principio (ver ``begin_write``)
+        begin_write(db.session)
+        # Validar todo el lote con el esquema en modo many=True
+        try:
+            loaded = self.schema.load(chunk, many=True)
+            invalid = {}
+        except SchemaValidationError as e:
+            loaded = e.valid_data
+            invalid = e.messages
+        
+        valid = []
+        for index, data in enumerate(loaded):
+            if index in invalid:
+                self._add_error(offset + index, invalid[index])
+            else:
+                valid.append((offset + index, data))
+        
+        valid = self._check_references(self._check_unique(valid))
+        if not valid:
+            return
+        
+        # Insertar las filas válidas con un executemany por cada combinación
+        # de columnas presentes (las ausentes toman su valor por defecto)
+        table = self.model.__table__
+        groups = defaultdict(list)
+        for _, data in valid:
+            groups[frozenset(data)].append(data)
+        try:
+            with db.session.begin_nested():
+                for rows in groups.values():
+                    db.session.execute(table.insert(), rows)
+        except IntegrityError:
+            # Otra escritura concurrente ha provocado un conflicto: insertar
+            # fila a fila para identificar las filas que fallan
+            for row, data in valid:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(table.insert(), [data])
+                    self.inserted += 1
+                except IntegrityError as e:
+                    self._add_error(row, {'_schema': [str(e.orig)]})
+        else:
+            self.inserted += len(valid)
+        self.model.mark_changed()
+        db.session.commit()
+    
+    def _check_unique(self, valid):
+        """Descartar filas que repiten un valor único ya existente o ya importado."""
+        for column_name in self.unique:
+            column = getattr(self.model, column_name)
+            values = {data[column_name] for _, data in valid if data.get(column_name) is not None}
+            existing = set(
+                db.session.execute(select(column).where(column.in_(values))).scalars()
+            ) if values else set()
+            seen = self._seen[column_name]
+            
+            remaining = []
+            for row, data in valid:
+                value = data.get(column_name)
+                if value in existing or value in seen:
+                    message = f"Ya existe un registro con {column_name} '{value}'"
+                    self._add_error(row, {column_name: [message]})
+                else:
+                    if value is not None:
+                        seen.add(value)
+                    remaining.append((row, data))
+            valid = remaining
+        return valid
+    
+    def _check_references(self, valid):
+        """Descartar filas cuyas claves foráneas apuntan a registros inexistentes."""
+        for column_name, target in self.references.items():
+            ids = {data[column_name] for _, data in valid if data.get(column_name) is not None}
+            existing = set(
+                db.session.execute(select(target.id).where(target.id.in_(ids))).scalars()
+            ) if ids else set()
+            
+            remaining = []
+            for row, data in valid:
+                if data.get(column_name) is not None and data[column_name] not in existing:
+                    message = f"{target.__name__} con ID {data[column_name]} no encontrado"
+                    self._add_error(row, {column_name: [message]})
+                else:
+                    remaining.append((row, data))
+            valid = remaining
+        return valid
+
+def bulk_import(model, schema, unique=(), references=None):
+    """Importar los registros de la petición actual y devolver el resumen."""
+    importer = BulkImporter(model, schema, unique=unique, references=references)
+    return importer.run(read_bulk_payload(), get_chunk_size())
@@ -0,0 +1,186 @@
+"""
+Caché de respuestas para los endpoints de lectura.
+
+Las respuestas se guardan con Flask-Caching bajo una clave formada por la
+ruta y los parámetros de la petición, junto con la versión de cada una de
+las etiquetas de las que dependen (``product`` para toda la tabla,
+``product:5`` para un registro). Al confirmar una transacción se cambia la
+versión de las etiquetas de los registros modificados, de modo que solo
+dejan de ser válidas las respuestas que dependen de ellos.
+
+Cada versión empieza por la hora en que se creó. Una respuesta leída de la
+réplica no se guarda si alguna de sus etiquetas ha cambiado hace menos de
+``REPLICA_STICKY_SECONDS``: la réplica podría no tener aún ese cambio y la
+entrada seguiría siendo válida con los datos antiguos.
+"""
+
+import time
+from collections import Counter
+from functools import wraps
+from itertools import chain
+from threading import Lock
+from urllib.parse import urlencode
+from uuid import uuid4
+from flask import current_app, request
+from flask_caching import Cache
+from sqlalchemy import event
+from models.base import db, BaseModel, CACHE_TAGS_KEY
+from utils.replica import reading_replica
+
+# Instancia de la caché, inicializada en ``create_app``
+cache = Cache()
+
+TAG_PREFIX = 'tag:'
+VIEW_PREFIX = 'view:'
+
+_stats_lock = Lock()
+
+# Backends que guardan los datos en la memoria de cada proceso
+PROCESS_LOCAL_CACHES = {'simple', 'simplecache'}
+
+def init_cache(app):
+    """Inicializar la caché y registrar la invalidación al confirmar transacciones."""
+    app.config.setdefault('CACHE_TYPE', 'SimpleCache')
+    app.config.setdefault('CACHE_DEFAULT_TIMEOUT', 300)
+    cache.init_app(app)
+    app.extensions['cache_stats'] = Counter()
+    
+    if not event.contains(db.session, 'after_flush', _collect_tags):
+        event.listen(db.session, 'after_flush', _collect_tags)
+        event.listen(db.session, 'after_commit', _invalidate_pending)
+        event.listen(db.session, 'after_rollback', _discard_pending)
+
+def is_process_local(cache_type):
+    """Indicar si ``cache_type`` guarda los datos en la memoria de cada proceso."""
+    return cache_type.rsplit('.', 1)[-1].lower() in PROCESS_LOCAL_CACHES
+
+def require_shared_cache(app, workers, logger):
+    """
+    Desactivar la caché si varios procesos usarían cada uno la suya.
+    
+    Una escritura atendida por un worker solo invalida las etiquetas de su
+    propia caché, así que los demás devolverían respuestas antiguas hasta
+    ``CACHE_DEFAULT_TIMEOUT``. Con más de un worker y un backend en memoria
+    se usa ``NullCache`` y se avisa en el log. Devuelve si se ha desactivado.
+    """
+    if workers <= 1 or not is_process_local(app.config['CACHE_TYPE']):
+        return False
+    logger.warning(
+        "CACHE_TYPE=%s es local a cada proceso y hay %d workers: la caché de "
+        "respuestas se desactiva (NullCache). Usa una caché compartida, por "
+        "ejemplo CACHE_TYPE=RedisCache.", app.config['CACHE_TYPE'], workers
+    )
+    app.config['CACHE_TYPE'] = 'NullCache'
+    cache.init_app(app)
+    return True
+
+def _collect_tags(session, flush_context):
+    """Registrar las etiquetas de los registros escritos en el flush."""
+    tags = session.info.setdefault(CACHE_TAGS_KEY, set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, BaseModel):
+            tags.update(instance.cache_tags())
+
+def _invalidate_pending(session):
+    tags = session.info.pop(CACHE_TAGS_KEY, None)
+    if tags:
+        invalidate(*tags)
+
+def _discard_pending(session):
+    session.info.pop(CACHE_TAGS_KEY, None)
+
+def _count(name, value=1):
+    with _stats_lock:
+        current_app.extensions['cache_stats'][name] += value
+
+def cache_stats():
+    """Contadores de aciertos, fallos e invalidaciones de este proceso."""
+    stats = current_app.extensions['cache_stats']
+    hits, misses = stats['hits'], stats['misses']
+    return {
+        'hits': hits,
+        'misses': misses,
+        'invalidations': stats['invalidations'],
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        'backend': current_app.config['CACHE_TYPE'],
+    }
+
+def _new_version():
+    """Versión nueva de una etiqueta: hora de creación e identificador único."""
+    return f"{time.time():.3f}:{uuid4().hex}"
+
+def _changed_since(versions, seconds):
+    """Indicar si alguna de ``versions`` se creó hace menos de ``seconds``."""
+    limit = time.time() - seconds
+    for version in versions.values():
+        created, _, _ = version.partition(':')
+        try:
+            if float(created) > limit:
+                return True
+        except ValueError:
+            # Versiones anteriores, sin hora de creación
+            continue
+    return False
+
+def invalidate(*tags):
+    """Cambiar la versión de las etiquetas indicadas."""
+    cache.set_many({TAG_PREFIX + tag: _new_version() for tag in tags}, timeout=0)
+    _count('invalidations', len(tags))
+
+def _tag_versions(tags):
+    """Versión actual de cada etiqueta, creándola si no existe."""
+    tags = sorted(set(tags))
+    versions = dict(zip(tags, cache.get_many(*[TAG_PREFIX + tag for tag in tags])))
+    for tag, version in versions.items():
+        if version is None:
+            # Si la etiqueta no existe (o se ha expulsado) se crea una versión
+            # nueva, de modo que nunca coincide con la de una entrada anterior
+            cache.add(TAG_PREFIX + tag, _new_version(), timeout=0)
+            versions[tag] = cache.get(TAG_PREFIX + tag)
+    return versions
+
+def _request_key():
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"{VIEW_PREFIX}{request.path}?{args}"
+
+def cached(*tags, related=None, timeout=None):
+    """
+    Cachear la respuesta de un método GET de un ``Resource``.
+    
+    ``tags`` son las etiquetas de las que depende la respuesta: modelos (toda
+    la tabla) o cadenas que pueden usar los argumentos de la ruta
+    (``'product:{id}'``). ``related`` recibe el
+    campo ``data`` de la respuesta y devuelve etiquetas adicionales, como las
+    de los registros anidados. Solo se cachean las respuestas 200, y las
+    leídas de la réplica solo si sus etiquetas no han cambiado durante
+    ``REPLICA_STICKY_SECONDS``; la cabecera ``X-Cache`` indica si la
+    respuesta viene de la caché.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            key = _request_key()
+            entry = cache.get(key)
+            if entry is not None:
+                versions, body, status = entry
+                if _tag_versions(versions) == versions:
+                    _count('hits')
+                    return body, status, {'X-Cache': 'HIT'}
+            _count('misses')
+            
+            # Leer las versiones antes de consultar la base de datos, para que
+            # una escritura concurrente invalide la entrada que se va a guardar
+            versions = _tag_versions(
+                tag.format(**kwargs) if isinstance(tag, str) else tag.cache_tag()
+                for tag in tags
+            )
+            body, status = method(*args, **kwargs)
+            if status == 200:
+                if related is not None:
+                    versions.update(_tag_versions(related(body['data'])))
+                lag = current_app.config.get('REPLICA_STICKY_SECONDS', 0)
+                if not (reading_replica() and _changed_since(versions, lag)):
+                    cache.set(key, (versions, body, status), timeout=timeout)
+            return body, status, {'X-Cache': 'MISS'}
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+"""
+Peticiones condicionales (ETag y Last-Modified) para los endpoints de lectura.
+
+Antes de ejecutar un GET se obtiene, con una consulta ligera, el estado de
+los datos de los que depende la respuesta: el número de filas y el mayor
+``updated_at`` del registro o de la página pedida y de sus registros
+anidados (o de las tablas completas, para los widgets del dashboard). Con ese estado se calculan un ETag débil
+y la cabecera ``Last-Modified``; si la petición trae ``If-None-Match`` o
+``If-Modified-Since`` y los datos no han cambiado se responde 304 sin
+consultar ni serializar el cuerpo.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, request
+from werkzeug.http import http_date
+from sqlalchemy import select, func
+from models.base import db
+from utils.filters import get_filter_args, get_sort_arg
+from utils.pagination import get_pagination_args
+
+def row_state(row):
+    """Estado ``(last_modified, version)`` a partir de una fila de contadores y fechas."""
+    stamps = [value for value in row if isinstance(value, datetime)]
+    return (max(stamps) if stamps else None), tuple(row)
+
+def _window_state(window, related):
+    """Número de filas, suma de IDs y mayor ``updated_at`` de ``window`` y de sus relaciones."""
+    columns = [
+        select(func.count(window.c.id)).scalar_subquery(),
+        select(func.sum(window.c.id)).scalar_subquery(),
+        select(func.max(window.c.updated_at)).scalar_subquery(),
+    ]
+    if related is not None:
+        columns += [statement.scalar_subquery() for statement in related(window)]
+    return tuple(db.session.execute(select(*columns)).one())
+
+def record_state(model, id, related=None):
+    """
+    Estado de un registro, o ``None`` si no existe.
+    
+    ``related`` recibe la subconsulta con el registro y devuelve consultas
+    con la última modificación de los registros anidados en la respuesta.
+    """
+    row = _window_state(select(model).where(model.id == id).subquery(), related)
+    return row_state(row) if row[0] else None
+
+def page_state(model, *criteria, related=None):
+    """
+    Estado de la página pedida (``after``, ``limit``, filtros y orden) de un listado.
+    
+    Solo se leen las filas de la página (más la que indica si hay una
+    siguiente), por lo que el coste no depende del tamaño de la tabla. La
+    suma de IDs cambia si un registro entra o sale de la página.
+    """
+    after, limit = get_pagination_args()
+    window = select(model).where(*criteria, *get_filter_args(model))
+    window = model.keyset_page(window, after, limit, get_sort_arg(model)).subquery()
+    return row_state(_window_state(window, related))
+
+def table_state(*models, since=None):
+    """
+    Estado de una o varias tablas completas: número de filas y mayor ``updated_at``.
+    
+    ``since`` es una fecha mínima para ``Last-Modified``, para respuestas que
+    además dependen del día actual.
+    """
+    columns = []
+    for model in models:
+        columns.append(select(func.count(model.id)).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    row = tuple(db.session.execute(select(*columns)).one())
+    if since is not None:
+        row += (since,)
+    return row_state(row)
+
+def _to_utc(value):
+    """Convertir una fecha UTC sin zona horaria a segundos enteros con zona."""
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+def _make_etag(version):
+    args = urlencode(sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1(f"{request.path}?{args}|{version!r}".encode()).hexdigest()
+    return digest[:32]
+
+def _not_modified(etag, last_modified):
+    """Evaluar ``If-None-Match`` y, si no está presente, ``If-Modified-Since``."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return _to_utc(last_modified) <= request.if_modified_since
+    return False
+
+def conditional(state):
+    """
+    Añadir ETag y Last-Modified a un método GET de un ``Resource`` y responder 304.
+    
+    ``state`` recibe los argumentos de la ruta y devuelve ``(last_modified,
+    version)`` o ``None`` si el registro no existe, en cuyo caso se ejecuta
+    el método normalmente (y responde 404).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            current = state(**kwargs)
+            if current is None:
+                return method(*args, **kwargs)
+            last_modified, version = current
+            etag = _make_etag(version)
+            
+            headers = {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(_to_utc(last_modified))
+            
+            if _not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+            
+            body, status, *extra = method(*args, **kwargs)
+            if status != 200:
+                return (body, status, *extra)
+            return body, status, {**headers, **(extra[0] if extra else {})}
+        return wrapper
+    return decorator
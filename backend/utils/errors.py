@@ -22,6 +22,11 @@ class APIError(Exception):
                 'message': self.message
             }
         }
+    
+    @property
+    def data(self):
+        """Cuerpo de la respuesta que usa flask-restx en lugar del suyo por defecto."""
+        return self.to_dict()
 
 class NotFoundError(APIError):
     """Error para recursos no encontrados."""
@@ -41,8 +46,14 @@ class DatabaseError(APIError):
     def __init__(self, message='Error de base de datos'):
         super().__init__(message, status_code=500, error_code='DATABASE_ERROR')
 
-def register_error_handlers(app):
-    """Registrar manejadores de errores en la aplicación Flask."""
+class ServiceUnavailableError(APIError):
+    """Error para servicios saturados o no disponibles temporalmente."""
+    
+    def __init__(self, message='Servicio no disponible temporalmente'):
+        super().__init__(message, status_code=503, error_code='SERVICE_UNAVAILABLE')
+
+def register_error_handlers(app, api=None):
+    """Registrar manejadores de errores en la aplicación Flask y en ``api``."""
     
     @app.errorhandler(APIError)
     def handle_api_error(error):
@@ -51,6 +62,15 @@ def register_error_handlers(app):
         response.status_code = error.status_code
         return response
     
+    if api is not None:
+        # flask-restx atiende las excepciones de sus recursos antes que Flask
+        # y, sin un manejador propio, responde 500 salvo con
+        # PROPAGATE_EXCEPTIONS (activo en las pruebas)
+        @api.errorhandler(APIError)
+        def handle_resource_error(error):
+            """Manejar los errores de la API lanzados por los recursos."""
+            return error.data, error.status_code
+    
     @app.errorhandler(404)
     def handle_not_found(error):
         """Manejar errores 404."""
@@ -0,0 +1,87 @@
+"""
+Utilidades para la exportación en streaming de registros.
+
+Las exportaciones recorren el resultado de la consulta con ``yield_per``
+y escriben la respuesta por bloques, de modo que la memoria usada es
+constante aunque el resultado tenga millones de filas.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, request, stream_with_context
+from models.base import db
+from utils.errors import ValidationError
+
+# Filas leídas de la base de datos y escritas en la respuesta por bloque
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Parámetros de la exportación para la documentación Swagger
+export_params = {
+    'format': 'Formato de salida: csv (por defecto) o ndjson',
+    'start': 'Fecha inicial (YYYY-MM-DD), inclusive',
+    'end': 'Fecha final (YYYY-MM-DD), inclusive',
+    'status': 'Estado de la factura',
+}
+
+def get_export_format():
+    """Obtener el formato de exportación de la petición actual."""
+    fmt = (request.args.get('format') or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValidationError("El parámetro 'format' debe ser csv o ndjson")
+    return fmt
+
+def _serialize(value):
+    """Convertir fechas a ISO 8601 para CSV y JSON."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_serialize(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Cabecera sin filas cuando el resultado está vacío
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _ndjson_chunks(columns, batches):
+    for batch in batches:
+        yield ''.join(
+            json.dumps({column: _serialize(value) for column, value in zip(columns, row)}) + '\n'
+            for row in batch
+        )
+
+def stream_export(statement, filename, fmt=None):
+    """
+    Devolver una respuesta en streaming con el resultado de ``statement``.
+    
+    Las columnas de la exportación son las etiquetas de la consulta.
+    """
+    fmt = fmt or get_export_format()
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    columns = list(statement.selected_columns.keys())
+    
+    def batches():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        try:
+            for batch in result.partitions():
+                yield batch
+        finally:
+            result.close()
+    
+    chunks = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+    response = Response(stream_with_context(chunks(columns, batches())), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.{extension}'
+    return response
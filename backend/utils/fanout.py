@@ -0,0 +1,95 @@
+"""
+Ejecución en paralelo de consultas independientes de una petición.
+
+``fan_out`` reparte funciones entre un pool acotado de ``FANOUT_WORKERS``
+hilos compartido por toda la aplicación. Cada función se ejecuta en su
+propio contexto de aplicación, de modo que tiene su propia sesión de
+SQLAlchemy (y su propia conexión del pool), que se cierra al terminar. Las
+funciones leen de la réplica si la petición lee de ella.
+
+La petición nunca espera más que el tiempo indicado: las funciones que
+siguen en la cola del pool al terminar el plazo (porque los hilos están
+ocupados, por ejemplo por funciones de otra petición que superaron su
+tiempo) se cancelan sin llegar a ejecutarse. Con ``PROFILING`` activo, las
+sentencias SQL de los hilos se suman a las de la petición cuando terminan
+a tiempo.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from flask import current_app, g
+from utils.profiling import RequestProfile
+from utils.replica import reading_replica, replica_engine
+
+_executor_lock = Lock()
+
+def _executor(app):
+    # Se crea con la primera petición y no en ``create_app``: con ``preload_app``
+    # de gunicorn los hilos del proceso maestro no existen en los workers
+    executor = app.extensions.get('fanout')
+    if executor is None:
+        with _executor_lock:
+            executor = app.extensions.get('fanout')
+            if executor is None:
+                executor = ThreadPoolExecutor(app.config['FANOUT_WORKERS'], thread_name_prefix='fanout')
+                app.extensions['fanout'] = executor
+    return executor
+
+def _thread_read_bind(app):
+    """
+    Engine de lectura de los hilos: la réplica si la petición lee de ella.
+    
+    Los engines del modo asíncrono (``utils.asgi``) solo se pueden usar
+    desde el bucle de eventos, así que los hilos usan siempre los síncronos.
+    """
+    return replica_engine(app) if reading_replica() else None
+
+def _call(app, name, function):
+    started = time.perf_counter()
+    try:
+        return 'ok', function(), time.perf_counter() - started
+    except Exception as e:
+        app.logger.exception("Error al calcular '%s'", name)
+        return 'error', e, time.perf_counter() - started
+
+def _run(app, read_bind, profiled, name, function):
+    with app.app_context():
+        g.read_bind = read_bind
+        if profiled:
+            g.profile = RequestProfile()
+        return _call(app, name, function), g.get('profile')
+
+def fan_out(tasks, timeout):
+    """
+    Ejecutar en paralelo ``tasks`` (nombre -> función sin argumentos).
+    
+    Espera como máximo ``timeout`` segundos, contando el tiempo en la cola
+    del pool, y devuelve para cada nombre ``(estado, resultado, segundos)``.
+    El estado es ``ok``, ``error`` (el resultado es la excepción),
+    ``timeout`` (empezó pero no terminó a tiempo) o ``skipped`` (no llegó a
+    empezar porque no había hilos libres); en los dos últimos el resultado
+    es ``None``. Una tarea que supera el tiempo sigue ocupando su hilo
+    hasta que termina.
+    """
+    app = current_app._get_current_object()
+    read_bind = _thread_read_bind(app)
+    profile = g.get('profile')
+    started = time.perf_counter()
+    futures = {
+        name: _executor(app).submit(_run, app, read_bind, profile is not None, name, function)
+        for name, function in tasks.items()
+    }
+    wait(futures.values(), timeout=timeout)
+    
+    results = {}
+    for name, future in futures.items():
+        if future.cancel():
+            results[name] = ('skipped', None, time.perf_counter() - started)
+        elif future.done():
+            results[name], thread_profile = future.result()
+            if profile is not None and thread_profile is not None:
+                profile.merge(thread_profile)
+        else:
+            results[name] = ('timeout', None, time.perf_counter() - started)
+    return results
@@ -0,0 +1,116 @@
+"""
+Filtros y orden de los listados a partir de la query string.
+
+Cada parámetro que no es de paginación, proyección u orden es un filtro
+``campo=valor`` o ``campo__op=valor``, con ``op`` en ``eq`` (por defecto),
+``ne``, ``gt``, ``gte``, ``lt``, ``lte``, ``in`` (valores separados por
+comas) o ``isnull`` (``true``/``false``). ``sort=campo`` o ``sort=-campo``
+(descendente) fija el orden. Solo se admiten los campos de
+``FILTER_FIELDS`` y ``SORT_FIELDS`` del modelo, que están indexados, de
+modo que el filtrado y el orden se resuelven en la base de datos.
+
+Una fecha sin hora sobre una columna ``DateTime`` abarca el día completo:
+``date__lte=2024-03-31`` incluye todo el 31 de marzo.
+"""
+
+import operator
+from datetime import date, datetime, time, timedelta
+from flask import request
+from sqlalchemy import and_, or_
+from utils.errors import ValidationError
+
+# Parámetros de la query string que no son filtros
+RESERVED_PARAMS = {'after', 'limit', 'fields', 'expand', 'sort'}
+
+# Número máximo de valores de un filtro ``in``
+MAX_IN_VALUES = 100
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+def filter_params(model):
+    """Parámetros de filtro y orden de ``model`` para la documentación Swagger."""
+    params = {
+        name: f'Filtro por {name} (admite __ne, __gt, __gte, __lt, __lte, __in y __isnull)'
+        for name in model.FILTER_FIELDS
+    }
+    params['sort'] = f"Campo de orden, con '-' para descendente: id, {', '.join(model.SORT_FIELDS)}"
+    return params
+
+def _parse_value(column, name, value):
+    """Convertir ``value`` al tipo de la columna."""
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            # Las fechas sin hora se mantienen como ``date`` para abarcar el día
+            return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        return python_type(value)
+    except ValueError:
+        raise ValidationError(f"Valor inválido para el filtro '{name}': {value}")
+
+def _compare(column, op, value):
+    """Expresión de comparación, con las fechas sin hora como rangos de un día."""
+    if column.type.python_type is datetime and not isinstance(value, datetime):
+        start = datetime.combine(value, time.min)
+        end = start + timedelta(days=1)
+        return {
+            'eq': and_(column >= start, column < end),
+            'ne': or_(column < start, column >= end),
+            'gt': column >= end,
+            'gte': column >= start,
+            'lt': column < start,
+            'lte': column < end,
+        }[op]
+    return OPERATORS[op](column, value)
+
+def _criterion(model, key, value):
+    """Condición SQL de un parámetro ``campo[__op]=valor``."""
+    name, _, op = key.partition('__')
+    op = op or 'eq'
+    if name not in model.FILTER_FIELDS:
+        raise ValidationError(
+            f"No se puede filtrar por '{name}'; campos admitidos: {', '.join(model.FILTER_FIELDS)}"
+        )
+    column = getattr(model, name)
+    
+    if op == 'isnull':
+        if value.lower() not in ('true', 'false'):
+            raise ValidationError(f"El filtro '{key}' debe ser true o false")
+        return column.is_(None) if value.lower() == 'true' else column.isnot(None)
+    if op == 'in':
+        values = [_parse_value(column, name, part) for part in value.split(',') if part]
+        if not values or len(values) > MAX_IN_VALUES:
+            raise ValidationError(f"El filtro '{key}' admite entre 1 y {MAX_IN_VALUES} valores")
+        if column.type.python_type is datetime:
+            return or_(*[_compare(column, 'eq', part) for part in values])
+        return column.in_(values)
+    if op not in OPERATORS:
+        raise ValidationError(f"Operador de filtro desconocido: '{op}'")
+    return _compare(column, op, _parse_value(column, name, value))
+
+def get_filter_args(model):
+    """Condiciones SQL de los filtros de la petición actual sobre ``model``."""
+    return [
+        _criterion(model, key, value)
+        for key, value in request.args.items(multi=True)
+        if key not in RESERVED_PARAMS
+    ]
+
+def get_sort_arg(model):
+    """Orden ``(columna, descendente)`` pedido en ``sort``, o ``None`` para ordenar por ID."""
+    value = request.args.get('sort')
+    if not value:
+        return None
+    descending = value.startswith('-')
+    name = value[1:] if descending else value
+    if name != 'id' and name not in model.SORT_FIELDS:
+        raise ValidationError(
+            f"No se puede ordenar por '{name}'; campos admitidos: id, {', '.join(model.SORT_FIELDS)}"
+        )
+    return getattr(model, name), descending
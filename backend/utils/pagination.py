@@ -0,0 +1,75 @@
+"""
+Utilidades para la paginación por cursor de los endpoints de listado.
+
+Con el orden por ID el cursor es el ID del último registro de la página.
+Con ``sort`` por otra columna es un token opaco con el valor de esa columna
+y el ID del último registro, de modo que la página siguiente no depende de
+que ese registro siga existiendo.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from models.base import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.errors import ValidationError
+from utils.params import get_int_arg
+
+# Parámetros de paginación para la documentación Swagger
+pagination_params = {
+    'after': 'Cursor de la página siguiente (next_cursor de la respuesta anterior)',
+    'limit': f'Número de registros por página (por defecto {DEFAULT_PAGE_SIZE}, máximo {MAX_PAGE_SIZE})'
+}
+
+def encode_cursor(cursor):
+    """Codificar un cursor ``(valor, id)`` como token opaco; los IDs se devuelven tal cual."""
+    if not isinstance(cursor, tuple):
+        return cursor
+    value, id = cursor
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([value, id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Decodificar un token de ``encode_cursor`` en la tupla ``(valor, id)``."""
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value, id = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValidationError("El parámetro 'after' no es un cursor válido")
+    if not isinstance(id, int) or isinstance(value, (list, dict)):
+        raise ValidationError("El parámetro 'after' no es un cursor válido")
+    return value, id
+
+def _sorts_by_id():
+    """Indicar si el listado pedido se ordena por ID."""
+    return request.args.get('sort', 'id').lstrip('-') in ('', 'id')
+
+def get_pagination_args():
+    """
+    Obtener los parámetros ``after`` y ``limit`` de la petición actual.
+    
+    Con el orden por ID ``after`` es un ID; con otro orden debe ser el
+    ``next_cursor`` de la respuesta anterior.
+    """
+    if _sorts_by_id():
+        after = get_int_arg('after')
+    else:
+        token = request.args.get('after')
+        after = decode_cursor(token) if token else None
+    limit = get_int_arg('limit', DEFAULT_PAGE_SIZE)
+    if limit < 1:
+        raise ValidationError("El parámetro 'limit' debe ser mayor que cero")
+    return after, min(limit, MAX_PAGE_SIZE)
+
+def pagination_metadata(next_cursor, limit):
+    """Construir el bloque de metadatos de paginación de la respuesta."""
+    return {
+        'pagination': {
+            'next_cursor': encode_cursor(next_cursor),
+            'limit': limit,
+            'has_next': next_cursor is not None
+        }
+    }
@@ -0,0 +1,30 @@
+"""
+Utilidades para leer parámetros de la query string.
+"""
+
+from datetime import date
+from flask import request
+from utils.errors import ValidationError
+
+def get_int_arg(name, default=None):
+    """Leer un parámetro entero no negativo de la query string."""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError(f"El parámetro '{name}' debe ser un número entero")
+    if value < 0:
+        raise ValidationError(f"El parámetro '{name}' no puede ser negativo")
+    return value
+
+def get_date_arg(name, default=None):
+    """Leer un parámetro de fecha (YYYY-MM-DD) de la query string."""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError(f"El parámetro '{name}' debe tener el formato YYYY-MM-DD")
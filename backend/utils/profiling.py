@@ -0,0 +1,210 @@
+"""
+Instrumentación de las peticiones.
+
+Con ``PROFILING`` activo, cada petición registra el tiempo total, el número
+de sentencias SQL, el tiempo que pasan en la base de datos, las filas
+leídas y el tiempo de serialización de los esquemas (``BaseSchema.dump``,
+descontando las consultas que lancen las relaciones cargadas al
+serializar). Los tiempos se devuelven en la cabecera ``Server-Timing``,
+que las herramientas de desarrollo del navegador muestran en la pestaña de
+red, y se acumulan por endpoint en ``/metrics`` con el formato de texto de
+Prometheus. Los contadores son de cada proceso, como los de la caché.
+
+Las consultas que ``utils.fanout`` lanza en otros hilos se suman a las de
+la petición si terminan antes de que esta responda.
+
+Si una petición ejecuta la misma consulta más de
+``PROFILING_N_PLUS_ONE_THRESHOLD`` veces (una consulta por cada registro de
+un listado, el patrón N+1) se escribe un aviso en el log y se cuenta en
+``salesnexus_n_plus_one_total``.
+"""
+
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from models.base import db
+from utils.replica import replica_engine
+
+# Métricas de ``/metrics``: nombre, tipo, ayuda y campo de ``RequestProfile``
+METRICS = [
+    ('salesnexus_requests_total', 'counter', 'Peticiones atendidas', None),
+    ('salesnexus_request_seconds_total', 'counter', 'Tiempo total de las peticiones', 'wall_time'),
+    ('salesnexus_sql_queries_total', 'counter', 'Sentencias SQL ejecutadas', 'queries'),
+    ('salesnexus_sql_seconds_total', 'counter', 'Tiempo de ejecución de las sentencias SQL', 'sql_time'),
+    ('salesnexus_sql_rows_total', 'counter', 'Filas leídas de la base de datos', 'rows'),
+    ('salesnexus_serialization_seconds_total', 'counter', 'Tiempo de serialización de los esquemas',
+     'serialization_time'),
+    ('salesnexus_n_plus_one_total', 'counter', 'Peticiones con consultas repetidas (N+1)', 'n_plus_one'),
+]
+
+class RequestProfile:
+    """Mediciones de una petición."""
+    
+    def __init__(self):
+        self.start = perf_counter()
+        self.wall_time = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.serialization_time = 0.0
+        self.statements = Counter()
+        self.n_plus_one = 0
+        self._serializing = False
+    
+    def merge(self, other):
+        """Sumar las mediciones de ``other`` (las de un hilo de ``utils.fanout``)."""
+        self.queries += other.queries
+        self.sql_time += other.sql_time
+        self.rows += other.rows
+        self.serialization_time += other.serialization_time
+        self.statements.update(other.statements)
+    
+    def server_timing(self):
+        """Valor de la cabecera ``Server-Timing`` (duraciones en milisegundos)."""
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries, {self.rows} rows"',
+            f'serialize;dur={self.serialization_time * 1000:.2f}',
+            f'total;dur={self.wall_time * 1000:.2f}',
+        ])
+
+class _CountingCursor:
+    """Cursor DBAPI que suma las filas que lee SQLAlchemy."""
+    
+    def __init__(self, cursor, profile):
+        self._cursor = cursor
+        self._profile = profile
+    
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._profile.rows += 1
+        return row
+    
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._profile.rows += len(rows)
+        return rows
+    
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._profile.rows += len(rows)
+        return rows
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+def _current_profile():
+    # Los hilos de ``utils.fanout`` tienen su propio perfil en un contexto de aplicación
+    return g.get('profile') if has_app_context() else None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault('profiling_start', []).append(perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    if profile is None or not conn.info.get('profiling_start'):
+        return
+    profile.sql_time += perf_counter() - conn.info['profiling_start'].pop()
+    profile.queries += 1
+    if context is not None and cursor.description is not None:
+        # SQLAlchemy lee el resultado de ``context.cursor`` después de este evento
+        context.cursor = _CountingCursor(cursor, profile)
+        profile.statements[statement] += 1
+
+def instrument_engine(engine):
+    """Medir las sentencias SQL de ``engine`` en las peticiones instrumentadas."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+@contextmanager
+def serialization_timer():
+    """Medir el tiempo de serialización de la petición actual."""
+    profile = _current_profile()
+    if profile is None or profile._serializing:
+        # Los esquemas anidados se miden dentro del esquema exterior
+        yield
+        return
+    profile._serializing = True
+    sql_time = profile.sql_time
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        profile.serialization_time += perf_counter() - start - (profile.sql_time - sql_time)
+        profile._serializing = False
+
+def _check_n_plus_one(profile, endpoint):
+    threshold = current_app.config['PROFILING_N_PLUS_ONE_THRESHOLD']
+    repeated = [(statement, count) for statement, count in profile.statements.items() if count > threshold]
+    if not repeated:
+        return
+    profile.n_plus_one = 1
+    for statement, count in repeated:
+        current_app.logger.warning(
+            "Posible N+1 en %s: la consulta se ha ejecutado %d veces: %s",
+            endpoint, count, ' '.join(statement.split())[:200]
+        )
+
+def _record(profile, labels):
+    stats = current_app.extensions['profiling']
+    with stats['lock']:
+        totals = stats['endpoints'][labels]
+        totals['salesnexus_requests_total'] += 1
+        for name, _, _, attribute in METRICS:
+            if attribute is not None:
+                totals[name] += getattr(profile, attribute)
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+def render_metrics():
+    """Métricas acumuladas por endpoint en el formato de texto de Prometheus."""
+    stats = current_app.extensions['profiling']
+    with stats['lock']:
+        endpoints = {labels: dict(totals) for labels, totals in stats['endpoints'].items()}
+    lines = []
+    for name, kind, description, _ in METRICS:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (method, endpoint), totals in sorted(endpoints.items()):
+            lines.append(f'{name}{{method="{method}",endpoint="{_label(endpoint)}"}} {totals[name]:g}')
+    return '\n'.join(lines) + '\n'
+
+def init_profiling(app):
+    """Registrar la instrumentación si ``PROFILING`` está activo."""
+    if not app.config.get('PROFILING'):
+        return
+    
+    app.extensions['profiling'] = {'lock': Lock(), 'endpoints': defaultdict(Counter)}
+    with app.app_context():
+        engines = list(db.engines.values())
+    if replica_engine(app) is not None:
+        engines.append(replica_engine(app))
+    for engine in engines:
+        instrument_engine(engine)
+    
+    @app.before_request
+    def start_profile():
+        if request.path != '/metrics':
+            g.profile = RequestProfile()
+    
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.wall_time = perf_counter() - profile.start
+        endpoint = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        _check_n_plus_one(profile, endpoint)
+        _record(profile, (request.method, endpoint))
+        response.headers['Server-Timing'] = profile.server_timing()
+        return response
+    
+    @app.route('/metrics')
+    def metrics():
+        """Métricas de las peticiones de este proceso para Prometheus."""
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
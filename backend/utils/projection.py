@@ -0,0 +1,106 @@
+"""
+Proyección de campos de los endpoints de lectura (parámetros ``fields`` y ``expand``).
+
+``fields`` limita los campos de la respuesta y, con ellos, las columnas del
+SELECT, de modo que las columnas que no se piden (por ejemplo, los ``Text``
+como ``description`` o ``notes``) no se leen de la base de datos.
+``expand`` indica las relaciones anidadas que se incluyen y se cargan por
+adelantado. Sin ninguno de los dos la respuesta es la completa; con
+``fields`` solo se incluyen las relaciones nombradas en ``fields`` o en
+``expand``, y con ``expand`` solo (incluso vacío) se devuelven todos los
+campos propios y únicamente las relaciones indicadas.
+"""
+
+from functools import lru_cache
+from flask import request
+from marshmallow import fields as schema_fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from utils.errors import ValidationError
+
+# Parámetros de proyección para la documentación Swagger
+projection_params = {
+    'fields': 'Campos a devolver, separados por comas (por defecto, todos)',
+    'expand': 'Relaciones anidadas a incluir, separadas por comas '
+              '(por defecto, todas si no se indica fields)'
+}
+
+def _get_list_arg(name):
+    """Leer una lista separada por comas, o ``None`` si el parámetro no está."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+@lru_cache(maxsize=256)
+def _projected_schema(schema_class, only, many):
+    """Instancia del esquema limitada a ``only``, reutilizada entre peticiones."""
+    return schema_class(only=only, many=many)
+
+class Projection:
+    """Campos y relaciones de un esquema que se devuelven en la respuesta."""
+    
+    def __init__(self, schema, fields=None, expand=None):
+        available = list(schema.dump_fields)
+        nested = [
+            name for name, field in schema.dump_fields.items()
+            if isinstance(field, schema_fields.Nested)
+        ]
+        
+        unknown = [name for name in fields or () if name not in available]
+        if unknown:
+            raise ValidationError(f"Campos desconocidos en 'fields': {', '.join(unknown)}")
+        unknown = [name for name in expand or () if name not in nested]
+        if unknown:
+            raise ValidationError(f"Relaciones desconocidas en 'expand': {', '.join(unknown)}")
+        
+        if fields is None and expand is None:
+            self.fields = None
+            self.relations = tuple(nested)
+            self.schema = schema
+            return
+        
+        requested = set(available if fields is None else fields) - set(nested)
+        self.relations = tuple(
+            name for name in nested if name in (fields or ()) or name in (expand or ())
+        )
+        # Mantener el orden de declaración del esquema en la salida
+        self.fields = tuple(
+            name for name in available if name in requested or name in self.relations
+        )
+        self.schema = _projected_schema(type(schema), self.fields, schema.many)
+    
+    def options(self, model):
+        """Opciones de carga del ORM: columnas pedidas y relaciones incluidas."""
+        loaders = model.relation_loaders()
+        options = [loaders[name] for name in self.relations if name in loaders]
+        columns = self._columns(model)
+        if columns is not None:
+            options.append(load_only(*columns))
+        return options
+    
+    def _columns(self, model):
+        """Columnas que hay que leer, o ``None`` para leerlas todas."""
+        if self.fields is None:
+            return None
+        column_names = model.column_names()
+        relationships = inspect(model).relationships
+        names = []
+        for name in self.fields:
+            if name in self.relations:
+                # La clave local de la relación es necesaria para cargarla
+                names.extend(column.key for column in relationships[name].local_columns)
+            elif name in column_names:
+                names.append(name)
+            else:
+                # Un campo calculado puede depender de cualquier columna
+                return None
+        return [getattr(model, name) for name in dict.fromkeys(names)]
+    
+    def dump(self, obj):
+        """Serializar ``obj`` con los campos de la proyección."""
+        return self.schema.dump(obj)
+
+def get_projection(schema):
+    """Obtener la proyección pedida en ``fields`` y ``expand`` para ``schema``."""
+    return Projection(schema, _get_list_arg('fields') or None, _get_list_arg('expand'))
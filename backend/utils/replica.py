@@ -0,0 +1,91 @@
+"""
+Lecturas desde una réplica de la base de datos.
+
+Con ``SQLALCHEMY_REPLICA_URI`` configurada, los GET de los namespaces de
+``REPLICA_NAMESPACES`` leen de la réplica (``RoutingSession``), también
+cuando la respuesta se va a guardar en la caché; las escrituras y el resto
+de endpoints usan la base de datos principal. ``REPLICA_STICKY_SECONDS`` es
+también el retraso máximo que se supone a la réplica: ``utils.cache`` no
+guarda lo leído de ella si alguna de sus etiquetas ha cambiado en ese
+tiempo.
+
+Para que un cliente vea sus propios cambios aunque la réplica vaya por
+detrás, cada escritura correcta deja la cookie ``READ_YOUR_WRITES_COOKIE``
+con la hora hasta la que sus lecturas van a la principal
+(``REPLICA_STICKY_SECONDS`` después). Desde otro origen, el frontend debe
+enviar las cookies (``credentials: 'include'``).
+"""
+
+import time
+from flask import g, request
+from sqlalchemy import create_engine
+from utils.database import engine_options, normalize_database_uri
+from utils.sqlite import listen_pragmas, sqlite_pragmas
+
+READ_YOUR_WRITES_COOKIE = 'read_primary_until'
+
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+def _recent_write():
+    """Indicar si el cliente escribió hace menos de ``REPLICA_STICKY_SECONDS``."""
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def _can_read_replica(app):
+    """Indicar si la petición actual puede leer de la réplica."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    parts = request.path.split('/')
+    if len(parts) < 3 or parts[1] != 'api' or parts[2] not in app.config['REPLICA_NAMESPACES']:
+        return False
+    return not _recent_write()
+
+def reading_replica():
+    """
+    Indicar si las lecturas de la petición actual van a la réplica.
+    
+    En el modo asíncrono (``utils.asgi``) la principal se lee con el engine
+    de ``g.primary_read_bind``; si no, con el de Flask-SQLAlchemy.
+    """
+    read_bind = g.get('read_bind')
+    return read_bind is not None and read_bind is not g.get('primary_read_bind')
+
+def replica_engine(app):
+    """Engine de la réplica de ``app``, o ``None`` si no hay réplica configurada."""
+    return app.extensions.get('replica')
+
+def init_replica(app):
+    """Crear el engine de la réplica, si está configurada, y enrutar las lecturas a ella."""
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if not uri:
+        return
+    
+    uri = normalize_database_uri(uri)
+    engine = create_engine(uri, **{
+        **engine_options(app.config, uri),
+        **(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    })
+    if engine.dialect.name == 'sqlite':
+        # Con dos ficheros SQLite (pruebas y desarrollo) la réplica rechaza escrituras
+        listen_pragmas(engine, {**sqlite_pragmas(app.config), 'query_only': 'ON'})
+    app.extensions['replica'] = engine
+    
+    @app.before_request
+    def choose_read_bind():
+        g.read_bind = engine if _can_read_replica(app) else None
+    
+    @app.after_request
+    def remember_write(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            window = app.config['REPLICA_STICKY_SECONDS']
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                f'{time.time() + window:.3f}',
+                max_age=window,
+                path='/api',
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,254 @@
+"""
+Búsqueda de texto completo sobre clientes, productos y proveedores.
+
+Con SQLite, cada modelo de ``SEARCH_MODELS`` tiene una tabla virtual FTS5
+(``<tabla>_fts``) de contenido externo: el índice guarda solo los términos
+y el texto se lee de la propia tabla. Unos triggers lo mantienen
+sincronizado con cualquier INSERT, UPDATE o DELETE, también los que no
+pasan por el ORM (importación masiva, reservas de stock). Se buscan los
+registros que contienen todas las palabras de la consulta como palabras
+completas, sin distinguir mayúsculas ni acentos; solo si no hay ninguno, la
+última palabra se busca como prefijo (búsqueda mientras se escribe).
+
+Con otros motores, o si SQLite no incluye FTS5, se busca cada término con
+LIKE sobre los mismos campos. Los acentos solo se ignoran en PostgreSQL con
+la extensión ``unaccent``; sin ella, "garcia" no encuentra "García".
+
+La base de datos ordena las coincidencias por relevancia (BM25 ponderado con
+``SEARCH_FIELDS`` en FTS5, la suma de los pesos de los campos que contienen
+cada término con LIKE) y devuelve las ``MAX_SEARCH_CANDIDATES`` primeras de
+cada modelo. Sobre ellas se calcula en Python la puntuación final, que
+combina los modelos. Ordenar por BM25 obliga a leer todas las apariciones
+de los términos, así que las palabras presentes en millones de registros
+cuestan decenas de milisegundos. Si un modelo tiene más coincidencias, la
+respuesta lo indica con ``truncated``.
+"""
+
+import math
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import text, select, func, and_, or_, case
+from models import Customer, Product, Supplier
+from models.base import db
+
+# Modelos indexados, en el orden en que se desempatan los resultados
+SEARCH_MODELS = (Customer, Product, Supplier)
+
+# Número máximo de términos de una consulta
+MAX_SEARCH_TERMS = 10
+
+# Coincidencias más relevantes de cada modelo (según la base de datos) entre
+# las que se calcula el ranking; acota el trabajo en Python con términos muy
+# frecuentes
+MAX_SEARCH_CANDIDATES = 200
+
+# Valor de una coincidencia por prefijo frente a la de la palabra completa
+PREFIX_MATCH = 0.5
+
+# Palabras tal y como las separa el tokenizador unicode61 (sin '_')
+WORD = re.compile(r'[^\W_]+')
+
+def fts_table(model):
+    """Nombre de la tabla FTS5 de un modelo."""
+    return f"{model.__table__.name}_fts"
+
+def _fts_ddl(model):
+    """Sentencias que crean la tabla FTS5 de ``model`` y sus triggers."""
+    table, fts = model.__table__.name, fts_table(model)
+    columns = ', '.join(model.SEARCH_FIELDS)
+    new_values = ', '.join(f'new.{name}' for name in model.SEARCH_FIELDS)
+    old_values = ', '.join(f'old.{name}' for name in model.SEARCH_FIELDS)
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+def fts5_available(connection):
+    """Comprobar si la conexión es SQLite con la extensión FTS5."""
+    if connection.dialect.name != 'sqlite':
+        return False
+    options = connection.execute(text('PRAGMA compile_options')).scalars()
+    return 'ENABLE_FTS5' in set(options)
+
+def unaccent_available(connection):
+    """Comprobar si la conexión es PostgreSQL con la extensión ``unaccent`` instalada."""
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'unaccent'")
+    ).first() is not None
+
+def create_search_index(connection, rebuild=False):
+    """
+    Crear las tablas FTS5 y sus triggers si no existen.
+    
+    Las tablas nuevas (o todas, con ``rebuild``) se llenan con los registros
+    existentes. Devuelve el número de tablas reconstruidas.
+    """
+    rebuilt = 0
+    for model in SEARCH_MODELS:
+        fts = fts_table(model)
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+        ).first()
+        for statement in _fts_ddl(model):
+            connection.execute(text(statement))
+        if rebuild or not exists:
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            rebuilt += 1
+    return rebuilt
+
+def init_search(app):
+    """Crear el índice de búsqueda si el motor lo permite y registrar el modo usado."""
+    with app.app_context():
+        with db.engine.begin() as connection:
+            if fts5_available(connection):
+                create_search_index(connection)
+                app.extensions['search_backend'] = 'fts5'
+            else:
+                app.extensions['search_backend'] = 'like'
+                app.extensions['search_unaccent'] = unaccent_available(connection)
+
+def _normalize(value):
+    """Texto en minúsculas y sin acentos, como lo indexa FTS5."""
+    decomposed = unicodedata.normalize('NFKD', value.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def search_terms(query):
+    """Términos (palabras) de una consulta, en minúsculas."""
+    return WORD.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+def _fts_query(terms, prefix):
+    """Consulta MATCH con todos los términos; con ``prefix``, el último como prefijo."""
+    phrases = [f'"{term}"' for term in terms]
+    if prefix:
+        phrases[-1] += '*'
+    return ' '.join(phrases)
+
+def _candidates_fts(model, terms, prefix):
+    """Hasta ``MAX_SEARCH_CANDIDATES + 1`` filas, de más a menos relevante según BM25."""
+    table, fts = model.__table__.name, fts_table(model)
+    weights = ', '.join(str(weight) for weight in model.SEARCH_FIELDS.values())
+    columns = ', '.join(f'{table}.{name}' for name in model.SEARCH_FIELDS)
+    statement = text(f"""
+        SELECT {table}.id, {columns} FROM {fts} JOIN {table} ON {table}.id = {fts}.rowid
+        WHERE {fts} MATCH :query
+        ORDER BY bm25({fts}, {weights}), {table}.id
+        LIMIT :candidates
+    """)
+    return db.session.execute(statement, {
+        'query': _fts_query(terms, prefix),
+        'candidates': MAX_SEARCH_CANDIDATES + 1
+    }).all()
+
+def _candidates_like(model, terms):
+    """
+    Hasta ``MAX_SEARCH_CANDIDATES + 1`` filas que contienen todos los términos.
+    
+    Se ordenan por la suma, para cada término, del peso del campo más
+    importante que lo contiene. Los acentos solo se ignoran en PostgreSQL
+    con la extensión ``unaccent``; en otro caso se compara el texto en
+    minúsculas tal y como está escrito.
+    """
+    unaccent = current_app.extensions.get('search_unaccent')
+    fields = sorted(model.SEARCH_FIELDS.items(), key=lambda field: -field[1])
+    columns = [getattr(model, name) for name in model.SEARCH_FIELDS]
+    lowered = []
+    for name, weight in fields:
+        column = func.lower(getattr(model, name))
+        lowered.append((func.unaccent(column) if unaccent else column, weight))
+    if unaccent:
+        terms = [_normalize(term) for term in terms]
+    criteria, relevance = [], []
+    for term in terms:
+        matches = [column.contains(term, autoescape=True) for column, _ in lowered]
+        criteria.append(or_(*matches))
+        relevance.append(case(*[(match, weight) for match, (_, weight) in zip(matches, lowered)], else_=0))
+    return db.session.execute(
+        select(model.id, *columns).where(and_(*criteria))
+        .order_by(sum(relevance).desc(), model.id).limit(MAX_SEARCH_CANDIDATES + 1)
+    ).all()
+
+def _words(value):
+    """Palabras normalizadas de un campo de texto."""
+    return WORD.findall(_normalize(value)) if value else []
+
+def _candidates(model, terms):
+    """
+    Filas ``(id, campos...)`` más relevantes que contienen todos los términos.
+    
+    Con FTS5 se buscan primero las palabras completas; solo si no hay
+    ninguna coincidencia se busca el último término como prefijo. Un prefijo
+    obliga a leer todas las apariciones de las palabras que empiezan por él,
+    así que, si el resto de términos deja pocas filas, se comprueba sobre
+    ellas en Python. Devuelve como mucho ``MAX_SEARCH_CANDIDATES + 1``
+    filas; si hay más, es que el límite ha dejado coincidencias fuera.
+    """
+    if current_app.extensions.get('search_backend') != 'fts5':
+        return _candidates_like(model, terms)
+    rows = _candidates_fts(model, terms, prefix=False)
+    if rows:
+        return rows
+    if len(terms) > 1:
+        rows = _candidates_fts(model, terms[:-1], prefix=False)
+        if len(rows) <= MAX_SEARCH_CANDIDATES:
+            prefix = _normalize(terms[-1])
+            return [
+                row for row in rows
+                if any(word.startswith(prefix) for value in row[1:] for word in _words(value))
+            ]
+    return _candidates_fts(model, terms, prefix=True)
+
+def _score(weights, terms, values):
+    """
+    Relevancia de un registro: para cada término, la mejor coincidencia entre
+    los campos, según su peso y dividida por la raíz del número de palabras
+    del campo. Las coincidencias por prefijo valen ``PREFIX_MATCH``.
+    """
+    fields = [(weight, _words(value)) for weight, value in zip(weights, values) if value]
+    score = 0.0
+    for term in terms:
+        best = 0.0
+        for weight, words in fields:
+            if term in words:
+                match = 1.0
+            elif any(word.startswith(term) for word in words):
+                match = PREFIX_MATCH
+            else:
+                continue
+            best = max(best, weight * match / math.sqrt(len(words)))
+        score += best
+    return score
+
+def search(terms, models=SEARCH_MODELS, offset=0, limit=20):
+    """
+    Buscar ``terms`` en los modelos indicados.
+    
+    Devuelve ``(hits, has_next, truncated)``, donde ``hits`` es la página
+    pedida de tuplas ``(model, id, score)`` ordenadas de más a menos
+    relevante y ``truncated`` indica que algún modelo tiene más de
+    ``MAX_SEARCH_CANDIDATES`` coincidencias, de las que solo se ordenan y
+    paginan las más relevantes.
+    """
+    normalized = [_normalize(term) for term in terms]
+    hits = []
+    truncated = False
+    for order, model in enumerate(models):
+        weights = list(model.SEARCH_FIELDS.values())
+        rows = _candidates(model, terms)
+        if len(rows) > MAX_SEARCH_CANDIDATES:
+            rows, truncated = rows[:MAX_SEARCH_CANDIDATES], True
+        hits.extend(
+            (-_score(weights, normalized, values), order, id, model)
+            for id, *values in rows
+        )
+    hits.sort(key=lambda hit: hit[:3])
+    page = [(model, id, -score) for score, _, id, model in hits[offset:offset + limit]]
+    return page, len(hits) > offset + limit, truncated
@@ -0,0 +1,129 @@
+"""
+Serializadores compilados para los esquemas de marshmallow.
+
+``compile_dumper`` genera, una sola vez por esquema, una función Python que
+construye el diccionario de salida con acceso directo a los atributos, en
+lugar de recorrer los objetos ``Field`` de marshmallow por cada fila y por
+cada registro anidado. Las conversiones son las mismas que las de los
+campos (``int``, ``float``, ``str``, ``isoformat``) y las claves se generan
+en el mismo orden, por lo que la salida es idéntica a la de ``dump``. La
+función solo usa acceso por atributo, así que sirve tanto para objetos del
+ORM como para filas (``Row``) de una consulta de columnas; si al objeto le
+falta uno de los atributos del esquema lanza ``MissingAttribute`` y
+``BaseSchema`` vuelve a marshmallow. Cualquier otro ``AttributeError``, como
+uno lanzado dentro de una propiedad del modelo, se propaga.
+
+Los campos que no se pueden compilar (formatos de fecha personalizados,
+atributos con puntos, tipos no contemplados) se serializan llamando al
+propio campo, y los esquemas con procesadores ``post_dump`` o ``pre_dump``
+no se compilan.
+"""
+
+from marshmallow import fields, missing
+
+class MissingAttribute(Exception):
+    """El objeto no tiene uno de los atributos que lee la función compilada."""
+
+# Conversión en línea de cada tipo de campo; ``{v}`` es el valor del atributo
+_CONVERSIONS = {
+    fields.Integer: 'int({v})',
+    fields.Float: 'float({v})',
+    fields.String: '{v} if {v}.__class__ is str else str({v})',
+    fields.DateTime: '{v}.isoformat()',
+    fields.Date: '{v}.isoformat()',
+}
+
+def _conversion(field):
+    """Expresión de conversión del campo, o ``None`` si no se puede compilar."""
+    if isinstance(field, fields.DateTime) and field.format not in (None, 'iso', 'iso8601'):
+        return None
+    if isinstance(field, fields.Number) and field.as_string:
+        return None
+    for field_class in type(field).__mro__:
+        if field_class in _CONVERSIONS:
+            return _CONVERSIONS[field_class]
+    return None
+
+# Valores ya cargados de un objeto del ORM; las filas (``Row``) no tienen ``__dict__``
+_STATE = "getattr(obj, '__dict__', _no_dict)"
+
+def _read(attribute):
+    """
+    Expresión que lee un atributo.
+    
+    Las columnas cargadas de un objeto del ORM se leen de su ``__dict__``,
+    sin pasar por el descriptor instrumentado de SQLAlchemy; los atributos
+    expirados o no cargados, las propiedades y las filas usan ``getattr``.
+    """
+    return f'd[{attribute!r}] if {attribute!r} in d else obj.{attribute}'
+
+def compile_dumper(schema):
+    """
+    Generar la función ``dump(obj) -> dict`` equivalente a ``schema.dump(obj)``.
+    
+    Devuelve ``None`` si el esquema tiene procesadores de dump, que solo se
+    pueden aplicar con marshmallow.
+    """
+    if schema._has_processors('pre_dump') or schema._has_processors('post_dump'):
+        return None
+    
+    namespace = {'missing': missing, '_no_dict': {}, '_MissingAttribute': MissingAttribute}
+    attributes = set()
+    entries = []
+    inline = True
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        
+        if type(field) is fields.Nested and attribute.isidentifier():
+            nested = compile_dumper(field.schema)
+            if nested is None:
+                return None
+            namespace[f'_nested{index}'] = nested
+            if field.many or field.schema.many:
+                value = f'[_nested{index}(x) for x in v]'
+            else:
+                value = f'_nested{index}(v)'
+            entries.append((key, f'None if (v := {_read(attribute)}) is None else {value}'))
+            attributes.add(attribute)
+            continue
+        
+        conversion = _conversion(field)
+        if conversion is None or not attribute.isidentifier():
+            # Delegar en el campo de marshmallow, que omite los valores ausentes
+            namespace[f'_field{index}'] = field
+            namespace[f'_get{index}'] = schema.get_attribute
+            entries.append((key, f'_field{index}.serialize({attribute!r}, obj, accessor=_get{index})'))
+            inline = False
+            continue
+        
+        entries.append((key, f'None if (v := {_read(attribute)}) is None else {conversion.format(v="v")}'))
+        attributes.add(attribute)
+    
+    if inline:
+        # Un único literal de diccionario: la forma más rápida de construirlo
+        body = ',\n'.join(f'            {key!r}: {expression}' for key, expression in entries)
+        lines = [f'        return {{\n{body}\n        }}']
+    else:
+        lines = ['        result = {}']
+        for key, expression in entries:
+            lines.append(f'        if (value := {expression}) is not missing:')
+            lines.append(f'            result[{key!r}] = value')
+        lines.append('        return result')
+    
+    # Solo la falta de un atributo del esquema en ``obj`` indica que el objeto
+    # no es del tipo esperado; el resto de errores se propagan
+    namespace['_attributes'] = frozenset(attributes)
+    source = '\n'.join([
+        'def dump(obj):',
+        f'    d = {_STATE}',
+        '    try:',
+        *lines,
+        '    except AttributeError as error:',
+        '        if error.obj is obj and error.name in _attributes:',
+        '            raise _MissingAttribute(error.name) from error',
+        '        raise',
+    ])
+    
+    exec(compile(source, f'<dumper {type(schema).__name__}>', 'exec'), namespace)
+    return namespace['dump']
@@ -0,0 +1,98 @@
+"""
+Perfiles de configuración de las conexiones SQLite.
+
+SQLite guarda los PRAGMA por conexión (salvo ``journal_mode``, que queda
+grabado en el fichero), así que se aplican en el evento ``connect`` de cada
+engine. ``SQLITE_PROFILE`` elige el perfil y ``SQLITE_PRAGMAS`` permite
+sustituir o añadir valores concretos, por ejemplo
+``SQLITE_PRAGMAS = {'mmap_size': 0}`` en ``instance/config.py``.
+
+El perfil ``production`` cambia lo siguiente respecto a los valores por
+defecto de SQLite (perfil ``default``):
+
+- ``journal_mode=WAL``: los lectores no bloquean al escritor ni al revés, y
+  un commit solo añade páginas al fichero ``-wal``. Sigue habiendo un único
+  escritor a la vez, el fichero necesita los ficheros auxiliares ``-wal`` y
+  ``-shm`` (la copia de seguridad debe hacerse con ``.backup`` o
+  ``VACUUM INTO``) y no funciona sobre sistemas de ficheros en red.
+- ``synchronous=NORMAL``: en modo WAL solo se hace fsync en los checkpoints,
+  no en cada commit. Un corte de luz puede perder las últimas transacciones
+  confirmadas, pero no corrompe la base de datos; un fallo del proceso no
+  pierde nada.
+- ``busy_timeout``: milisegundos que una escritura espera a que se libere el
+  bloqueo antes de fallar con ``database is locked``.
+- ``cache_size``: caché de páginas por conexión (negativo, en KiB); cada
+  conexión del pool reserva hasta ese tamaño.
+- ``mmap_size``: bytes del fichero que se leen con memoria mapeada, sin
+  copiar las páginas a la caché; cuenta como memoria compartida del proceso.
+- ``foreign_keys``: SQLite no comprueba las claves foráneas salvo que se
+  active. Con él, borrar un registro con dependientes (un cliente con
+  facturas, un producto vendido) falla igual que en PostgreSQL, en lugar de
+  dejar filas huérfanas.
+- ``temp_store=MEMORY``: tablas temporales e índices de ordenación en
+  memoria.
+"""
+
+from sqlalchemy import event
+from models.base import db
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'foreign_keys': 'ON',
+        'temp_store': 'MEMORY',
+    },
+}
+
+def sqlite_pragmas(config):
+    """PRAGMA del perfil configurado con las sustituciones de ``SQLITE_PRAGMAS``."""
+    profile = config.get('SQLITE_PROFILE') or 'default'
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Perfil de SQLite desconocido: '{profile}'; perfiles: {', '.join(SQLITE_PROFILES)}"
+        )
+    return {**SQLITE_PROFILES[profile], **(config.get('SQLITE_PRAGMAS') or {})}
+
+def listen_pragmas(engine, pragmas):
+    """Aplicar ``pragmas`` a cada conexión nueva de ``engine``."""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+    
+    event.listen(engine, 'connect', set_pragmas)
+
+def begin_write(session):
+    """
+    Empezar la transacción de ``session`` con el bloqueo de escritura de SQLite.
+    
+    pysqlite abre las transacciones en modo diferido: una transacción que lee
+    antes de escribir tiene que convertir su bloqueo de lectura en uno de
+    escritura, y si otra conexión está escribiendo SQLite responde
+    ``database is locked`` al momento, sin esperar ``busy_timeout`` (esperar
+    podría bloquear a ambas). Con ``BEGIN IMMEDIATE`` el bloqueo de
+    escritura se pide al principio, esperando a que quede libre. No hace
+    nada con otros motores o si la transacción ya ha empezado.
+    """
+    connection = session.connection()
+    if connection.dialect.name != 'sqlite':
+        return
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+def init_sqlite(app):
+    """Aplicar los PRAGMA configurados a cada conexión nueva de los engines SQLite."""
+    pragmas = sqlite_pragmas(app.config)
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            listen_pragmas(engine, pragmas)
@@ -0,0 +1,12 @@
+"""
+Punto de entrada WSGI para producción.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+La configuración de gunicorn (``gunicorn.conf.py``) carga este módulo en el
+proceso maestro antes de crear los workers (``preload_app``).
+"""
+
+from app import create_app
+
+app = create_app()